@@ -0,0 +1,149 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-python bezier functions
+"""
+
+import pytest
+
+from tpDcc.libs.python import bezier
+
+np = pytest.importorskip('numpy')
+
+CURVES = {
+    'ease': [(0, 0), (0.4, 0), (0.6, 1), (1, 1)],
+    'linear': [(0, 0), (1 / 3.0, 1 / 3.0), (2 / 3.0, 2 / 3.0), (1, 1)],
+    # X tangent is zero at both ends, so Y is vertical against X there
+    'steep_ends': [(0, 0), (0, 1), (1, 0), (1, 1)],
+    # X stalls in the middle of the curve while Y keeps moving
+    'steep_middle': [(0, 0), (0.5, 0), (0.5, 1), (1, 1)],
+    'flat': [(0, 0.5), (0.3, 0.5), (0.7, 0.5), (1, 0.5)],
+    'overshoot': [(-1, 2), (0, -3), (2, 5), (3, -1)],
+    'quadratic': [(0, 1), (0.8, 0), (1, 1)],
+}
+
+
+def _dense_reference(points, xs, sample_count=200001):
+    """
+    Returns the Y values of the curve at the given X values found by dense sampling, and the Y change between the
+    samples bracketing each X (the accuracy of the reference)
+    """
+
+    t_values = np.linspace(0.0, 1.0, sample_count)
+    samples = bezier.bezier_evaluate(points, t_values=t_values)
+    assert np.allclose(samples[::1000], [bezier.bezier(t, points) for t in t_values[::1000]])
+    assert np.all(np.diff(samples[:, 0]) >= -1e-12)
+    index = np.clip(np.searchsorted(samples[:, 0], xs, side='right') - 1, 0, sample_count - 2)
+    x_low, x_high = samples[index, 0], samples[index + 1, 0]
+    y_low, y_high = samples[index, 1], samples[index + 1, 1]
+    alpha = np.clip(np.where(x_high > x_low, (xs - x_low) / np.where(x_high > x_low, x_high - x_low, 1.0), 0.0), 0, 1)
+    return y_low + alpha * (y_high - y_low), np.abs(y_high - y_low)
+
+
+@pytest.mark.parametrize('name', sorted(CURVES))
+def test_bezier_curve_y_from_x_matches_dense_sampling(name):
+    points = CURVES[name]
+    start_x, end_x = points[0][0], points[-1][0]
+    xs = np.concatenate((np.linspace(start_x, end_x, 997), [start_x, end_x, start_x + 1e-9, end_x - 1e-9]))
+    expected, accuracy = _dense_reference(points, xs)
+
+    curve = bezier.CompiledBezierCurve(points)
+    result = np.array([bezier.bezier_curve_y_from_x(x, points) for x in xs])
+    assert np.all(np.abs(result - expected) <= accuracy + 1e-7)
+    assert np.allclose(curve.evaluate_many(xs), result, rtol=0, atol=1e-7)
+
+    # X reached by the solved parameters is within the curve tolerance
+    t_values = curve.t_from_x_many(xs)
+    assert np.all(np.abs(bezier.bezier_evaluate(points, t_values=t_values)[:, 0] - xs) <= 1e-8)
+
+
+@pytest.mark.parametrize('name', sorted(CURVES))
+def test_bezier_curve_y_from_x_clamps_to_end_points(name):
+    points = CURVES[name]
+    curve = bezier.CompiledBezierCurve(points)
+    start_x, end_x = points[0][0], points[-1][0]
+    for x, point in ((start_x, points[0]), (start_x - 1.0, points[0]), (end_x, points[-1]), (end_x + 1.0, points[-1])):
+        assert bezier.bezier_curve_y_from_x(x, points) == pytest.approx(point[1], abs=1e-12)
+        assert curve.evaluate_many([x])[0] == pytest.approx(point[1], abs=1e-12)
+
+
+ARC_CURVES = dict(CURVES, **{
+    'helix_3d': [(0, 0, 0), (1, 2, 0.5), (-1, 2, 1.5), (0, 0, 2)],
+    'quintic_3d': [(0, 0, 0), (2, 0, 1), (2, 2, -1), (0, 2, 0), (0, 0, 3), (1, 1, 1)],
+    'line_1d': [(0, ), (4, )],
+})
+
+
+def _dense_lengths(points, sample_count=200001):
+    """
+    Returns dense curve parameters and the polyline length from the curve start to each one of them
+    """
+
+    t_values = np.linspace(0.0, 1.0, sample_count)
+    samples = bezier.bezier_evaluate(points, t_values=t_values)
+    return t_values, np.concatenate(([0.0], np.cumsum(np.linalg.norm(np.diff(samples, axis=0), axis=1))))
+
+
+@pytest.mark.parametrize('name', sorted(ARC_CURVES))
+def test_arc_length_matches_dense_polyline(name):
+    points = ARC_CURVES[name]
+    arc_length = bezier.BezierArcLength(points)
+    t_values, lengths = _dense_lengths(points)
+    assert arc_length.length == pytest.approx(lengths[-1], rel=1e-6)
+
+    t_table, length_table = arc_length.table
+    assert t_table[0] == 0.0 and t_table[-1] == 1.0
+    assert np.all(np.diff(t_table) > 0) and np.all(np.diff(length_table) >= 0)
+    assert np.allclose(length_table, np.interp(t_table, t_values, lengths), rtol=0, atol=1e-6 * lengths[-1] + 1e-9)
+
+
+@pytest.mark.parametrize('name', sorted(ARC_CURVES))
+def test_arc_length_parameter_round_trip(name):
+    points = ARC_CURVES[name]
+    arc_length = bezier.BezierArcLength(points)
+    t_values, lengths = _dense_lengths(points)
+    tolerance = 1e-6 * lengths[-1] + 1e-9
+
+    targets = np.linspace(0.0, arc_length.length, 101)
+    solved = np.array([arc_length.t_at_length(length) for length in targets])
+    assert np.all(np.diff(solved) >= 0)
+    assert np.allclose(np.interp(solved, t_values, lengths), targets, rtol=0, atol=tolerance)
+    # lengths of the solved parameters map back to the same parameters
+    assert np.allclose([arc_length.t_at_length(length) for length in np.interp(solved, t_values, lengths)], solved,
+                       rtol=0, atol=1e-5)
+    assert np.allclose(arc_length.point_at_length(targets[37]), bezier.bezier_evaluate(points, t_values=[solved[37]]))
+
+    assert arc_length.t_at_length(-1.0) == 0.0
+    assert arc_length.t_at_length(arc_length.length + 1.0) == 1.0
+    uniform = np.array(arc_length.uniform_points(11))
+    assert np.allclose(uniform[[0, -1]], np.asarray(points, dtype=float)[[0, -1]])
+    # chords between evenly spaced points are never longer than the arc between them
+    assert np.all(np.linalg.norm(np.diff(uniform, axis=0), axis=1) <= arc_length.length / 10 + tolerance)
+
+
+def _distances_to_polyline(samples, polyline):
+    starts, ends = polyline[:-1], polyline[1:]
+    segments = ends - starts
+    segment_lengths_sq = np.maximum((segments ** 2).sum(axis=1), 1e-300)
+    offsets = samples[:, None, :] - starts[None, :, :]
+    along = np.clip((offsets * segments).sum(axis=2) / segment_lengths_sq, 0.0, 1.0)
+    return np.linalg.norm(offsets - along[..., None] * segments, axis=2).min(axis=1)
+
+
+@pytest.mark.parametrize('name', sorted(ARC_CURVES))
+@pytest.mark.parametrize('tolerance', [0.1, 0.01, 0.001])
+def test_flatten_bezier_within_tolerance(name, tolerance):
+    points = ARC_CURVES[name]
+    polyline = np.array(bezier.flatten_bezier(points, tolerance=tolerance))
+    assert np.array_equal(polyline[[0, -1]], np.asarray(points, dtype=float)[[0, -1]])
+
+    samples = bezier.bezier_evaluate(points, t_values=np.linspace(0.0, 1.0, 5001))
+    assert np.all(_distances_to_polyline(samples, polyline) <= tolerance + 1e-12)
+    if tolerance < 0.1:
+        assert len(polyline) >= len(bezier.flatten_bezier(points, tolerance=tolerance * 10))
+
+
+def test_flatten_bezier_straight_curves():
+    assert bezier.flatten_bezier(CURVES['linear']) == [(0.0, 0.0), (1.0, 1.0)]
+    assert bezier.flatten_bezier(CURVES['flat'], tolerance=1e-9) == [(0.0, 0.5), (1.0, 0.5)]
@@ -0,0 +1,221 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-python color functions
+"""
+
+import colorsys
+
+import pytest
+
+from tpDcc.libs.python import color
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.mark.parametrize('bits', [8, 16])
+def test_srgb_decode_table_accuracy(bits):
+    max_code = 2 ** bits - 1
+    codes = np.arange(max_code + 1, dtype=np.uint8 if bits == 8 else np.uint16)
+    expected = [color.convert_single_srgb_to_linear(code / max_code) for code in range(max_code + 1)]
+    result = color.convert_srgb_int_to_linear_array(codes[:, None].repeat(3, axis=1))
+    assert np.max(np.abs(result - np.array(expected)[:, None])) < 1e-12
+
+
+@pytest.mark.parametrize('bits', [8, 16])
+def test_srgb_encode_table_accuracy(bits):
+    max_code = 2 ** bits - 1
+    linear = np.random.RandomState(bits).random_sample((20000, 3))
+    linear[:4] = [[0.0, 1.0, 0.5], [0.0031308, 0.001, 0.999], [1e-9, 0.04, 0.2], [0.25, 0.75, 0.0]]
+    expected = [[int(round(color.convert_single_linear_to_srgb(value) * max_code)) for value in rgb] for rgb in linear]
+    result = color.convert_linear_to_srgb_int_array(linear, bits=bits)
+    assert result.dtype == (np.uint8 if bits == 8 else np.uint16)
+    assert np.max(np.abs(result.astype(np.int64) - np.array(expected))) == 0
+
+
+def test_srgb_tables_round_trip():
+    codes = np.arange(256, dtype=np.uint8).reshape(16, 16, 1).repeat(4, axis=2)
+    linear = color.convert_srgb_int_to_linear_array(codes)
+    assert np.allclose(linear[..., 3], codes[..., 3] / 255.0)
+    assert np.array_equal(color.convert_linear_to_srgb_int_array(linear), codes)
+    assert color.get_srgb_decode_table(8) is color.get_srgb_decode_table(8)
+
+
+def _random_pixels_with_greys():
+    pixels = np.random.RandomState(24).random_sample((500, 3))
+    greys = [[0.0, 0.0, 0.0], [1.0, 1.0, 1.0], [0.5, 0.5, 0.5], [0.2, 0.2, 0.2]]
+    return np.concatenate([pixels, greys])
+
+
+@pytest.mark.parametrize('offsets', [
+    (40, 0, 0), (0, 0.2, 0), (0, -0.3, 0), (0, 0, 0.1), (40, 0.2, 0), (120, 0.1, 0.1), (-75, -0.2, -0.1),
+    (300, 0.5, 0.2)])
+def test_hsl_color_offset_float_array_matches_scalar(offsets):
+    pixels = _random_pixels_with_greys()
+    expected = [color.hsl_color_offset_float(tuple(pixel), *offsets) for pixel in pixels]
+    result = color.hsl_color_offset_float_array(pixels, *offsets)
+    assert np.allclose(result, expected, atol=1e-9)
+
+
+def test_hsl_color_offset_float_array_in_place_keeps_alpha():
+    pixels = np.concatenate([_random_pixels_with_greys(), np.full((504, 1), 0.3)], axis=1).astype(np.float32)
+    expected = color.hsl_color_offset_float_array(pixels[:, :3].astype(np.float64), 40, 0.2, 0.1)
+    result = color.hsl_color_offset_float_array(pixels, 40, 0.2, 0.1, in_place=True)
+    assert result is pixels
+    assert np.allclose(pixels[:, :3], expected, atol=1e-5)
+    assert np.all(pixels[:, 3] == np.float32(0.3))
+
+
+def test_hsl_color_offset_int_array_matches_scalar():
+    pixels = np.round(_random_pixels_with_greys() * 255).astype(np.uint8)
+    expected = [color.hsl_color_offset_int(tuple(int(v) for v in pixel), 40, 30, -20) for pixel in pixels]
+    result = color.hsl_color_offset_int_array(pixels, 40, 30, -20)
+    assert result.dtype == np.uint8
+    assert np.max(np.abs(result.astype(np.int64) - np.array(expected))) <= 1
+
+
+@pytest.mark.parametrize('dtype', [np.uint8, np.uint16])
+def test_rgb_rotate_apply_array_keeps_integer_type(dtype):
+    pixels = np.random.RandomState(7).randint(0, 256, (100, 4)).astype(dtype)
+    rotator = color.RGBRotate()
+    rotator.set_hue_rotation(47)
+    expected = np.clip(np.rint([rotator.apply(*[int(v) for v in pixel[:3]]) for pixel in pixels]), 0, 255)
+    result = rotator.apply_array(pixels)
+    assert result.dtype == dtype
+    assert np.array_equal(result[:, :3], expected)
+    assert np.array_equal(result[:, 3], pixels[:, 3])
+    in_place = pixels.copy()
+    assert rotator.apply_array(in_place, in_place=True) is in_place
+    assert np.array_equal(in_place, result)
+
+
+def _colors():
+    colors = np.random.RandomState(22).random_sample((500, 3))
+    special = [
+        [0.0, 0.0, 0.0], [1.0, 1.0, 1.0], [0.5, 0.5, 0.5], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0],
+        [1.0, 1.0, 0.0], [0.0, 1.0, 1.0], [1.0, 0.0, 1.0], [1.0, 0.0, 1e-9], [0.04045, 0.0031308, 0.04],
+        [0.2, 0.8, 0.8]]
+    return np.concatenate([colors, special])
+
+
+def _rgb_to_hsl(rgb):
+    hue, lightness, saturation = colorsys.rgb_to_hls(*rgb)
+    return hue * 360.0, saturation, lightness
+
+
+def _hsl_to_rgb(hsl):
+    return colorsys.hls_to_rgb(hsl[0] / 360.0, hsl[2], hsl[1])
+
+
+def _hue_colors(hue_range):
+    # hues at sector boundaries and a full turn, plus random ones
+    colors = _colors() * [hue_range, 1.0, 1.0]
+    colors[:13, 0] = np.linspace(0.0, hue_range, 13)
+    return colors
+
+
+COLOR_CONVERSIONS = [
+    (color.convert_rgb_to_hsv_array, color.convert_rgb_to_hsv, _colors),
+    (color.convert_hsv_to_rgb_array, color.convert_hsv_to_rgb, lambda: _hue_colors(360.0)),
+    (color.convert_rgb_to_hsl_array, _rgb_to_hsl, _colors),
+    (color.convert_hsl_to_rgb_array, _hsl_to_rgb, lambda: _hue_colors(360.0)),
+    (color.convert_srgb_to_linear_array, color.convert_color_srgb_to_linear, _colors),
+    (color.convert_linear_to_srgb_array, color.convert_color_linear_to_srgb, _colors),
+]
+
+
+@pytest.mark.parametrize('array_function, function, colors', COLOR_CONVERSIONS)
+def test_color_array_conversions_match_scalar(array_function, function, colors):
+    colors = colors()
+    expected = np.array([function(tuple(rgb)) for rgb in colors.tolist()])
+    result = array_function(colors)
+    assert result is not colors and result.dtype == np.float64
+    assert np.allclose(result, expected, rtol=0, atol=1e-9)
+    # lists, images and colors with alpha
+    assert np.allclose(array_function(colors[:4].tolist()), expected[:4], rtol=0, atol=1e-9)
+    assert np.allclose(array_function(colors[:500].reshape(20, 25, 3)), expected[:500].reshape(20, 25, 3), atol=1e-9)
+    with_alpha = np.concatenate([colors, np.full((len(colors), 1), 0.25)], axis=1)
+    result = array_function(with_alpha)
+    assert np.allclose(result[:, :3], expected, rtol=0, atol=1e-9)
+    assert np.all(result[:, 3] == 0.25)
+
+
+@pytest.mark.parametrize('array_function, function, colors', COLOR_CONVERSIONS)
+@pytest.mark.parametrize('dtype, atol', [(np.float64, 1e-12), (np.float32, 1e-4)])
+def test_color_array_conversions_in_place(array_function, function, colors, dtype, atol):
+    colors = np.concatenate([colors(), np.full((len(colors()), 1), 0.25)], axis=1).reshape(1, -1, 4)
+    in_place = colors.astype(dtype)
+    expected = array_function(in_place.astype(np.float64))
+    assert array_function(in_place, in_place=True) is in_place
+    assert in_place.dtype == dtype
+    assert np.allclose(in_place, expected, rtol=0, atol=atol)
+    assert np.all(in_place[..., 3] == dtype(0.25))
+
+    with pytest.raises(ValueError):
+        array_function(colors.tolist(), in_place=True)
+    with pytest.raises(ValueError):
+        array_function(np.zeros((4, 3), dtype=np.uint8), in_place=True)
+
+
+def test_rgb_int_float_arrays_match_scalar():
+    int_colors = np.random.RandomState(3).randint(0, 256, (300, 4))
+    int_colors[:2] = [[0, 0, 0, 0], [255, 255, 255, 255]]
+    expected = [color.rgb_int_to_float(tuple(rgb)) for rgb in int_colors.tolist()]
+    float_colors = color.rgb_int_to_float_array(int_colors.astype(np.uint8))
+    assert float_colors.dtype == np.float64
+    assert np.allclose(float_colors, expected, rtol=0, atol=1e-15)
+    assert color.rgb_int_to_float_array(int_colors, dtype=np.float32).dtype == np.float32
+
+    float_colors = np.concatenate([_colors(), [[0.5 / 255, 1.5 / 255, 254.5 / 255], [-0.1, 1.1, 0.999]]])
+    expected = [color.rgb_float_to_int(tuple(rgb)) for rgb in float_colors[:-1].tolist()]
+    result = color.rgb_float_to_int_array(float_colors)
+    assert result.dtype == np.uint8
+    assert result[:-1].tolist() == [list(rgb) for rgb in expected]
+    # out of range values are clamped
+    assert result[-1].tolist() == [0, 255, 255]
+    assert np.array_equal(np.rint(color.rgb_int_to_float_array(result) * 255.0), result)
+
+    out = np.zeros(float_colors.shape, dtype=np.uint16)
+    assert color.rgb_float_to_int_array(float_colors, out=out) is out
+    assert np.array_equal(out, result)
+
+
+def _kelvin_temperatures():
+    return np.concatenate([
+        np.arange(1000.0, 40001.0, 1.0), np.random.RandomState(6600).uniform(1000, 40000, 5000),
+        [6599.999, 6600.0, 6600.001, 1900.0, 1000.0, 40000.0]])
+
+
+def test_convert_kelvin_to_rgb_array_matches_scalar():
+    temperatures = np.concatenate([_kelvin_temperatures()[::7], [0.0, 500.0, 999.0, 40001.0, 1e6]])
+    expected = [color.convert_kelvin_to_rgb(temperature) for temperature in temperatures.tolist()]
+    result = color.convert_kelvin_to_rgb_array(temperatures)
+    assert result.shape == (len(temperatures), 3)
+    assert np.allclose(result, expected, rtol=0, atol=1e-9)
+    assert color.convert_kelvin_to_rgb_array(temperatures[:6].reshape(2, 3)).shape == (2, 3, 3)
+
+
+@pytest.mark.parametrize('step, documented_error', [(100, 0.2), (10, 0.0025)])
+def test_kelvin_table_max_error(step, documented_error):
+    table = color.get_kelvin_table(step)
+    assert table is color.get_kelvin_table(step) and table.step == step
+    assert table.max_error <= documented_error
+
+    temperatures = _kelvin_temperatures()
+    expected = np.array([color.convert_kelvin_to_rgb(temperature) for temperature in temperatures.tolist()])
+    result = color.convert_kelvin_to_rgb_array(temperatures, step=step)
+    assert np.array_equal(result, table(temperatures))
+    # measured error stays within the bound the table reports (about 0.174 against 0.193 with 100K steps)
+    assert np.max(np.abs(result - expected)) <= table.max_error
+    assert np.max(np.abs(result - expected)) > table.max_error * 0.5
+
+
+@pytest.mark.parametrize('step', [None, 100, 10])
+def test_kelvin_to_rgb_array_clamps_range_and_split(step):
+    result = color.convert_kelvin_to_rgb_array([0.0, 500.0, 999.0, 1000.0, 40000.0, 40001.0, 1e6], step=step)
+    assert np.allclose(result[:4], color.convert_kelvin_to_rgb(1000), rtol=0, atol=1e-9)
+    assert np.allclose(result[4:], color.convert_kelvin_to_rgb(40000), rtol=0, atol=1e-9)
+    # formulas change at 6600K, the color there is the exact scalar one
+    assert color.convert_kelvin_to_rgb_array([6600.0], step=step)[0].tolist() == list(
+        color.convert_kelvin_to_rgb(6600))
@@ -0,0 +1,182 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-python dijkstra functions
+"""
+
+import copy
+import math
+import pickle
+import random
+
+import pytest
+
+from tpDcc.libs.python import dijkstra
+
+
+def _line_graph():
+    graph = dijkstra.Graph()
+    for node in 'abcd':
+        graph.add_node(node)
+    graph.add_edge('a', 'b', 1)
+    graph.add_edge('b', 'c', 2)
+    graph.add_edge('c', 'd', 3)
+    return graph
+
+
+@pytest.mark.parametrize('clone', [lambda graph: pickle.loads(pickle.dumps(graph)), copy.deepcopy])
+def test_graph_copies_keep_edges_and_drop_observers(clone):
+    graph = _line_graph()
+    oracle = dijkstra.PathOracle(graph)
+    restored = clone(graph)
+    assert restored.nodes == graph.nodes
+    assert restored.distances == graph.distances
+    assert len(restored._observers) == 0
+    assert len(graph._observers) == 1
+    assert oracle.graph is graph
+    assert dijkstra.shortest_path(restored, 'a', 'd') == (6, ['a', 'b', 'c', 'd'])
+
+
+def test_path_oracle_on_unpickled_graph_tracks_edges():
+    restored = pickle.loads(pickle.dumps(_line_graph()))
+    oracle = dijkstra.PathOracle(restored)
+    assert oracle.shortest_path('a', 'd') == (6, ['a', 'b', 'c', 'd'])
+    restored.add_edge('a', 'd', 2)
+    assert oracle.shortest_path('a', 'd') == (2, ['a', 'd'])
+    restored.add_edge('a', 'd', 10)
+    assert oracle.shortest_path('a', 'd') == (6, ['a', 'b', 'c', 'd'])
+
+
+def _graph(edges):
+    graph = dijkstra.Graph()
+    for node in set(node for edge in edges for node in edge[:2]):
+        graph.add_node(node)
+    for from_node, to_node, distance in edges:
+        graph.add_edge(from_node, to_node, distance)
+    return graph
+
+
+def test_dijkstra_known_graph():
+    graph = _graph([('a', 'b', 7), ('a', 'c', 9), ('a', 'f', 14), ('b', 'c', 10), ('b', 'd', 15), ('c', 'd', 11),
+                    ('c', 'f', 2), ('d', 'e', 6), ('f', 'e', 9)])
+    visited, paths = dijkstra.dijkstra(graph, 'a')
+    assert visited == {'a': 0, 'b': 7, 'c': 9, 'd': 20, 'e': 20, 'f': 11}
+    assert paths == {'b': 'a', 'c': 'a', 'd': 'c', 'e': 'f', 'f': 'c'}
+    assert dijkstra.shortest_path(graph, 'a', 'e') == (20, ['a', 'c', 'f', 'e'])
+    assert dijkstra.shortest_path(graph.to_csr(), 'a', 'e') == (20, ['a', 'c', 'f', 'e'])
+    assert dijkstra.shortest_path(graph, 'a', 'e', bidirectional=True) == (20, ['a', 'c', 'f', 'e'])
+
+    # edges can only be traversed in the direction they were added
+    assert dijkstra.dijkstra(graph, 'e') == ({'e': 0}, {})
+
+
+def test_shortest_path_zero_weight_edges():
+    graph = _graph([('a', 'b', 0), ('b', 'c', 0), ('a', 'c', 1), ('c', 'd', 2)])
+    assert dijkstra.dijkstra(graph, 'a')[0] == {'a': 0, 'b': 0, 'c': 0, 'd': 2}
+    for search_graph in (graph, graph.to_csr()):
+        assert dijkstra.shortest_path(search_graph, 'a', 'd') == (2, ['a', 'b', 'c', 'd'])
+        assert dijkstra.shortest_path(search_graph, 'a', 'd', bidirectional=True) == (2, ['a', 'b', 'c', 'd'])
+        assert dijkstra.shortest_path(search_graph, 'a', 'd', heuristic=lambda node, destination: 0) == (
+            2, ['a', 'b', 'c', 'd'])
+
+
+def test_shortest_path_source_is_target():
+    graph = _graph([('a', 'b', 1), ('b', 'a', 1)])
+    for search_graph in (graph, graph.to_csr()):
+        assert dijkstra.shortest_path(search_graph, 'a', 'a') == (0, ['a'])
+        assert dijkstra.shortest_path(search_graph, 'a', 'a', bidirectional=True) == (0, ['a'])
+        assert dijkstra.shortest_path(search_graph, 'a', 'a', heuristic=lambda node, destination: 0) == (0, ['a'])
+
+
+def test_shortest_path_unreachable_target():
+    graph = _graph([('a', 'b', 1), ('c', 'b', 1), ('c', 'd', 1)])
+    visited, paths = dijkstra.dijkstra(graph, 'a')
+    assert 'c' not in visited and 'd' not in visited
+    for search_graph in (graph, graph.to_csr()):
+        for kwargs in ({}, {'bidirectional': True}, {'heuristic': lambda node, destination: 0}):
+            with pytest.raises(KeyError):
+                dijkstra.shortest_path(search_graph, 'a', 'd', **kwargs)
+
+
+def _random_graph(seed, node_count=60, edge_count=180):
+    # edges are never shorter than the straight line between their nodes, so euclidean_heuristic is admissible
+    random_state = random.Random(seed)
+    positions = [(random_state.random(), random_state.random()) for _ in range(node_count)]
+    graph = dijkstra.Graph()
+    for node in range(node_count):
+        graph.add_node(node)
+    for _ in range(edge_count):
+        from_node, to_node = random_state.sample(range(node_count), 2)
+        distance = math.hypot(*[a - b for a, b in zip(positions[from_node], positions[to_node])])
+        graph.add_edge(from_node, to_node, distance * (1.0 + random_state.random()))
+    return graph, positions
+
+
+def _path_distance(graph, path):
+    return sum(graph.distances[(from_node, to_node)] for from_node, to_node in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_searches_match_dijkstra_on_random_graphs(seed):
+    graph, positions = _random_graph(seed)
+    csr_graph = graph.to_csr()
+    heuristic = dijkstra.euclidean_heuristic(positions)
+    csr_heuristic = dijkstra.euclidean_heuristic([positions[node] for node in csr_graph.nodes])
+    for origin in range(0, 60, 7):
+        visited, _ = dijkstra.dijkstra(graph, origin)
+        for destination in range(0, 60, 3):
+            if origin not in csr_graph.node_ids or destination not in csr_graph.node_ids:
+                continue
+            searches = (
+                lambda: dijkstra.astar(graph, origin, destination, heuristic),
+                lambda: dijkstra.astar(csr_graph, origin, destination, csr_heuristic),
+                lambda: dijkstra.bidirectional_dijkstra(graph, origin, destination),
+                lambda: dijkstra.bidirectional_dijkstra(csr_graph, origin, destination),
+                lambda: dijkstra.shortest_path(csr_graph, origin, destination))
+            for search in searches:
+                if destination not in visited:
+                    with pytest.raises(KeyError):
+                        search()
+                    continue
+                distance, path = search()
+                assert distance == pytest.approx(visited[destination])
+                assert path[0] == origin and path[-1] == destination
+                assert _path_distance(graph, path) == pytest.approx(distance)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_multi_source_dijkstra_matches_dijkstra_on_random_graphs(seed):
+    graph, _ = _random_graph(seed)
+    seeds = [seed, seed + 11, seed + 23, seed + 37]
+    trees = [dijkstra.dijkstra(graph, node)[0] for node in seeds]
+    expected = dict()
+    for node in graph.nodes:
+        seed_distances = [(tree[node], label) for label, tree in enumerate(trees) if node in tree]
+        if seed_distances:
+            expected[node] = min(seed_distances)
+
+    csr_graph = graph.to_csr()
+    for search_graph in (graph, csr_graph):
+        visited, labels, paths = dijkstra.multi_source_dijkstra(search_graph, seeds)
+        assert set(visited) == set(labels) == set(expected)
+        assert set(paths) == set(expected) - set(seeds)
+        for node, (distance, label) in expected.items():
+            assert visited[node] == pytest.approx(distance)
+            assert labels[node] == label
+        for node, previous in paths.items():
+            assert labels[previous] == labels[node]
+            assert visited[previous] + graph.distances[(previous, node)] == pytest.approx(visited[node])
+
+        limited, _, _ = dijkstra.multi_source_dijkstra(search_graph, seeds, max_distance=0.5)
+        assert set(limited) == set(node for node, (distance, _) in expected.items() if distance <= 0.5)
+        for node, distance in limited.items():
+            assert distance == pytest.approx(expected[node][0])
+
+    # CSRGraph method returns dense arrays indexed by node index
+    distances, csr_labels, predecessors = csr_graph.multi_source_dijkstra([csr_graph.node_ids[node] for node in seeds])
+    assert len(distances) == len(csr_labels) == len(predecessors) == len(csr_graph.nodes)
+    for index, node in enumerate(csr_graph.nodes):
+        distance, label = expected.get(node, (float('inf'), -1))
+        assert distances[index] == pytest.approx(distance)
+        assert csr_labels[index] == label
@@ -0,0 +1,294 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-python kdtree functions
+"""
+
+import pytest
+
+from tpDcc.libs.python import kdtree
+
+np = pytest.importorskip('numpy')
+
+
+@pytest.mark.parametrize('point_count, k', [(500, 1), (500, 6), (40, 40), (12, 20)])
+def test_query_many_matches_query(point_count, k):
+    random_state = np.random.RandomState(point_count + k)
+    points = [tuple(point) for point in random_state.random_sample((point_count, 3)).tolist()]
+    query_points = random_state.random_sample((50, 3))
+    tree = kdtree.KDTree.construct_from_data(list(points))
+
+    indices, distances = tree.query_many(query_points, k=k)
+    assert indices.shape == distances.shape == (50, k)
+    found = min(k, point_count)
+    assert np.all(indices[:, found:] == -1)
+    assert np.all(np.isinf(distances[:, found:]))
+    for query_point, point_indices, point_distances in zip(query_points, indices, distances):
+        expected = tree.query(tuple(query_point), t=k)
+        assert [points[index] for index in point_indices[:found]] == expected
+        expected_distances = [np.sqrt(kdtree.square_distance(query_point, point)) for point in expected]
+        assert np.allclose(point_distances[:found], expected_distances)
+
+
+def _points_with_duplicates(random_state, point_count, dimensions):
+    # coarse grid coordinates produce many ties, and some points are repeated exactly
+    points = random_state.randint(0, 6, (point_count, dimensions)).astype(float)
+    points[1::7] = points[:-1:7]
+    return [tuple(point) for point in points.tolist()]
+
+
+def _brute_force_square_distances(points, query_point, k):
+    return sorted(kdtree.square_distance(query_point, point) for point in points)[:k]
+
+
+@pytest.mark.parametrize('dimensions, k', [(2, 1), (3, 1), (3, 4), (3, 9), (4, 5)])
+def test_query_matches_brute_force(dimensions, k):
+    random_state = np.random.RandomState(dimensions * 10 + k)
+    points = _points_with_duplicates(random_state, 300, dimensions)
+    tree = kdtree.KDTree.construct_from_data(list(points))
+    query_points = [tuple(point) for point in (random_state.random_sample((40, dimensions)) * 6).tolist()]
+
+    for query_point in query_points + points[:10]:
+        expected = _brute_force_square_distances(points, query_point, k)
+        result = tree.query(query_point, t=k)
+        assert [kdtree.square_distance(query_point, point) for point in result] == pytest.approx(expected)
+        for point in set(result):
+            assert result.count(point) <= points.count(point)
+
+        neighbours = kdtree.KDTreeNeighbours(query_point, k)
+        for point in points:
+            neighbours.add(point)
+        best = neighbours.get_best()
+        assert [kdtree.square_distance(query_point, point) for point in best] == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('k', [1, 3, 16])
+def test_query_many_matches_brute_force_with_duplicates(k):
+    random_state = np.random.RandomState(k)
+    points = np.array(_points_with_duplicates(random_state, 400, 3))
+    query_points = np.concatenate((random_state.random_sample((60, 3)) * 6, points[:20]))
+    tree = kdtree.KDTree.construct_from_array(points, leaf_size=4)
+
+    indices, distances = tree.query_many(query_points, k=k)
+    square_distances = ((query_points[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+    assert np.allclose(distances, np.sqrt(np.sort(square_distances, axis=1)[:, :k]))
+    assert np.allclose(distances, np.sqrt(np.take_along_axis(square_distances, indices, axis=1)))
+    assert all(len(set(row)) == k for row in indices.tolist())
+
+
+def test_construct_from_data_keeps_given_list_order():
+    random_state = np.random.RandomState(7)
+    points = [tuple(point) for point in random_state.random_sample((200, 3)).tolist()]
+    original = list(points)
+    tree = kdtree.KDTree.construct_from_data(points)
+    assert points == original
+
+    query_points = random_state.random_sample((30, 3))
+    indices, distances = tree.query_many(query_points, k=3)
+    for query_point, point_indices, point_distances in zip(query_points, indices, distances):
+        assert [points[index] for index in point_indices] == tree.query(tuple(query_point), t=3)
+        assert np.allclose([np.sqrt(kdtree.square_distance(query_point, points[index])) for index in point_indices],
+                           point_distances)
+
+
+def _brute_force_radius(points, query_point, radius):
+    return np.flatnonzero(((points - query_point) ** 2).sum(axis=1) <= radius ** 2)
+
+
+@pytest.mark.parametrize('radius', [0.0, 0.5, 1.0, 2.5, 100.0])
+def test_query_radius_matches_brute_force(radius):
+    random_state = np.random.RandomState(int(radius * 10))
+    points = np.array(_points_with_duplicates(random_state, 400, 3))
+    # grid query points are exactly at radius distance of some points, where the bound is inclusive
+    query_points = np.concatenate((random_state.random_sample((40, 3)) * 6, points[:20]))
+    tree = kdtree.KDTree.construct_from_array(points, leaf_size=4)
+
+    result = tree.query_radius_many(query_points, radius)
+    assert len(result) == len(query_points)
+    for query_point, indices in zip(query_points, result):
+        assert indices.tolist() == _brute_force_radius(points, query_point, radius).tolist()
+    for query_point in query_points[::10]:
+        assert tree.query_radius(query_point, radius).tolist() == _brute_force_radius(
+            points, query_point, radius).tolist()
+
+
+def test_query_radius_many_per_point_radius():
+    random_state = np.random.RandomState(1)
+    points = random_state.random_sample((500, 3))
+    query_points = random_state.random_sample((30, 3))
+    radii = np.linspace(0.0, 0.4, len(query_points))
+    tree = kdtree.KDTree.construct_from_array(points)
+
+    for query_point, radius, indices in zip(query_points, radii, tree.query_radius_many(query_points, radii)):
+        assert indices.tolist() == _brute_force_radius(points, query_point, radius).tolist()
+    assert [len(indices) for indices in tree.query_radius_many(np.zeros((0, 3)), 1.0)] == []
+
+
+def _brute_force_box(points, box_min, box_max):
+    return np.flatnonzero(np.all((points >= box_min) & (points <= box_max), axis=1))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_query_box_matches_brute_force(seed):
+    random_state = np.random.RandomState(seed)
+    points = np.array(_points_with_duplicates(random_state, 400, 3))
+    tree = kdtree.KDTree.construct_from_array(points, leaf_size=4)
+
+    for _ in range(20):
+        # integer corners put grid points on the box faces, which are included
+        corners = random_state.randint(-1, 7, (2, 3)).astype(float)
+        box_min, box_max = corners.min(axis=0), corners.max(axis=0)
+        assert tree.query_box(box_min, box_max).tolist() == _brute_force_box(points, box_min, box_max).tolist()
+
+    assert tree.query_box(points.min(axis=0), points.max(axis=0)).tolist() == list(range(len(points)))
+    assert tree.query_box((-100, -100, -100), (100, 100, 100)).tolist() == list(range(len(points)))
+    assert tree.query_box((10, 10, 10), (20, 20, 20)).tolist() == []
+    # inverted corners make an empty box
+    assert tree.query_box((4, 4, 4), (1, 1, 1)).tolist() == []
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_save_load_round_trip(tmp_path, mmap):
+    random_state = np.random.RandomState(5)
+    points = np.array(_points_with_duplicates(random_state, 300, 3))
+    query_points = random_state.random_sample((40, 3)) * 6
+    tree = kdtree.KDTree.construct_from_array(points, leaf_size=4)
+    arrays = tree.get_arrays()
+
+    arrays_path = str(tmp_path / 'arrays.kdtree')
+    arrays.save(arrays_path)
+    loaded_arrays = kdtree.KDTreeArrays.load(arrays_path, mmap=mmap)
+    for name, _ in kdtree.KDTreeArrays.FILE_ARRAYS:
+        assert np.array_equal(getattr(loaded_arrays, name), getattr(arrays, name))
+        assert isinstance(getattr(loaded_arrays, name), np.memmap) == mmap
+    assert np.array_equal(loaded_arrays.points([3, 0, 7]), points[[3, 0, 7]])
+
+    tree_path = str(tmp_path / 'tree.kdtree')
+    tree.save(tree_path)
+    loaded = kdtree.KDTree.load(tree_path, mmap=mmap)
+    for result, expected in zip(loaded.query_many(query_points, k=5), tree.query_many(query_points, k=5)):
+        assert np.array_equal(result, expected)
+    for result, expected in zip(loaded.query_radius_many(query_points, 1.5), tree.query_radius_many(query_points, 1.5)):
+        assert np.array_equal(result, expected)
+    assert np.array_equal(loaded.query_box((1, 1, 1), (3, 4, 5)), tree.query_box((1, 1, 1), (3, 4, 5)))
+
+
+def test_load_rejects_other_files(tmp_path):
+    file_path = tmp_path / 'other.kdtree'
+    file_path.write_bytes(b'not a tree file' * 10)
+    for mmap in (True, False):
+        with pytest.raises(ValueError):
+            kdtree.KDTree.load(str(file_path), mmap=mmap)
+
+
+class _RecordingSharedMemory(object):
+    """
+    Stands in for the shared_memory module, recording the names of the blocks created through it
+    """
+
+    def __init__(self, module):
+        self._module = module
+        self.created = list()
+
+    def SharedMemory(self, *args, **kwargs):
+        block = self._module.SharedMemory(*args, **kwargs)
+        if kwargs.get('create'):
+            self.created.append(block.name)
+        return block
+
+
+def _assert_released(module, block_names):
+    assert block_names
+    for block_name in block_names:
+        with pytest.raises(FileNotFoundError):
+            module.SharedMemory(name=block_name)
+
+
+@pytest.mark.skipif(kdtree.shared_memory is None, reason='Shared memory is not available')
+@pytest.mark.parametrize('k', [1, 4])
+def test_parallel_query_matches_query_many(monkeypatch, k):
+    recording = _RecordingSharedMemory(kdtree.shared_memory)
+    monkeypatch.setattr(kdtree, 'shared_memory', recording)
+    random_state = np.random.RandomState(k)
+    points = random_state.random_sample((2000, 3))
+    query_points = random_state.random_sample((300, 3))
+    tree = kdtree.KDTree.construct_from_array(points)
+    expected_indices, expected_distances = tree.query_many(query_points, k=k)
+
+    executor = kdtree.KDTreeParallelQuery(tree, processes=2, chunk_size=64)
+    for _ in range(2):
+        indices, distances = executor.query_many(query_points, k=k)
+        assert np.array_equal(indices, expected_indices)
+        assert np.array_equal(distances, expected_distances)
+    executor.close()
+    assert executor._pool is None and executor._tree_block is None
+    _assert_released(recording._module, recording.created)
+
+    recording.created = list()
+    with kdtree.KDTreeParallelQuery(tree, processes=2, chunk_size=64) as executor:
+        indices, distances = executor.query_many(query_points, k=k)
+    assert np.array_equal(indices, expected_indices)
+    assert np.array_equal(distances, expected_distances)
+    _assert_released(recording._module, recording.created)
+
+    indices, distances = tree.query_many_parallel(query_points[:10], k=k, processes=2)
+    assert np.array_equal(indices, expected_indices[:10])
+
+
+@pytest.mark.skipif(kdtree.shared_memory is None, reason='Shared memory is not available')
+def test_benchmark_parallel_query():
+    results = kdtree.benchmark_parallel_query(point_count=1000, query_count=200, k=2, max_processes=2)
+    assert [processes for processes, _, _ in results] == [1, 2]
+    assert results[0][2] == 1.0
+    assert all(seconds >= 0.0 and speed_up > 0.0 for _, seconds, speed_up in results)
+
+
+@pytest.mark.parametrize('t', [0, -1])
+def test_query_without_neighbours_returns_empty_list(t):
+    points = [tuple(point) for point in np.random.RandomState(0).random_sample((50, 3)).tolist()]
+    neighbours = kdtree.KDTreeNeighbours((0.5, 0.5, 0.5), t)
+    for point in points:
+        neighbours.add(point)
+    assert neighbours.get_best() == []
+
+    tree = kdtree.KDTree.construct_from_data(points)
+    assert tree.query((0.5, 0.5, 0.5), t=t) == []
+    result, statistics = tree.query((0.5, 0.5, 0.5), t=t, statistics=True)
+    assert result == [] and statistics['nodes_visited'] > 0
+
+
+@pytest.mark.parametrize('point_count, dimensions, leaf_size', [(1000, 3, 16), (257, 2, 1), (300, 4, 5), (5, 3, 16)])
+def test_build_arrays_invariants(point_count, dimensions, leaf_size):
+    random_state = np.random.RandomState(point_count)
+    data = random_state.random_sample((point_count, dimensions))
+    data[::5] = np.round(data[::5] * 4.0)
+    original = data.copy()
+    arrays = kdtree.KDTreeArrays.build(data, leaf_size=leaf_size)
+    assert np.array_equal(data, original)
+    assert sorted(arrays.indices.tolist()) == list(range(point_count))
+    assert np.array_equal(arrays.data, data[arrays.indices])
+
+    leaf_ranges = list()
+    for node in range(len(arrays.node_start)):
+        start, end = arrays.node_start[node], arrays.node_end[node]
+        left, right = arrays.node_left[node], arrays.node_right[node]
+        if left < 0:
+            assert right < 0 and arrays.node_split_dim[node] == -1
+            assert end - start <= leaf_size
+            leaf_ranges.append((start, end))
+            continue
+        # children split the node range at its median along split_dim
+        axis, split_value = arrays.node_split_dim[node], arrays.node_split_value[node]
+        median = (start + end) // 2
+        assert (arrays.node_start[left], arrays.node_end[left]) == (start, median)
+        assert (arrays.node_start[right], arrays.node_end[right]) == (median, end)
+        assert end - start > leaf_size
+        assert np.all(arrays.data[start:median, axis] <= split_value)
+        assert np.all(arrays.data[median:end, axis] >= split_value)
+        # split value is the median point coordinate, the smallest one of the right child
+        assert arrays.data[median:end, axis].min() == split_value
+
+    leaf_ranges.sort()
+    assert leaf_ranges[0][0] == 0 and leaf_ranges[-1][1] == point_count
+    assert all(previous[1] == following[0] for previous, following in zip(leaf_ranges, leaf_ranges[1:]))
@@ -0,0 +1,244 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-python math functions
+"""
+
+import pytest
+
+from tpDcc.libs.python import mathlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+requires_numpy = pytest.mark.skipif(np is None, reason='NumPy is not available')
+
+
+def _loop_distribute_value(samples, spacing=1.0, range_start=0.0, range_end=1.0):
+    # previous distribute_value implementation, accumulating the sample distances one by one
+    value_list = [range_start]
+    value_dst = abs(range_end - range_start)
+    unit = 1.0
+    factor = 1.0
+    for i in range(samples - 2):
+        unit += factor * spacing
+        factor *= spacing
+    unit = value_dst / unit
+    total_unit = unit
+    for i in range(samples - 2):
+        mult_factor = total_unit / value_dst
+        value_list.append(range_start - ((range_start - range_end) * mult_factor))
+        unit *= spacing
+        total_unit += unit
+    value_list.append(range_end)
+
+    return value_list
+
+
+@pytest.mark.parametrize('samples', [0, 1, 2, 3, 4, 7, 20])
+@pytest.mark.parametrize('spacing', [1.0, 0.5, 0.9, 1.25, 2.0])
+@pytest.mark.parametrize('range_start, range_end', [(0.0, 1.0), (2.0, -3.0), (-1.0, 5.5)])
+def test_distribute_value_matches_loop(samples, spacing, range_start, range_end):
+    expected = _loop_distribute_value(samples, spacing, range_start, range_end)
+    result = mathlib.distribute_value(samples, spacing, range_start, range_end)
+    assert len(result) == len(expected)
+    assert result == pytest.approx(expected, rel=1e-12, abs=1e-12)
+    assert result[0] == range_start and result[-1] == range_end
+    if np is not None:
+        array_result = mathlib.distribute_value_array(samples, spacing, range_start, range_end)
+        assert array_result.tolist() == pytest.approx(expected, rel=1e-12, abs=1e-12)
+
+
+def test_distribute_value_short_lists():
+    assert mathlib.distribute_value(1, range_start=2.0, range_end=4.0) == [2.0, 4.0]
+    assert mathlib.distribute_value(2, spacing=3.0, range_start=2.0, range_end=4.0) == [2.0, 4.0]
+    assert mathlib.distribute_value(3, range_start=2.0, range_end=4.0) == [2.0, 3.0, 4.0]
+
+
+def test_distribute_value_large_spacing_does_not_overflow():
+    values = mathlib.distribute_value(1000, spacing=10.0)
+    assert values[0] == 0.0 and values[-1] == 1.0
+    assert all(a <= b for a, b in zip(values, values[1:]))
+
+
+def test_bounding_box_from_points():
+    box = mathlib.BoundingBox.from_points([(0, 1, 2), (-1, 5, 0), (3, 2, 1)])
+    assert box.min_vector == [-1, 1, 0]
+    assert box.max_vector == [3, 5, 2]
+
+
+@pytest.mark.parametrize('points', [
+    [(0, 1), (2, 3)],
+    [(0, 1, 2, 3), (4, 5, 6, 7)],
+    [0, 1, 2],
+])
+def test_bounding_box_from_points_rejects_other_dimensions(points):
+    with pytest.raises((ValueError, TypeError)):
+        mathlib.BoundingBox.from_points(points)
+
+
+def test_bounding_box_from_points_rejects_empty_points():
+    with pytest.raises(ValueError):
+        mathlib.BoundingBox.from_points([])
+
+
+@requires_numpy
+@pytest.mark.parametrize('scalar', [2, 2.0, 'float32', 'int64', 'float64'])
+def test_compact_vectors_accept_numpy_scalars(scalar):
+    if isinstance(scalar, str):
+        scalar = getattr(np, scalar)(2)
+    vector = mathlib.CompactVector(1.0, 2.0, 4.0)
+    assert vector + scalar == mathlib.CompactVector(3.0, 4.0, 6.0)
+    assert vector - scalar == mathlib.CompactVector(-1.0, 0.0, 2.0)
+    assert vector * scalar == mathlib.CompactVector(2.0, 4.0, 8.0)
+    assert vector / scalar == mathlib.CompactVector(0.5, 1.0, 2.0)
+    assert mathlib.CompactVector2D(1.0, 2.0) * scalar == mathlib.CompactVector2D(2.0, 4.0)
+
+    vectors = mathlib.VectorArray([[1.0, 2.0, 4.0], [0.0, 1.0, 0.0]])
+    assert vectors.add(scalar).tolist() == [[3.0, 4.0, 6.0], [2.0, 3.0, 2.0]]
+    assert vectors.sub(scalar).tolist() == [[-1.0, 0.0, 2.0], [-2.0, -1.0, -2.0]]
+    assert vectors.scale(scalar).tolist() == [[2.0, 4.0, 8.0], [0.0, 2.0, 0.0]]
+
+
+@requires_numpy
+@pytest.mark.parametrize('scalar', [2.0, 3, 'float32'])
+def test_vector_array_dot_rejects_scalars(scalar):
+    if isinstance(scalar, str):
+        scalar = getattr(np, scalar)(2)
+    vectors = mathlib.VectorArray([[1.0, 2.0, 4.0], [0.0, 1.0, 0.0]])
+    with pytest.raises(TypeError):
+        vectors.dot(scalar)
+    with pytest.raises(TypeError):
+        vectors.dot(np.array(2.0))
+    assert vectors.dot((1.0, 0.0, 1.0)).tolist() == [5.0, 0.0]
+    assert vectors.dot([[1.0, 1.0, 1.0], [2.0, 2.0, 2.0]]).tolist() == [7.0, 2.0]
+
+
+@requires_numpy
+def test_inverse_distance_weights_single_samples():
+    values = [0.0, 0.25, 1.0]
+    expected = [mathlib.inverse_distance_weight_1d(values, 0.5)]
+    assert np.allclose(mathlib.inverse_distance_weights(values, 0.5), expected)
+    assert np.allclose(mathlib.inverse_distance_weights(values, [0.5]), expected)
+    assert np.allclose(mathlib.inverse_distance_weights(values, [0.5, 0.5]), expected * 2)
+
+    points = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [1.0, 1.0, 1.0]])
+    sample = np.array([0.25, 0.5, 0.0])
+    weights = mathlib.inverse_distance_weights(points, sample, power=2.0)
+    assert weights.shape == (1, 4)
+    assert np.allclose(weights, mathlib.inverse_distance_weights(points, sample[None, :], power=2.0))
+    distances = np.linalg.norm(points - sample, axis=1)
+    assert np.allclose(weights[0], distances ** -2.0 / np.sum(distances ** -2.0))
+
+    indices, nearest_weights = mathlib.inverse_distance_weights(points, sample.tolist(), k=2)
+    assert indices.tolist() == [[0, 1]]
+    assert np.isclose(nearest_weights.sum(), 1.0)
+
+    with pytest.raises(ValueError):
+        mathlib.inverse_distance_weights(points, [0.25, 0.5])
+
+
+def _scalar_curve(name, percent_values):
+    function = mathlib.get_easing_function(name)
+    return np.array([function(value) for value in np.asarray(percent_values).tolist()])
+
+
+@requires_numpy
+@pytest.mark.parametrize('name', sorted(mathlib.EASING_FUNCTIONS))
+def test_easing_array_functions_match_scalar_functions(name):
+    percent_values = np.concatenate((np.linspace(0.0, 1.0, 1001), [0.25 - 1e-12, 0.5 - 1e-12, 0.5 + 1e-12]))
+    expected = _scalar_curve(name, percent_values)
+    result = mathlib.get_easing_function(name, array=True)(percent_values)
+    assert result.shape == percent_values.shape
+    assert np.allclose(result, expected, rtol=1e-12, atol=1e-12)
+    assert np.allclose(mathlib.ease_array(name, percent_values.tolist()), expected, rtol=1e-12, atol=1e-12)
+    assert np.allclose(mathlib.ease_array(name, percent_values[:6].reshape(2, 3)), expected[:6].reshape(2, 3))
+
+
+@requires_numpy
+def test_smooth_step_array_matches_smooth_step():
+    values = np.linspace(-2.0, 7.0, 101)
+    for range_start, range_end, smooth in ((0.0, 1.0, 1.0), (-2.0, 5.0, 0.5), (3.0, 1.0, 0.0)):
+        expected = [mathlib.smooth_step(value, range_start, range_end, smooth) for value in values.tolist()]
+        assert np.allclose(mathlib.smooth_step_array(values, range_start, range_end, smooth), expected)
+
+
+# error bounds documented in EasingLookupTable for the default 4097 knots tables
+LOOKUP_TABLE_ERRORS = {
+    'ease_in_expo': 2.5e-7,
+    'ease_out_expo': 2.5e-7,
+    'ease_in_out_expo': 5e-7,
+    'fade_sigmoid': 1e-7,
+    'ease_out_circ': 1e-4,
+    'ease_in_out_circ': 1e-4,
+}
+
+
+@requires_numpy
+@pytest.mark.parametrize('name', sorted(LOOKUP_TABLE_ERRORS))
+def test_easing_lookup_table_error_bounds(name):
+    table = mathlib.get_easing_lookup_table(name)
+    assert table.size == 4097
+    assert table is mathlib.get_easing_lookup_table(name)
+    assert table.max_error <= LOOKUP_TABLE_ERRORS[name]
+
+    # random samples plus the middle of the first intervals, where circular curves are steepest
+    percent_values = np.concatenate((
+        np.random.RandomState(0).random_sample(20000), np.linspace(0.0, 1e-3, 4001),
+        0.5 + np.linspace(-1e-3, 1e-3, 4001), [0.0, 0.5, 1.0]))
+    errors = np.abs(table(percent_values) - _scalar_curve(name, percent_values))
+    assert errors.max() <= LOOKUP_TABLE_ERRORS[name]
+    assert np.array_equal(mathlib.ease_array(name, percent_values, lookup=True), table(percent_values))
+
+    # inputs are clamped to the 0-1 range (exact end values are only returned for exactly 0 and 1)
+    assert np.allclose(table([-1.0, -1e-9, 1.0 + 1e-9, 2.0]), table([1e-15, 1e-15, 1.0 - 1e-15, 1.0 - 1e-15]),
+                       rtol=0, atol=1e-6)
+
+
+@requires_numpy
+def test_easing_lookup_table_end_values_and_cache(monkeypatch):
+    table = mathlib.get_easing_lookup_table('fade_sigmoid')
+    assert table([0.0, 1.0]).tolist() == [0.0, 1.0]
+
+    monkeypatch.setattr(mathlib, 'EASING_FUNCTIONS', dict(mathlib.EASING_FUNCTIONS))
+    monkeypatch.setattr(mathlib, '_LOOKUP_TABLES', dict())
+    mathlib.register_easing_function('test_square', lambda value: value * value)
+    assert 'test_square' in mathlib.get_easing_names()
+    square_table = mathlib.get_easing_lookup_table('test_square', size=65)
+    assert square_table.max_error <= (1.0 / 64) ** 2 / 8 * 2
+    assert np.allclose(mathlib.ease_array('test_square', [0.5, 0.25]), [0.25, 0.0625])
+
+    mathlib.register_easing_function('test_square', lambda value: value, lambda values: np.asarray(values))
+    assert mathlib.get_easing_lookup_table('test_square', size=65) is not square_table
+    assert mathlib.ease_array('test_square', [0.5], lookup=True).tolist() == [0.5]
+    with pytest.raises(KeyError):
+        mathlib.get_easing_function('not_registered')
+
+
+@requires_numpy
+@pytest.mark.parametrize('value_array, sample_array, k', [
+    ([], [0.5], None),
+    ([], [[0.0, 0.0, 0.0]], 2),
+    ([0.0, 1.0], [], None),
+    ([[0.0, 0.0], [1.0, 1.0]], [[]], None),
+    ([0.0, 0.5, 1.0], [0.25], 0),
+    ([0.0, 0.5, 1.0], [0.25], -2),
+])
+def test_inverse_distance_weights_rejects_invalid_input(value_array, sample_array, k):
+    with pytest.raises(ValueError):
+        mathlib.inverse_distance_weights(value_array, sample_array, k=k)
+
+
+@requires_numpy
+def test_inverse_distance_weights_k_nearest_limits():
+    values = [0.0, 0.25, 1.0]
+    indices, weights = mathlib.inverse_distance_weights(values, [0.2, 0.9], k=1)
+    assert indices.tolist() == [[1], [2]]
+    assert weights.tolist() == [[1.0], [1.0]]
+    # more neighbours than values get weights for all the values
+    indices, weights = mathlib.inverse_distance_weights(values, [0.5], k=10)
+    assert sorted(indices[0].tolist()) == [0, 1, 2]
+    assert np.allclose(weights[0][np.argsort(indices[0])], mathlib.inverse_distance_weights(values, [0.5])[0])
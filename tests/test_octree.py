@@ -0,0 +1,199 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-python octree functions
+"""
+
+import pytest
+
+from tpDcc.libs.python import octree
+
+np = pytest.importorskip('numpy')
+
+
+def _assert_same_nodes(node, other):
+    assert node.bbox_min == other.bbox_min
+    assert node.bbox_max == other.bbox_max
+    assert node.half_values == other.half_values
+    assert node.divisions == other.divisions
+    assert node.points == other.points
+    assert len(node.children) == len(other.children)
+    for child, other_child in zip(node.children, other.children):
+        _assert_same_nodes(child, other_child)
+
+
+@pytest.mark.parametrize('capacity, max_depth', [(1, 16), (4, 3), (8, 16)])
+def test_build_from_points_matches_insert(capacity, max_depth):
+    random_state = np.random.RandomState(capacity)
+    points = random_state.random_sample((600, 3)) * 4.0 - 1.0
+    # points on octant boundaries, repeated points (only max depth stops their subdivision) and bounds corners
+    points[:100] = np.round(points[:100] * 4.0) / 4.0
+    points[100:120] = points[120]
+    points[130] = (-1.0, -1.0, -1.0)
+    points[131] = (3.0, 3.0, 3.0)
+    payloads = ['point_{}'.format(i) for i in range(len(points))]
+    bbox_min, bbox_max = (-1.0, -1.0, -1.0), (3.0, 3.0, 3.0)
+
+    tree = octree.Octree.build_from_points(
+        points, payloads=payloads, bbox_min=bbox_min, bbox_max=bbox_max, capacity=capacity, max_depth=max_depth)
+    inserted_tree = octree.Octree(bbox_min, bbox_max, capacity=capacity, max_depth=max_depth)
+    for point, payload in zip(map(tuple, points.tolist()), payloads):
+        inserted_tree.insert(point, payload=payload)
+
+    assert len(tree) == len(inserted_tree) == len(points)
+    _assert_same_nodes(tree.root, inserted_tree.root)
+
+    # the built tree keeps working as a regular tree
+    leaf = tree.insert((0.5, 0.5, 0.5), payload='new')
+    assert ((0.5, 0.5, 0.5), 'new') in leaf.points
+    assert len(tree) == len(points) + 1
+
+
+def test_build_from_points_default_payloads_and_empty_points():
+    points = np.random.RandomState(0).random_sample((50, 3))
+    tree = octree.Octree.build_from_points(points, capacity=4)
+    stored = sorted(tree.query_aabb((0, 0, 0), (1, 1, 1)), key=lambda item: item[1])
+    assert [payload for _, payload in stored] == list(range(50))
+    assert np.array_equal([point for point, _ in stored], points)
+
+    empty_tree = octree.Octree.build_from_points(np.zeros((0, 3)))
+    assert len(empty_tree) == 0
+    assert empty_tree.nearest((0, 0, 0), k=3) == []
+
+
+@pytest.mark.parametrize('k', [1, 5, 40])
+def test_nearest_matches_brute_force(k):
+    random_state = np.random.RandomState(k)
+    points = random_state.random_sample((300, 3))
+    tree = octree.Octree.build_from_points(points, capacity=4)
+    for query_point in random_state.random_sample((20, 3)).tolist():
+        result = tree.nearest(query_point, k=k)
+        expected = np.sort(np.sum((points - query_point) ** 2, axis=1))[:k]
+        assert np.allclose([np.sum((np.array(point) - query_point) ** 2) for point, _ in result], expected)
+
+
+@pytest.mark.parametrize('k', [0, -1])
+def test_nearest_rejects_invalid_k(k):
+    tree = octree.Octree.build_from_points(np.random.RandomState(0).random_sample((10, 3)))
+    with pytest.raises(ValueError):
+        tree.nearest((0.5, 0.5, 0.5), k=k)
+
+
+def test_classify_matches_child_containing():
+    node = octree.OctreeNode((-1.0, -1.0, -1.0), (3.0, 3.0, 3.0))
+    node.subdivide()
+    random_state = np.random.RandomState(3)
+    points = random_state.random_sample((200, 3)) * 4.0 - 1.0
+    points[:50] = np.round(points[:50])
+    expected = [node.children.index(node.child_containing(point)) for point in map(tuple, points.tolist())]
+    assert node.classify(points).tolist() == expected
+
+    half_values = random_state.random_sample((200, 3))
+    expected = [sum(2 ** axis for axis in range(3) if point[axis] >= half[axis])
+                for point, half in zip(points, half_values)]
+    assert octree.OctreeNode.classify_octants(points, half_values).tolist() == expected
+
+
+def test_morton_encode_decode_round_trip():
+    random_state = np.random.RandomState(0)
+    coordinates = random_state.randint(0, 1 << octree.MORTON_MAX_DEPTH, (3, 1000))
+    coordinates[:, :2] = [[0, (1 << octree.MORTON_MAX_DEPTH) - 1]] * 3
+    codes = octree.morton_encode(*coordinates)
+    assert codes.dtype == np.uint64
+    for decoded, values in zip(octree.morton_decode(codes), coordinates):
+        assert np.array_equal(decoded, values)
+    # each group of 3 bits is an octant index laid out as OctreeNode children (4 * z + 2 * y + x)
+    assert octree.morton_encode([1, 0, 0, 1, 2], [0, 1, 0, 1, 0], [0, 0, 1, 1, 3]).tolist() == [1, 2, 4, 7, 44]
+
+
+def _linear_octree(capacity, max_depth, seed=0):
+    # unit bounds keep cell bounds and grid coordinates exact, so brute force lookups agree on cell faces
+    random_state = np.random.RandomState(seed)
+    points = random_state.random_sample((500, 3))
+    points[:100] = np.round(points[:100] * 8.0) / 8.0
+    points[100:140] = points[140]
+    tree = octree.LinearOctree.from_points(
+        points, bbox_min=(0, 0, 0), bbox_max=(1, 1, 1), capacity=capacity, max_depth=max_depth)
+    return tree, points
+
+
+def _cell_contains(bbox_min, bbox_max, points):
+    # cells include their minimum faces, and their maximum faces only on the octree bounds
+    return np.all((points >= bbox_min) & ((points < bbox_max) | ((points == bbox_max) & (bbox_max == 1.0))), axis=-1)
+
+
+@pytest.mark.parametrize('capacity, max_depth', [(None, 4), (None, 0), (1, 6), (8, 5), (16, 21)])
+def test_linear_octree_cells_match_brute_force(capacity, max_depth):
+    tree, points = _linear_octree(capacity, max_depth)
+    bbox_mins, bbox_maxs = tree.cell_bounds(tree.keys)
+    assert np.array_equal(tree.key_depth(tree.keys), tree.depths)
+    # cells are stored in Morton order of the first max depth code they cover
+    code_starts = tree._get_code_starts()
+    assert np.all(code_starts[1:] > code_starts[:-1])
+
+    counts = tree.cell_point_counts()
+    assert counts.sum() == len(points) and np.all(counts > 0)
+    assert sorted(np.concatenate([tree.cell_points(i) for i in range(len(tree))]).tolist()) == list(range(500))
+    for cell_index in range(len(tree)):
+        cell_points = points[tree.cell_points(cell_index)]
+        assert np.all(_cell_contains(bbox_mins[cell_index], bbox_maxs[cell_index], cell_points))
+        if capacity is not None and tree.depths[cell_index] < max_depth:
+            assert counts[cell_index] <= capacity
+
+    random_state = np.random.RandomState(1)
+    query_points = np.concatenate((random_state.random_sample((300, 3)), points[:50], [(1.0, 1.0, 1.0)]))
+    inside = _cell_contains(bbox_mins[None, :, :], bbox_maxs[None, :, :], query_points[:, None, :])
+    assert np.all(inside.sum(axis=1) <= 1)
+    expected = np.where(inside.any(axis=1), inside.argmax(axis=1), -1)
+    assert tree.leaf_index(query_points).tolist() == expected.tolist()
+    assert tree.leaf_index(points).tolist() == [
+        next(i for i in range(len(tree)) if index in tree.cell_points(i)) for index in range(len(points))]
+
+
+@pytest.mark.parametrize('capacity, max_depth', [(None, 3), (2, 5), (16, 21)])
+def test_linear_octree_find_cells_matches_brute_force(capacity, max_depth):
+    tree, _ = _linear_octree(capacity, max_depth)
+    random_state = np.random.RandomState(2)
+    depths = random_state.randint(0, max_depth + 1, 400).astype(np.uint64)
+    codes = octree.morton_encode(*random_state.randint(0, 1 << max_depth, (3, 400))) >> (
+        np.uint64(3) * (np.uint64(max_depth) - depths))
+    keys = np.concatenate((
+        (np.uint64(1) << (np.uint64(3) * depths)) | codes, tree.keys,
+        tree.child_keys(tree.keys[tree.depths < max_depth])[:, 5], tree.parent_keys(tree.keys[tree.depths > 0])))
+
+    expected = list()
+    for key in keys.tolist():
+        key_depth = int(tree.key_depth(np.uint64(key)))
+        found = [cell_index for cell_index, (cell_key, cell_depth) in enumerate(zip(tree.keys.tolist(), tree.depths))
+                 if cell_depth <= key_depth and key >> (3 * (key_depth - int(cell_depth))) == cell_key]
+        expected.append(found[0] if found else -1)
+    assert tree.find_cells(keys).tolist() == expected
+    assert tree.find_cells(tree.keys).tolist() == list(range(len(tree)))
+
+
+@pytest.mark.parametrize('offset', [(1, 0, 0), (0, -1, 0), (0, 0, 2), (-1, 1, -1)])
+def test_linear_octree_neighbour_keys(offset):
+    tree = octree.LinearOctree((0, 0, 0), (1, 1, 1), max_depth=6)
+    random_state = np.random.RandomState(3)
+    depths = random_state.randint(0, 7, 300).astype(np.uint64)
+    codes = octree.morton_encode(*random_state.randint(0, 1 << 6, (3, 300))) >> (np.uint64(3) * (np.uint64(6) - depths))
+    keys = (np.uint64(1) << (np.uint64(3) * depths)) | codes
+
+    neighbours = tree.neighbour_keys(keys, offset)
+    bbox_mins, bbox_maxs = tree.cell_bounds(keys)
+    expected_mins = bbox_mins + np.asarray(offset) * (bbox_maxs - bbox_mins)
+    outside = np.any((expected_mins < 0.0) | (expected_mins >= 1.0), axis=1)
+    assert np.all(neighbours[outside] == 0)
+    assert np.array_equal(tree.key_depth(neighbours[~outside]), depths[~outside])
+    assert np.allclose(tree.cell_bounds(neighbours[~outside])[0], expected_mins[~outside])
+    assert np.array_equal(tree.parent_keys(tree.child_keys(keys)), np.repeat(keys[:, None], 8, axis=1))
+
+
+def test_linear_octree_bytes_per_cell():
+    tree, _ = _linear_octree(4, 10)
+    # keys (8 bytes), depths (1 byte) and starts (8 bytes), plus the end of the last cell
+    assert tree.nbytes == 17 * len(tree) + 8
+    tree.leaf_index([(0.5, 0.5, 0.5)])
+    # code lookup array (8 bytes) built on the first lookup
+    assert tree.nbytes == 25 * len(tree) + 8
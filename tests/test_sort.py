@@ -0,0 +1,114 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Module that contains tests for tpDcc-libs-python sort functions
+"""
+
+import random
+
+import pytest
+
+from tpDcc.libs.python import sort, fileio
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from tpDcc.libs.python import version
+except Exception:
+    # path module (imported by version) only imports in Windows
+    version = None
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(np is None, reason='NumPy is not available'))]
+
+
+def _keys(keys, use_numpy):
+    return [np.array(key) for key in keys] if use_numpy else keys
+
+
+def _expected_order(keys, reverse):
+    # reference order: compare ranks of key values (negated for descending keys), ties keep their original order
+    return sorted(range(len(keys[0])), key=lambda index: tuple(
+        -_rank(key, key[index]) if flag else _rank(key, key[index]) for key, flag in zip(keys, reverse)) + (index, ))
+
+
+def _rank(key, value):
+    return sorted(set(key)).index(value)
+
+
+@pytest.mark.parametrize('use_numpy', BACKENDS)
+@pytest.mark.parametrize('reverse', [False, True])
+def test_argsort_is_stable(use_numpy, reverse):
+    numbers = [3, 1, 2, 3, 1, 2, 3, 1]
+    order = list(sort.argsort(*_keys([numbers], use_numpy), reverse=reverse, use_numpy=use_numpy))
+    if reverse:
+        assert order == [0, 3, 6, 2, 5, 1, 4, 7]
+    else:
+        assert order == [1, 4, 7, 2, 5, 0, 3, 6]
+
+
+@pytest.mark.parametrize('use_numpy', BACKENDS)
+@pytest.mark.parametrize('reverse', [[False, True], [True, False], [False, True, False], [True, True, True]])
+def test_argsort_mixed_key_orders(use_numpy, reverse):
+    random_state = random.Random(len(reverse) * 10 + sum(reverse))
+    keys = [[random_state.randint(0, 3) for _ in range(200)] for _ in reverse]
+    keys[-1] = [random_state.choice('abc') for _ in range(200)]
+    order = list(sort.argsort(*_keys(keys, use_numpy), reverse=reverse, use_numpy=use_numpy))
+    assert order == _expected_order(keys, reverse)
+
+    sorter = sort.MultiKeySort(*_keys(keys, use_numpy), reverse=reverse, use_numpy=use_numpy)
+    assert list(sorter.permutation) == order
+    assert list(sorter.apply(keys[0])) == [keys[0][index] for index in order]
+
+
+def test_argsort_invalid_reverse_flags():
+    with pytest.raises(ValueError):
+        sort.argsort([1, 2], [3, 4], reverse=[True])
+
+
+@pytest.mark.parametrize('use_numpy', BACKENDS)
+def test_multi_key_sort_followers(use_numpy):
+    numbers = [10, 2, 33, 2, 1]
+    names = ['ten', 'two', 'thirty three', 'other two', 'one']
+    sorter = sort.MultiKeySort(*_keys([numbers], use_numpy), use_numpy=use_numpy)
+    assert list(sorter.take(_keys([numbers], use_numpy)[0])) == [1, 2, 2, 10, 33]
+    assert sorter.take(names) == ['one', 'two', 'other two', 'ten', 'thirty three']
+    assert list(sorter.apply(names)) == sorter.take(names)
+    with pytest.raises(ValueError):
+        sorter.take(names[1:])
+
+    quick_sort = sort.QuickNumbersListSort(numbers)
+    quick_sort.set_follower_list(names)
+    assert quick_sort.run() == ([1, 2, 2, 10, 33], ['one', 'two', 'other two', 'ten', 'thirty three'])
+
+
+VERSION_FILES = ['version.10', 'comments.txt', 'version.2', 'version.1', 'version.9.bak', 'other.4', 'version.3']
+EXPECTED_VERSIONS = [(1, 'version.1'), (2, 'version.2'), (3, 'version.3'), (10, 'version.10')]
+
+
+def test_file_version_get_versions_order(monkeypatch):
+    from tpDcc.libs.python import folder
+
+    monkeypatch.setattr(fileio.FileVersion, '_get_version_folder', lambda self: 'versions')
+    monkeypatch.setattr(folder, 'get_files_and_folders', lambda directory: list(VERSION_FILES))
+    # constructor is skipped because it imports path module, only importable in Windows
+    file_version = fileio.FileVersion.__new__(fileio.FileVersion)
+    file_version.version_name = 'version'
+
+    versions, numbers = file_version.get_versions(return_version_numbers_also=True)
+    assert numbers == [1, 2, 3, 10]
+    assert list(versions.items()) == EXPECTED_VERSIONS
+
+
+@pytest.mark.skipif(version is None, reason='version module can not be imported in this platform')
+def test_version_file_get_versions_order(monkeypatch):
+    monkeypatch.setattr(version.VersionFile, '_get_version_folder', lambda self: 'versions')
+    monkeypatch.setattr(version.folder, 'get_files_and_folders', lambda directory: list(VERSION_FILES))
+    version_file = version.VersionFile('file.txt')
+
+    versions, numbers = version_file.get_versions(return_version_numbers=True)
+    assert numbers == [1, 2, 3, 10]
+    assert list(versions.items()) == EXPECTED_VERSIONS
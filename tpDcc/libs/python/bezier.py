@@ -8,6 +8,26 @@ Module that contains bezier related functions
 from __future__ import print_function, division, absolute_import
 
 import math
+import bisect
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Bernstein basis matrices cached by (degree, number of samples)
+_BASIS_CACHE = dict()
+_BASIS_CACHE_SIZE = 64
+
+# compiled curves used by bezier_curve_y_from_x, cached by control points
+_CURVE_CACHE = dict()
+_CURVE_CACHE_SIZE = 64
+
+# 5 points Gauss-Legendre quadrature in [-1, 1], used to integrate curve speed
+_GAUSS_LEGENDRE = (
+    (0.0, 0.5688888888888889),
+    (-0.5384693101056831, 0.4786286704993665), (0.5384693101056831, 0.4786286704993665),
+    (-0.9061798459386640, 0.2369268850561891), (0.9061798459386640, 0.2369268850561891))
 
 
 def binomial(i, n):
@@ -30,20 +50,404 @@ def bezier(t, points):
     return x, y
 
 
-def bezier_curve_y_from_x(index_x, points):
+def power_coefficients(values):
+    """
+    Converts the control values of a Bezier curve (one dimension) into polynomial coefficients
+    :param values: list(float), control values
+    :return: list(float), coefficients in ascending order (value(t) = sum(c[i] * t ** i))
+    """
+
+    degree = len(values) - 1
+    coefficients = list()
+    for j in range(degree + 1):
+        total = 0.0
+        for i in range(j + 1):
+            total += (-1) ** (j - i) * binomial(i, j) * values[i]
+        coefficients.append(binomial(j, degree) * total)
+
+    return coefficients
+
+
+def _polynomial(coefficients, t):
+    # Horner evaluation, works both with floats and NumPy arrays
+    result = coefficients[-1]
+    for coefficient in reversed(coefficients[:-1]):
+        result = result * t + coefficient
+
+    return result
+
+
+class CompiledBezierCurve(object):
+    """
+    2D Bezier curve (such as an animation curve) prepared to be evaluated by X many times.
+    A monotone X to T lookup table is built once. Each lookup finds its bracketing interval with a binary search
+    and refines T with Newton steps, falling back to bisection when a step leaves the bracket, until X is matched
+    within the given tolerance. X must not decrease along the curve
+        Example usage:
+            curve = CompiledBezierCurve([(0, 0), (0.4, 0), (0.6, 1), (1, 1)])
+            y = curve.evaluate(0.25)
+            ys = curve.evaluate_many(frames)
+    """
+
+    def __init__(self, points, samples=101, tolerance=1e-9, max_iterations=32):
+        """
+        Constructor
+        :param points: list(tuple(float, float)), control points of the curve
+        :param samples: int, number of entries of the X to T lookup table
+        :param tolerance: float, maximum X error of the solved parameters. Where X changes slowly along the curve
+            (steep segments) the error of the parameter itself is also kept under it, so Y stays accurate
+        :param max_iterations: int, maximum number of refinement steps per lookup
+        """
+
+        self._points = [tuple(point) for point in points]
+        self._tolerance = tolerance
+        self._max_iterations = max_iterations
+        self._x_coefficients = power_coefficients([point[0] for point in self._points])
+        self._y_coefficients = power_coefficients([point[1] for point in self._points])
+        self._dx_coefficients = [i * c for i, c in enumerate(self._x_coefficients)][1:] or [0.0]
+
+        samples = max(2, int(samples))
+        self._t_lookup = [i / (samples - 1) for i in range(samples)]
+        self._x_lookup = list()
+        largest_x = -float('inf')
+        for t in self._t_lookup:
+            largest_x = max(largest_x, _polynomial(self._x_coefficients, t))
+            self._x_lookup.append(largest_x)
+        self._arrays = None
+
+    @property
+    def points(self):
+        return self._points
+
+    def _bracket(self, x):
+        """
+        Internal function that returns the lookup interval containing the given X
+        :param x: float
+        :return: tuple(float, float, float), parameters at the interval ends and initial parameter guess
+        """
+
+        index = min(max(bisect.bisect_right(self._x_lookup, x) - 1, 0), len(self._x_lookup) - 2)
+        x_low, x_high = self._x_lookup[index], self._x_lookup[index + 1]
+        t_low, t_high = self._t_lookup[index], self._t_lookup[index + 1]
+        alpha = (x - x_low) / (x_high - x_low) if x_high > x_low else 0.0
+
+        return t_low, t_high, t_low + alpha * (t_high - t_low)
+
+    def t_from_x(self, x):
+        """
+        Returns the curve parameter where the curve reaches the given X (clamped to the curve ends)
+        :param x: float
+        :return: float
+        """
+
+        if x <= self._x_lookup[0]:
+            return 0.0
+        if x >= self._x_lookup[-1]:
+            return 1.0
+
+        t_low, t_high, t = self._bracket(x)
+        for _ in range(self._max_iterations):
+            error = _polynomial(self._x_coefficients, t) - x
+            slope = _polynomial(self._dx_coefficients, t)
+            if abs(error) <= self._tolerance * min(1.0, abs(slope)):
+                break
+            if error > 0:
+                t_high = t
+            else:
+                t_low = t
+            t = t - error / slope if slope else t_low
+            if not t_low < t < t_high:
+                t = (t_low + t_high) * 0.5
+
+        return t
+
+    def evaluate(self, x):
+        """
+        Returns the Y value of the curve at the given X
+        :param x: float
+        :return: float
+        """
+
+        return _polynomial(self._y_coefficients, self.t_from_x(x))
+
+    def t_from_x_many(self, xs):
+        """
+        Returns the curve parameters where the curve reaches each one of the given X values
+        :param xs: array like, X values (for example a whole frame range)
+        :return: np.ndarray
+        """
+
+        _check_numpy()
+
+        if self._arrays is None:
+            self._arrays = (np.array(self._x_lookup), np.array(self._t_lookup))
+        x_lookup, t_lookup = self._arrays
+
+        xs = np.asarray(xs, dtype=np.float64)
+        index = np.clip(np.searchsorted(x_lookup, xs, side='right') - 1, 0, len(x_lookup) - 2)
+        x_low, x_high = x_lookup[index], x_lookup[index + 1]
+        t_low, t_high = t_lookup[index].copy(), t_lookup[index + 1].copy()
+        x_range = x_high - x_low
+        alpha = np.where(x_range > 0, (xs - x_low) / np.where(x_range > 0, x_range, 1.0), 0.0)
+        t = t_low + np.clip(alpha, 0.0, 1.0) * (t_high - t_low)
+
+        active = np.ones(xs.shape, dtype=bool)
+        for _ in range(self._max_iterations):
+            error = _polynomial(self._x_coefficients, t) - xs
+            slope = _polynomial(self._dx_coefficients, t)
+            active &= np.abs(error) > self._tolerance * np.minimum(1.0, np.abs(slope))
+            if not active.any():
+                break
+            t_high = np.where(active & (error > 0), t, t_high)
+            t_low = np.where(active & (error <= 0), t, t_low)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                newton = t - error / slope
+            bisection = (t_low + t_high) * 0.5
+            step = np.where((newton > t_low) & (newton < t_high), newton, bisection)
+            t = np.where(active, step, t)
+
+        t = np.where(xs <= x_lookup[0], 0.0, t)
+        return np.where(xs >= x_lookup[-1], 1.0, t)
+
+    def evaluate_many(self, xs):
+        """
+        Returns the Y values of the curve at each one of the given X values
+        :param xs: array like, X values (for example a whole frame range)
+        :return: np.ndarray
+        """
+
+        return _polynomial(self._y_coefficients, self.t_from_x_many(xs))
+
+
+class BezierArcLength(object):
+    """
+    Arc length parameterization of a Bezier curve of any dimension.
+    Curve speed is integrated with adaptive Gauss-Legendre quadrature: intervals are split until the length of
+    their halves matches their own length within tolerance, so straight regions need few table entries. Lengths are
+    mapped back to parameters with a binary search in the table refined with Newton steps
+        Example usage:
+            arc_length = BezierArcLength(points)
+            position = arc_length.point_at_length(arc_length.length * 0.5)
+            evenly_spaced = arc_length.uniform_points(20)
+    """
+
+    def __init__(self, points, tolerance=1e-6, max_iterations=16):
+        """
+        Constructor
+        :param points: list(tuple(float, ...)), control points of the curve
+        :param tolerance: float, maximum length error
+        :param max_iterations: int, maximum number of refinement steps when solving parameters from lengths
+        """
+
+        self._points = [tuple(point) for point in points]
+        self._tolerance = tolerance
+        self._max_iterations = max_iterations
+        dimensions = len(self._points[0])
+        self._coefficients = [power_coefficients([point[i] for point in self._points]) for i in range(dimensions)]
+        self._derivative_coefficients = [
+            [i * c for i, c in enumerate(coefficients)][1:] or [0.0] for coefficients in self._coefficients]
+        self._t_table, self._length_table = self._build_table()
+
+    @property
+    def length(self):
+        return self._length_table[-1]
+
+    @property
+    def table(self):
+        """
+        Returns the arc length table
+        :return: tuple(list(float), list(float)), curve parameters and curve length at each one of them
+        """
+
+        return self._t_table, self._length_table
+
+    def point_at(self, t):
+        """
+        Returns the curve position at the given parameter
+        :param t: float, parameter in 0-1 range
+        :return: tuple(float, ...)
+        """
+
+        return tuple(_polynomial(coefficients, t) for coefficients in self._coefficients)
+
+    def speed_at(self, t):
+        """
+        Returns the length of the curve derivative at the given parameter
+        :param t: float, parameter in 0-1 range
+        :return: float
+        """
 
-    def take_closest(num, collection):
-        return min(collection, key=lambda x_num: abs(x_num - num))
+        return math.sqrt(sum(_polynomial(coefficients, t) ** 2 for coefficients in self._derivative_coefficients))
 
-    full_list = dict()
-    for i in range(101):
-        x, y = bezier(i * 0.01, points)
-        full_list[x] = y
-    if index_x in full_list:
-        return full_list[index_x]
+    def _integrate(self, t_start, t_end):
+        """
+        Internal function that returns the curve length between two parameters
+        :param t_start: float
+        :param t_end: float
+        :return: float
+        """
 
-    closest_number = take_closest(index_x, list(full_list.keys()))
-    return full_list[closest_number]
+        half = (t_end - t_start) * 0.5
+        middle = (t_start + t_end) * 0.5
+
+        return half * sum(weight * self.speed_at(middle + half * node) for node, weight in _GAUSS_LEGENDRE)
+
+    def _build_table(self):
+        """
+        Internal function that builds the arc length table with adaptive subdivision
+        :return: tuple(list(float), list(float))
+        """
+
+        t_table = [0.0]
+        length_table = [0.0]
+        stack = [(0.0, 1.0, self._integrate(0.0, 1.0))]
+        while stack:
+            t_start, t_end, length = stack.pop()
+            t_middle = (t_start + t_end) * 0.5
+            left = self._integrate(t_start, t_middle)
+            right = self._integrate(t_middle, t_end)
+            if abs(left + right - length) <= self._tolerance * (t_end - t_start) or t_end - t_start < 1e-6:
+                t_table.extend((t_middle, t_end))
+                length_table.extend((length_table[-1] + left, length_table[-1] + left + right))
+            else:
+                # right half is pushed first so intervals are completed in parameter order
+                stack.append((t_middle, t_end, right))
+                stack.append((t_start, t_middle, left))
+
+        return t_table, length_table
+
+    def t_at_length(self, length):
+        """
+        Returns the curve parameter at the given distance along the curve
+        :param length: float, distance from the curve start (clamped to the curve length)
+        :return: float
+        """
+
+        if length <= 0.0 or self.length <= 0.0:
+            return 0.0
+        if length >= self.length:
+            return 1.0
+
+        index = min(bisect.bisect_right(self._length_table, length) - 1, len(self._length_table) - 2)
+        t_low, t_high = self._t_table[index], self._t_table[index + 1]
+        t_start = t_low
+        target = length - self._length_table[index]
+        segment_length = self._length_table[index + 1] - self._length_table[index]
+        t = t_low + (t_high - t_low) * (target / segment_length if segment_length else 0.0)
+        for _ in range(self._max_iterations):
+            error = self._integrate(t_start, t) - target
+            if abs(error) <= self._tolerance:
+                break
+            if error > 0:
+                t_high = t
+            else:
+                t_low = t
+            speed = self.speed_at(t)
+            t = t - error / speed if speed else t_low
+            if not t_low < t < t_high:
+                t = (t_low + t_high) * 0.5
+
+        return t
+
+    def point_at_length(self, length):
+        """
+        Returns the curve position at the given distance along the curve
+        :param length: float, distance from the curve start (clamped to the curve length)
+        :return: tuple(float, ...)
+        """
+
+        return self.point_at(self.t_at_length(length))
+
+    def uniform_points(self, count):
+        """
+        Returns positions evenly spaced along the curve (constant speed sampling)
+        :param count: int, number of positions, curve ends included
+        :return: list(tuple(float, ...))
+        """
+
+        if count < 2:
+            return [self.point_at(0.0)][:count]
+
+        return [self.point_at_length(self.length * i / (count - 1)) for i in range(count)]
+
+
+def flatten_bezier(points, tolerance=0.01, max_depth=16):
+    """
+    Returns a polyline approximating a Bezier curve of any dimension within the given distance tolerance.
+    The curve is split with De Casteljau subdivision until the control points of each piece are within tolerance
+    of the line between its ends, so flat regions produce far fewer points than curved ones
+    :param points: list(tuple(float, ...)), control points of the curve
+    :param tolerance: float, maximum distance between the curve and the polyline
+    :param max_depth: int, maximum number of subdivisions of a piece
+    :return: list(tuple(float, ...)), polyline points, curve ends included
+    """
+
+    def _is_flat(control_points):
+        start, end = control_points[0], control_points[-1]
+        chord = [b - a for a, b in zip(start, end)]
+        chord_length_sq = sum(value * value for value in chord)
+        for point in control_points[1:-1]:
+            offset = [b - a for a, b in zip(start, point)]
+            if chord_length_sq > 0:
+                along = sum(a * b for a, b in zip(offset, chord)) / chord_length_sq
+                along = min(max(along, 0.0), 1.0)
+                offset = [value - along * direction for value, direction in zip(offset, chord)]
+            if sum(value * value for value in offset) > tolerance * tolerance:
+                return False
+        return True
+
+    def _split(control_points):
+        left = [control_points[0]]
+        right = [control_points[-1]]
+        current = control_points
+        while len(current) > 1:
+            current = [tuple((a + b) * 0.5 for a, b in zip(p0, p1)) for p0, p1 in zip(current[:-1], current[1:])]
+            left.append(current[0])
+            right.append(current[-1])
+        return left, right[::-1]
+
+    points = [tuple(float(value) for value in point) for point in points]
+    polyline = [points[0]]
+    stack = [(points, 0)]
+    while stack:
+        control_points, depth = stack.pop()
+        if depth >= max_depth or _is_flat(control_points):
+            polyline.append(control_points[-1])
+            continue
+        left, right = _split(control_points)
+        stack.append((right, depth + 1))
+        stack.append((left, depth + 1))
+
+    return polyline
+
+
+def compiled_curve(points):
+    """
+    Returns a CompiledBezierCurve for the given control points, reusing the one built previously for the same points
+    :param points: list(tuple(float, float)), control points of the curve
+    :return: CompiledBezierCurve
+    """
+
+    key = tuple(tuple(point) for point in points)
+    curve = _CURVE_CACHE.get(key)
+    if curve is None:
+        curve = CompiledBezierCurve(key)
+        if len(_CURVE_CACHE) >= _CURVE_CACHE_SIZE:
+            _CURVE_CACHE.clear()
+        _CURVE_CACHE[key] = curve
+
+    return curve
+
+
+def bezier_curve_y_from_x(index_x, points):
+    """
+    Returns the Y value of a 2D bezier curve at the given X
+    :param index_x: float, X value (clamped to the curve ends)
+    :param points: list(tuple(float, float)), control points of the curve. X must not decrease along the curve
+    :return: float
+    """
+
+    return compiled_curve(points).evaluate(index_x)
 
 
 def bezier_curve_range(n, points):
@@ -52,6 +456,74 @@ def bezier_curve_range(n, points):
         yield bezier(t, points)
 
 
+def _check_numpy():
+    if np is None:
+        raise RuntimeError('NumPy is required to use vectorized bezier functionality')
+
+
+def bernstein_basis_at(degree, t_values):
+    """
+    Returns the Bernstein basis matrix of the given degree evaluated at the given parameters
+    :param degree: int, curve degree (number of control points - 1)
+    :param t_values: array like, parameters in 0-1 range
+    :return: np.ndarray, (len(t_values), degree + 1) matrix, row j holds the weight of each control point at t_j
+    """
+
+    _check_numpy()
+
+    t_values = np.asarray(t_values, dtype=np.float64).reshape(-1, 1)
+    exponents = np.arange(degree + 1)
+    coefficients = np.array([binomial(i, degree) for i in range(degree + 1)])
+
+    return coefficients * t_values ** exponents * (1.0 - t_values) ** (degree - exponents)
+
+
+def bernstein_basis(degree, samples):
+    """
+    Returns the Bernstein basis matrix of the given degree for evenly spaced parameters (same ones used by
+    bezier_curve_range). Matrices are cached by (degree, samples) and returned read only
+    :param degree: int, curve degree (number of control points - 1)
+    :param samples: int, number of evenly spaced parameters from 0 to 1 (both included)
+    :return: np.ndarray, (samples, degree + 1) matrix
+    """
+
+    key = (degree, samples)
+    basis = _BASIS_CACHE.get(key)
+    if basis is None:
+        t_values = np.linspace(0.0, 1.0, samples) if samples > 1 else np.zeros(samples)
+        basis = bernstein_basis_at(degree, t_values)
+        basis.flags.writeable = False
+        if len(_BASIS_CACHE) >= _BASIS_CACHE_SIZE:
+            _BASIS_CACHE.clear()
+        _BASIS_CACHE[key] = basis
+
+    return basis
+
+
+def bezier_evaluate(points, samples=None, t_values=None):
+    """
+    Evaluates one or many Bezier curves of any dimension at many parameters with a single matrix multiply
+    :param points: array like, (K, D) control points of a curve or (B, K, D) control points of B curves with the
+        same number of control points
+    :param samples: int, number of evenly spaced parameters from 0 to 1 (uses the cached basis matrix)
+    :param t_values: array like, explicit parameters to evaluate. Used if samples is not given
+    :return: np.ndarray, (N, D) or (B, N, D) evaluated points
+    """
+
+    _check_numpy()
+
+    points = np.asarray(points, dtype=np.float64)
+    degree = points.shape[-2] - 1
+    if samples is not None:
+        basis = bernstein_basis(degree, int(samples))
+    elif t_values is not None:
+        basis = bernstein_basis_at(degree, t_values)
+    else:
+        raise ValueError('Either samples or t_values must be given to evaluate bezier curves')
+
+    return np.matmul(basis, points)
+
+
 def get_data_on_percentage(percentage, points_list):
     base_size = points_list[-1][0]
 
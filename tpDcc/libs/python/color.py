@@ -10,8 +10,29 @@ from __future__ import print_function, division, absolute_import
 import math
 import colorsys
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from tpDcc.libs.python import mathlib
 
+# SRGB transfer lookup tables cached by bit depth
+_SRGB_DECODE_TABLES = dict()
+_SRGB_ENCODE_THRESHOLDS = dict()
+_SRGB_ENCODE_TABLES = dict()
+
+# supported color temperatures range and temperature where Kelvin formulas change
+KELVIN_MIN = 1000
+KELVIN_MAX = 40000
+KELVIN_SPLIT = 6600
+
+# Kelvin to RGB tables cached by resolution
+_KELVIN_TABLES = dict()
+
+# number of colors processed at once by batched recolor functions, keeps temporaries in CPU cache
+_COLOR_CHUNK_SIZE = 16384
+
 
 def convert_hsv_to_rgb(hsv):
     """
@@ -186,12 +207,355 @@ def convert_srgb_list_to_linear(srgb_list, round_number=True):
             for long_number in linear_color_long:
                 rounded_number = round(long_number, 4)
                 linear_color.append(rounded_number)
+            linear_srgb_list.append(linear_color)
         else:
             linear_srgb_list.append(linear_color_long)
 
     return linear_srgb_list
 
 
+def _check_numpy():
+    if np is None:
+        raise RuntimeError('NumPy is required to use color array functionality')
+
+
+def _color_array(colors, in_place):
+    """
+    Internal function that returns the float array to write the converted colors into
+    Colors are stored in the last axis, so (N, 3), (N, 4) and (H, W, C) buffers are supported
+    :param colors: list or np.ndarray, colors to convert
+    :param in_place: bool, whether converted colors are written into the given array
+    :return: np.ndarray
+    """
+
+    _check_numpy()
+    if not in_place:
+        return np.array(colors, dtype=np.float64)
+    if not isinstance(colors, np.ndarray) or colors.dtype.kind != 'f':
+        raise ValueError('In place color conversion needs a float NumPy array')
+
+    return colors
+
+
+def convert_srgb_to_linear_array(srgb_colors, in_place=False):
+    """
+    Converts SRGB colors to linear. Alpha channel, if any, is not modified
+    :param srgb_colors: list or np.ndarray, (..., 3) or (..., 4) SRGB float colors in 0-1 range
+    :param in_place: bool, whether to write converted colors into the given float array
+    :return: np.ndarray, colors converted to linear
+    """
+
+    colors = _color_array(srgb_colors, in_place)
+    rgb = colors[..., :3]
+    a = 0.055
+    low = rgb <= 0.04045
+    high = np.power((rgb + a) * (1.0 / (1 + a)), 2.4)
+    np.multiply(rgb, 1.0 / 12.92, out=rgb, where=low)
+    np.copyto(rgb, high, where=~low)
+
+    return colors
+
+
+def convert_linear_to_srgb_array(linear_colors, in_place=False):
+    """
+    Converts linear colors to SRGB. Alpha channel, if any, is not modified
+    :param linear_colors: list or np.ndarray, (..., 3) or (..., 4) linear float colors in 0-1 range
+    :param in_place: bool, whether to write converted colors into the given float array
+    :return: np.ndarray, colors converted to SRGB
+    """
+
+    colors = _color_array(linear_colors, in_place)
+    rgb = colors[..., :3]
+    a = 0.055
+    low = rgb <= 0.0031308
+    high = (1 + a) * np.power(np.maximum(rgb, 0.0), 1 / 2.4) - a
+    np.multiply(rgb, 12.92, out=rgb, where=low)
+    np.copyto(rgb, high, where=~low)
+
+    return colors
+
+
+def _hue_from_rgb(red, green, blue, max_value, delta):
+    """
+    Internal function that returns the hue (0-1 range) of the given RGB channels as colorsys does
+    :param red: np.ndarray
+    :param green: np.ndarray
+    :param blue: np.ndarray
+    :param max_value: np.ndarray, maximum channel value
+    :param delta: np.ndarray, maximum minus minimum channel value
+    :return: np.ndarray
+    """
+
+    is_red = red == max_value
+    is_green = green == max_value
+    numerator = np.where(is_red, green - blue, np.where(is_green, blue - red, red - green))
+    offset = np.where(is_red, 0.0, np.where(is_green, 2.0, 4.0))
+    grey = delta == 0
+    hue = np.divide(numerator, delta, out=np.zeros_like(numerator), where=~grey)
+    hue += offset
+    hue *= 1.0 / 6.0
+    hue %= 1.0
+    hue[grey] = 0.0
+
+    return hue
+
+
+def convert_rgb_to_hsv_array(rgb_colors, in_place=False):
+    """
+    Converts RGB colors to HSV (0-360, 0-1 ranges) colors. Alpha channel, if any, is not modified
+    :param rgb_colors: list or np.ndarray, (..., 3) or (..., 4) RGB float colors in 0-1 range
+    :param in_place: bool, whether to write converted colors into the given float array
+    :return: np.ndarray, hue, saturation, value colors in 0-360 range, saturation, value in 0-1 range
+    """
+
+    colors = _color_array(rgb_colors, in_place)
+    red, green, blue = colors[..., 0], colors[..., 1], colors[..., 2]
+    max_value = np.maximum(np.maximum(red, green), blue)
+    delta = max_value - np.minimum(np.minimum(red, green), blue)
+    hue = _hue_from_rgb(red, green, blue, max_value, delta) * 360.0
+    saturation = np.where(max_value == 0, 0.0, delta / np.where(max_value == 0, 1.0, max_value))
+    colors[..., 0] = hue
+    colors[..., 1] = saturation
+    colors[..., 2] = max_value
+
+    return colors
+
+
+def convert_hsv_to_rgb_array(hsv_colors, in_place=False):
+    """
+    Converts HSV (0-360, 0-1 ranges) colors to RGB. Alpha channel, if any, is not modified
+    :param hsv_colors: list or np.ndarray, (..., 3) or (..., 4) hue, saturation, value colors
+    :param in_place: bool, whether to write converted colors into the given float array
+    :return: np.ndarray, RGB colors in 0-1 range
+    """
+
+    colors = _color_array(hsv_colors, in_place)
+    hue, saturation, value = colors[..., 0] / 360.0, colors[..., 1].copy(), colors[..., 2].copy()
+    sector = np.floor(hue * 6.0)
+    fraction = hue * 6.0 - sector
+    sector = sector.astype(np.intp) % 6
+    p = value * (1.0 - saturation)
+    q = value * (1.0 - saturation * fraction)
+    t = value * (1.0 - saturation * (1.0 - fraction))
+    colors[..., 0] = np.choose(sector, (value, q, p, p, t, value))
+    colors[..., 1] = np.choose(sector, (t, value, value, q, p, p))
+    colors[..., 2] = np.choose(sector, (p, p, t, value, value, q))
+
+    return colors
+
+
+def convert_rgb_to_hsl_array(rgb_colors, in_place=False):
+    """
+    Converts RGB colors to HSL (0-360, 0-1 ranges) colors. Alpha channel, if any, is not modified
+    :param rgb_colors: list or np.ndarray, (..., 3) or (..., 4) RGB float colors in 0-1 range
+    :param in_place: bool, whether to write converted colors into the given float array
+    :return: np.ndarray, hue, saturation, lightness colors in 0-360 range, saturation, lightness in 0-1 range
+    """
+
+    colors = _color_array(rgb_colors, in_place)
+    red, green, blue = colors[..., 0], colors[..., 1], colors[..., 2]
+    max_value = np.maximum(np.maximum(red, green), blue)
+    min_value = np.minimum(np.minimum(red, green), blue)
+    delta = max_value - min_value
+    total = max_value + min_value
+    lightness = total * 0.5
+    divisor = np.where(lightness <= 0.5, total, 2.0 - total)
+    saturation = np.where(delta == 0, 0.0, delta / np.where(delta == 0, 1.0, divisor))
+    hue = _hue_from_rgb(red, green, blue, max_value, delta) * 360.0
+    colors[..., 0] = hue
+    colors[..., 1] = saturation
+    colors[..., 2] = lightness
+
+    return colors
+
+
+def convert_hsl_to_rgb_array(hsl_colors, in_place=False):
+    """
+    Converts HSL (0-360, 0-1 ranges) colors to RGB. Alpha channel, if any, is not modified
+    :param hsl_colors: list or np.ndarray, (..., 3) or (..., 4) hue, saturation, lightness colors
+    :param in_place: bool, whether to write converted colors into the given float array
+    :return: np.ndarray, RGB colors in 0-1 range
+    """
+
+    colors = _color_array(hsl_colors, in_place)
+    hue, saturation, lightness = colors[..., 0] / 360.0, colors[..., 1].copy(), colors[..., 2].copy()
+    high = np.where(lightness <= 0.5, lightness * (1.0 + saturation), lightness + saturation - lightness * saturation)
+    low = 2.0 * lightness - high
+    for channel, offset in enumerate((1.0 / 3.0, 0.0, -1.0 / 3.0)):
+        channel_hue = (hue + offset) % 1.0
+        value = np.where(
+            channel_hue < 1.0 / 6.0, low + (high - low) * channel_hue * 6.0,
+            np.where(channel_hue < 0.5, high,
+                     np.where(channel_hue < 2.0 / 3.0, low + (high - low) * (2.0 / 3.0 - channel_hue) * 6.0, low)))
+        colors[..., channel] = np.where(saturation == 0, lightness, value)
+
+    return colors
+
+
+def rgb_int_to_float_array(colors, dtype=None):
+    """
+    Turns integer colors in 0-255 range into 0-1 float range
+    :param colors: list or np.ndarray, (..., C) colors in 0-255 range
+    :param dtype: np.dtype or None, float type of the result (float64 by default)
+    :return: np.ndarray, colors in 0-1 range
+    """
+
+    _check_numpy()
+    colors = np.asarray(colors)
+
+    return np.multiply(colors, 1.0 / 255.0, dtype=dtype or np.float64)
+
+
+def rgb_float_to_int_array(colors, dtype=None, out=None):
+    """
+    Turns float colors in 0-1 range into 0-255 integer range. Values are rounded and clamped to 0-255
+    :param colors: list or np.ndarray, (..., C) colors in 0-1 range
+    :param dtype: np.dtype or None, integer type of the result (uint8 by default)
+    :param out: np.ndarray or None, integer array to write the result into
+    :return: np.ndarray, colors in 0-255 range
+    """
+
+    _check_numpy()
+    colors = np.multiply(colors, 255.0)
+    np.rint(colors, out=colors)
+    np.clip(colors, 0, 255, out=colors)
+    if out is not None:
+        out[...] = colors
+        return out
+
+    return colors.astype(dtype or np.uint8)
+
+
+def get_srgb_decode_table(bits=8):
+    """
+    Returns the lookup table that maps every SRGB integer code of the given bit depth to its linear value.
+    Tables are built the first time they are requested and cached
+    :param bits: int, bit depth of the SRGB codes (8 or 16)
+    :return: np.ndarray, read only (2 ** bits,) float array
+    """
+
+    _check_numpy()
+    table = _SRGB_DECODE_TABLES.get(bits)
+    if table is None:
+        table = np.arange(2 ** bits, dtype=np.float64) / (2 ** bits - 1)
+        convert_srgb_to_linear_array(table[:, None], in_place=True)
+        table.flags.writeable = False
+        _SRGB_DECODE_TABLES[bits] = table
+
+    return table
+
+
+def get_srgb_encode_thresholds(bits=8):
+    """
+    Returns the linear values at which SRGB integer codes of the given bit depth change (the linear value of each
+    code plus half a code). Searching a linear value in this table returns its rounded SRGB code exactly.
+    Tables are built the first time they are requested and cached
+    :param bits: int, bit depth of the SRGB codes (8 or 16)
+    :return: np.ndarray, read only (2 ** bits - 1,) float array
+    """
+
+    _check_numpy()
+    thresholds = _SRGB_ENCODE_THRESHOLDS.get(bits)
+    if thresholds is None:
+        max_code = 2 ** bits - 1
+        thresholds = (np.arange(max_code, dtype=np.float64) + 0.5) / max_code
+        convert_srgb_to_linear_array(thresholds[:, None], in_place=True)
+        thresholds.flags.writeable = False
+        _SRGB_ENCODE_THRESHOLDS[bits] = thresholds
+
+    return thresholds
+
+
+def _get_srgb_encode_table(bits):
+    """
+    Internal function that returns the table with the SRGB code at the start of each one of the uniform bins the
+    0-1 linear range is split into. Bins are narrower than the gap between consecutive code thresholds, so a value
+    code is its bin code or the next one. Tables are built the first time they are requested and cached
+    :param bits: int, bit depth of the SRGB codes (8 or 16)
+    :return: tuple(np.ndarray, np.ndarray), bin codes and code thresholds padded with infinity
+    """
+
+    encode_table = _SRGB_ENCODE_TABLES.get(bits)
+    if encode_table is None:
+        thresholds = get_srgb_encode_thresholds(bits)
+        bin_count = 2 ** int(math.ceil(math.log(1.0 / np.min(np.diff(thresholds)), 2)))
+        bin_starts = np.arange(bin_count, dtype=np.float64) / bin_count
+        code_type = np.uint8 if bits <= 8 else np.uint16
+        bin_codes = np.searchsorted(thresholds, bin_starts, side='right').astype(code_type)
+        encode_table = (bin_codes, np.append(thresholds, np.inf))
+        _SRGB_ENCODE_TABLES[bits] = encode_table
+
+    return encode_table
+
+
+def _integer_color_bits(colors, bits):
+    """
+    Internal function that returns the bit depth of the given integer colors
+    :param colors: np.ndarray
+    :param bits: int or None, explicit bit depth
+    :return: int
+    """
+
+    if bits is not None:
+        return bits
+    if colors.dtype == np.uint8:
+        return 8
+    if colors.dtype == np.uint16:
+        return 16
+
+    raise ValueError('Impossible to guess bit depth of {} colors, bits must be given'.format(colors.dtype))
+
+
+def convert_srgb_int_to_linear_array(srgb_colors, bits=None, dtype=None):
+    """
+    Converts 8 or 16 bits integer SRGB colors to linear float colors with a single table lookup.
+    Alpha channel, if any, is only normalized to 0-1 range
+    :param srgb_colors: np.ndarray, (..., 3) or (..., 4) integer colors
+    :param bits: int or None, bit depth of the colors. If not given, it is taken from uint8/uint16 types
+    :param dtype: np.dtype or None, float type of the result (float64 by default)
+    :return: np.ndarray, linear colors in 0-1 range
+    """
+
+    _check_numpy()
+    srgb_colors = np.asarray(srgb_colors)
+    bits = _integer_color_bits(srgb_colors, bits)
+    table = get_srgb_decode_table(bits)
+    if dtype is not None and table.dtype != dtype:
+        table = table.astype(dtype)
+    colors = table[srgb_colors]
+    if colors.shape[-1] > 3:
+        colors[..., 3:] = srgb_colors[..., 3:] / (2 ** bits - 1)
+
+    return colors
+
+
+def convert_linear_to_srgb_int_array(linear_colors, bits=8, out=None):
+    """
+    Converts linear float colors to 8 or 16 bits integer SRGB colors with a table lookup and a single threshold
+    comparison, so results match rounding the analytic conversion without evaluating it. Alpha channel, if any, is
+    only scaled
+    :param linear_colors: np.ndarray, (..., 3) or (..., 4) linear float colors in 0-1 range
+    :param bits: int, bit depth of the result codes (8 or 16)
+    :param out: np.ndarray or None, integer array to write the result into
+    :return: np.ndarray, uint8 or uint16 SRGB colors
+    """
+
+    _check_numpy()
+    linear_colors = np.asarray(linear_colors, dtype=np.float64)
+    if out is None:
+        out = np.empty(linear_colors.shape, dtype=np.uint8 if bits <= 8 else np.uint16)
+    bin_codes, thresholds = _get_srgb_encode_table(bits)
+    rgb = np.clip(linear_colors[..., :3], 0.0, 1.0)
+    codes = bin_codes[np.minimum((rgb * bin_codes.shape[0]).astype(np.intp), bin_codes.shape[0] - 1)]
+    codes += rgb >= thresholds[codes]
+    out[..., :3] = codes
+    if linear_colors.shape[-1] > 3:
+        max_code = 2 ** bits - 1
+        out[..., 3:] = np.clip(np.rint(linear_colors[..., 3:] * max_code), 0, max_code)
+
+    return out
+
+
 def hsl_color_offset_float(rgb_color, hue_offset=0, saturation_offset=0, lightness_offset=0):
     """
     Offsets color with hue, saturation and lightness (brighten/darken) values
@@ -244,6 +608,200 @@ def hsl_color_offset_int(rgb_color, hue_offset=0, saturation_offset=0, lightness
     return rgb_float_to_int(rgb_color)
 
 
+def _color_chunks(colors):
+    """
+    Internal function that yields views of consecutive groups of colors of the given buffer, so batched functions
+    work with temporaries that fit in CPU cache. If the buffer cannot be viewed as a list of colors, it is returned
+    as a single chunk
+    :param colors: np.ndarray, (..., C) colors
+    :return: generator(np.ndarray)
+    """
+
+    flat = colors.reshape(-1, colors.shape[-1])
+    if flat.size and not np.may_share_memory(flat, colors):
+        yield colors
+        return
+    for start in range(0, flat.shape[0], _COLOR_CHUNK_SIZE):
+        yield flat[start:start + _COLOR_CHUNK_SIZE]
+
+
+def _recolor_int_array(colors, recolor_function):
+    """
+    Internal function that applies a float recolor function to integer colors, chunk by chunk
+    :param colors: list or np.ndarray, (..., 3) or (..., 4) colors in 0-255 integer range
+    :param recolor_function: callable, function that modifies in place (N, 3) float colors in 0-1 range
+    :return: np.ndarray, colors in 0-255 range with the integer type of the given colors (uint8 otherwise)
+    """
+
+    _check_numpy()
+    colors = np.ascontiguousarray(colors)
+    dtype = colors.dtype if colors.dtype.kind in 'iu' else np.uint8
+    result = np.empty(colors.shape, dtype=dtype)
+    flat_colors = colors.reshape(-1, colors.shape[-1])
+    flat_result = result.reshape(-1, colors.shape[-1])
+    for start in range(0, flat_colors.shape[0], _COLOR_CHUNK_SIZE):
+        rgb = flat_colors[start:start + _COLOR_CHUNK_SIZE, :3] * (1.0 / 255.0)
+        recolor_function(rgb)
+        rgb *= 255.0
+        np.rint(rgb, out=rgb)
+        np.clip(rgb, 0, 255, out=rgb)
+        flat_result[start:start + _COLOR_CHUNK_SIZE, :3] = rgb
+    if colors.shape[-1] > 3:
+        result[..., 3:] = colors[..., 3:]
+
+    return result
+
+
+def _offset_saturation_rgb(rgb, saturation_offset=0.0, desaturation_level=None):
+    """
+    Internal function that offsets in place the HSV saturation of RGB float colors without going through HSV.
+    With hue and value fixed, every channel keeps its relative distance to the value, so it is enough to scale
+    that distance by the saturation ratio
+    :param rgb: np.ndarray, (N, 3) RGB colors in 0.0-1.0 float range
+    :param saturation_offset: float, saturation offset in 0-1 range
+    :param desaturation_level: float or None, if given, saturation is offset as desaturate does with this level
+    """
+
+    planes = np.ascontiguousarray(rgb.T)
+    red, green, blue = planes
+    value = np.maximum(red, green)
+    np.maximum(value, blue, out=value)
+    saturation = np.minimum(red, green)
+    np.minimum(saturation, blue, out=saturation)
+    np.subtract(value, saturation, out=saturation)
+    saturation /= value + (value == 0)
+    if desaturation_level is not None:
+        # desaturate offsets saturation by a truncated 0-255 integer amount
+        saturation_offset = np.trunc((saturation * desaturation_level) * -255.0) / 255.0
+    new_saturation = np.clip(saturation + saturation_offset, 0.0, 1.0)
+    grey = saturation == 0
+    ratio = new_saturation / (saturation + grey)
+    for plane in planes:
+        plane -= value
+        plane *= ratio
+        plane += value
+    if np.any(new_saturation[grey]):
+        # saturated greys get the red hue, as HSV conversion gives them hue 0
+        planes[0, grey] = value[grey]
+        planes[1:, grey] = value[grey] * (1.0 - new_saturation[grey])
+    rgb[...] = planes.T
+
+
+def _rotate_hue_rgb(rgb, hue_offset):
+    """
+    Internal function that offsets in place the HSV hue of RGB float colors without going through HSV.
+    Value (maximum channel) and chroma (maximum minus minimum channel) do not change with the hue, so each channel
+    is the minimum channel plus chroma scaled by the triangle wave of the rotated hue. Greys have no chroma and
+    are left unchanged, as HSV conversion does
+    :param rgb: np.ndarray, (N, 3) RGB colors in 0.0-1.0 float range
+    :param hue_offset: float, hue offset in degrees
+    """
+
+    # planar channels are faster to work with than strided columns
+    planes = np.ascontiguousarray(rgb.T)
+    red, green, blue = planes
+    max_value = np.maximum(red, green)
+    np.maximum(max_value, blue, out=max_value)
+    min_value = np.minimum(red, green)
+    np.minimum(min_value, blue, out=min_value)
+    chroma = max_value - min_value
+
+    # hue in sextants (-1 to 5 range), as colorsys computes it
+    is_red = red == max_value
+    is_green = green == max_value
+    is_green &= ~is_red
+    is_blue = ~(is_red | is_green)
+    hue = green - blue
+    hue *= is_red
+    term = blue - red
+    term += 2.0 * chroma
+    term *= is_green
+    hue += term
+    np.subtract(red, green, out=term)
+    term += 4.0 * chroma
+    term *= is_blue
+    hue += term
+    hue /= chroma + (chroma == 0)
+
+    # rotated hue plus one, wrapped into 0-6 range
+    hue += (hue_offset / 60.0) % 6.0 + 1.0
+    hue -= 6.0 * (hue >= 6.0)
+
+    # triangle wave of each channel: |((hue + channel offset) mod 6) - 3| - 1, clamped to 0-1 range
+    other = np.empty_like(hue)
+    for channel, offset in enumerate((-4.0, 0.0, -2.0)):
+        wave = planes[channel]
+        np.add(hue, offset, out=wave)
+        np.add(wave, 6.0, out=term)
+        np.abs(term, out=term)
+        np.subtract(wave, 6.0, out=other)
+        np.abs(other, out=other)
+        np.minimum(term, other, out=term)
+        np.abs(wave, out=wave)
+        np.minimum(wave, term, out=wave)
+        wave -= 1.0
+        np.clip(wave, 0.0, 1.0, out=wave)
+        wave *= chroma
+        wave += min_value
+    rgb[...] = planes.T
+
+
+def _hsl_color_offset_rgb(rgb, hue_offset, saturation_offset, lightness_offset):
+    """
+    Internal function that offsets in place RGB float colors with hue, saturation and lightness values.
+    Offsets are applied one after the other as hsl_color_offset_float does, so greys get the red hue when
+    saturated
+    :param rgb: np.ndarray, (N, 3) RGB colors in 0.0-1.0 float range
+    :param hue_offset: float, hue offset in 0-360 range
+    :param saturation_offset: float, saturation offset in 0-1 range
+    :param lightness_offset: float, lightness value offset in -1.0 and 1.0 range
+    """
+
+    if hue_offset:
+        _rotate_hue_rgb(rgb, hue_offset)
+    if saturation_offset:
+        _offset_saturation_rgb(rgb, saturation_offset)
+    if lightness_offset:
+        rgb += lightness_offset
+        np.clip(rgb, 0.0, 1.0, out=rgb)
+
+
+def hsl_color_offset_float_array(rgb_colors, hue_offset=0, saturation_offset=0, lightness_offset=0, in_place=False):
+    """
+    Array version of hsl_color_offset_float. Hue and saturation are offset directly in RGB, without HSV round
+    trips. Alpha channel, if any, is not modified
+    :param rgb_colors: list or np.ndarray, (..., 3) or (..., 4) RGB colors in 0.0-1.0 float range
+    :param hue_offset: float, hue offset in 0-360 range
+    :param saturation_offset: float, saturation offset in 0-1 range
+    :param lightness_offset: float, lightness value offset, lighten(0.2) or darken (-0.3) in -1.0 and 1.0 range
+    :param in_place: bool, whether to write offset colors into the given float array
+    :return: np.ndarray, colors in 0-1 range
+    """
+
+    colors = _color_array(rgb_colors, in_place)
+    for chunk in _color_chunks(colors):
+        # contiguous copies of chunks are faster to work with than strided views
+        rgb = np.ascontiguousarray(chunk[..., :3])
+        _hsl_color_offset_rgb(rgb, hue_offset, saturation_offset, lightness_offset)
+        chunk[..., :3] = rgb
+
+    return colors
+
+
+def hsl_color_offset_int_array(rgb_colors, hue_offset=0, saturation_offset=0, lightness_offset=0):
+    """
+    Array version of hsl_color_offset_int. Alpha channel, if any, is not modified
+    :param rgb_colors: list or np.ndarray, (..., 3) or (..., 4) RGB colors in 0-255 integer range
+    :param hue_offset: float, hue offset in 0-360 range
+    :param saturation_offset: float, saturation offset in 0-255 range
+    :param lightness_offset: float, lightness value offset in 0-255 range
+    :return: np.ndarray, colors in 0-255 range with the integer type of the given colors (uint8 otherwise)
+    """
+
+    return _recolor_int_array(rgb_colors, lambda rgb: _hsl_color_offset_rgb(
+        rgb, hue_offset, float(saturation_offset) / 255.0, float(lightness_offset) / 255.0))
+
+
 def desaturate(color, level=1.0):
     """
     Returns a desaturated color
@@ -261,6 +819,29 @@ def desaturate(color, level=1.0):
     return desaturated
 
 
+def _desaturate_rgb(rgb, level):
+    """
+    Internal function that desaturates in place RGB float colors as desaturate does
+    :param rgb: np.ndarray, (N, 3) RGB colors in 0.0-1.0 float range
+    :param level: float, level of desaturation from 0 to 1.0
+    """
+
+    _offset_saturation_rgb(rgb, desaturation_level=level)
+    rgb -= 40.0 / 255.0
+    np.clip(rgb, 0.0, 1.0, out=rgb)
+
+
+def desaturate_array(colors, level=1.0):
+    """
+    Array version of desaturate. Alpha channel, if any, is not modified
+    :param colors: list or np.ndarray, (..., 3) or (..., 4) colors in 0-255 integer range
+    :param level: float, level of desaturation from 0 to 1.0. 1.0 is full desaturation and 0 same saturation
+    :return: np.ndarray, desaturated colors with the integer type of the given colors (uint8 otherwise)
+    """
+
+    return _recolor_int_array(colors, lambda rgb: _desaturate_rgb(rgb, level))
+
+
 def offset_hue_color(hsv, offset):
     """
     Offsets the hue value in -360-360 range by the given offset amount and keeps range by looping
@@ -341,6 +922,21 @@ def hue_shift(color_to_shift, shift_amount):
     return rgb_rotator.apply(*color_to_shift)
 
 
+def hue_shift_array(colors_to_shift, shift_amount, in_place=False):
+    """
+    Array version of hue_shift. Alpha channel, if any, is not modified
+    :param colors_to_shift: list or np.ndarray, (..., 3) or (..., 4) colors in 0-255 range
+    :param shift_amount: int, distance and direction of the color shift
+    :param in_place: bool, whether to write shifted colors into the given float array
+    :return: np.ndarray, colors with shifted hue
+    """
+
+    rgb_rotator = RGBRotate()
+    rgb_rotator.set_hue_rotation(shift_amount)
+
+    return rgb_rotator.apply_array(colors_to_shift, in_place=in_place)
+
+
 def string_is_hex(color_str):
     """
     Returns whether or not given string is a valid hexadecimal string
@@ -417,6 +1013,171 @@ def convert_kelvin_to_rgb(color_temperature):
     return red, green, blue
 
 
+def _kelvin_channels(tmp_internal, high):
+    """
+    Internal function that returns the RGB channels of the Kelvin formulas used below or above 6600K
+    :param tmp_internal: np.ndarray, (N,) color temperatures in hundreds of kelvin degrees
+    :param high: bool, whether to use formulas for temperatures above 6600K
+    :return: np.ndarray, (N, 3) SRGB colors in 0-255 float range
+    """
+
+    rgb = np.empty(tmp_internal.shape + (3,), dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if high:
+            rgb[..., 0] = 329.698727446 * np.power(tmp_internal - 60, -0.1332047592)
+            rgb[..., 1] = 288.1221695283 * np.power(tmp_internal - 60, -0.0755148492)
+            rgb[..., 2] = 255
+        else:
+            rgb[..., 0] = 255
+            rgb[..., 1] = 99.4708025861 * np.log(tmp_internal) - 161.1195681661
+            # below 1900K blue formula is negative, so clamping gives the expected 0
+            rgb[..., 2] = 138.5177312231 * np.log(tmp_internal - 10) - 305.0447927307
+
+    return np.clip(rgb, 0, 255, out=rgb)
+
+
+def _kelvin_second_derivative_bound(tmp_internal, high):
+    """
+    Internal function that returns the absolute second derivative (per kelvin degree) of the Kelvin formulas of
+    each channel at the given temperatures. All of them decrease with temperature, so the value at the start of an
+    interval bounds the whole interval
+    :param tmp_internal: np.ndarray, (N,) color temperatures in hundreds of kelvin degrees
+    :param high: bool, whether to use formulas for temperatures above 6600K
+    :return: np.ndarray, (N, 3) array
+    """
+
+    bound = np.zeros(tmp_internal.shape + (3,), dtype=np.float64)
+    with np.errstate(divide='ignore'):
+        if high:
+            bound[..., 0] = 329.698727446 * 0.1332047592 * 1.1332047592 * np.power(
+                tmp_internal - 60, -2.1332047592)
+            bound[..., 1] = 288.1221695283 * 0.0755148492 * 1.0755148492 * np.power(
+                tmp_internal - 60, -2.0755148492)
+        else:
+            bound[..., 1] = 99.4708025861 / (tmp_internal * tmp_internal)
+            bound[..., 2] = 138.5177312231 / ((tmp_internal - 10) * (tmp_internal - 10))
+
+    return bound / 10000.0
+
+
+class KelvinTable(object):
+    """
+    Precomputed Kelvin to RGB table in the supported 1000-40000K range with linear interpolation.
+    Formulas change at 6600K, so colors below and above that temperature are stored in separate tables, and the
+    temperatures where channels get clamped are added as knots. Each table interval is then smooth in all channels,
+    so interpolation error is bound by step * step / 8 * max|f''|, which is stored in max_error (0-255 range):
+    about 0.19 with 100K steps and 0.0021 with 10K steps
+    """
+
+    def __init__(self, step=100):
+        """
+        Constructor
+        :param step: float, distance in kelvin degrees between table knots
+        """
+
+        _check_numpy()
+        self._step = step
+        # temperatures (in hundreds of kelvin degrees) where a channel reaches 0 or 255
+        low_breaks = [10 + math.exp(305.0447927307 / 138.5177312231), math.exp(416.1195681661 / 99.4708025861)]
+        high_breaks = [60 + math.pow(255 / 329.698727446, 1 / -0.1332047592)]
+        self._low_knots, self._low_values, self._low_slopes, low_error = self._build(
+            KELVIN_MIN, KELVIN_SPLIT, low_breaks, high=False)
+        self._high_knots, self._high_values, self._high_slopes, high_error = self._build(
+            KELVIN_SPLIT, KELVIN_MAX, high_breaks, high=True)
+        self._max_error = max(low_error, high_error)
+
+    @property
+    def step(self):
+        return self._step
+
+    @property
+    def max_error(self):
+        return self._max_error
+
+    def _build(self, start, end, breaks, high):
+        """
+        Internal function that builds the table of one of the temperature ranges
+        :param start: float, first temperature of the range
+        :param end: float, last temperature of the range
+        :param breaks: list(float), temperatures, in hundreds of kelvin degrees, to add as knots
+        :param high: bool, whether the range is above 6600K
+        :return: tuple(np.ndarray, np.ndarray, np.ndarray, float), knots, colors, slopes and error bound
+        """
+
+        knots = np.arange(start, end, self._step, dtype=np.float64)
+        knots = np.union1d(np.append(knots, end), [value * 100.0 for value in breaks if start < value * 100.0 < end])
+        values = _kelvin_channels(knots / 100.0, high)
+        widths = np.diff(knots)
+        slopes = np.diff(values, axis=0) / widths[:, None]
+        # channels clamped in a whole interval are constant there
+        clamped = (values[:-1] == values[1:]) & ((values[:-1] == 0) | (values[:-1] == 255))
+        curvature = np.where(clamped, 0.0, _kelvin_second_derivative_bound(knots[:-1] / 100.0, high))
+        error = widths * widths / 8.0 * curvature.max(axis=1)
+
+        return knots, values, slopes, float(error.max())
+
+    @staticmethod
+    def _interpolate(temperatures, knots, values, slopes):
+        index = np.clip(np.searchsorted(knots, temperatures, side='right') - 1, 0, slopes.shape[0] - 1)
+        return values[index] + slopes[index] * (temperatures - knots[index])[..., None]
+
+    def __call__(self, color_temperatures):
+        """
+        Returns the interpolated colors of the given temperatures
+        :param color_temperatures: float, list(float) or np.ndarray, color temperatures in kelvin degrees
+        :return: np.ndarray, (..., 3) SRGB colors in 0-255 float range
+        """
+
+        temperatures = np.clip(np.asarray(color_temperatures, dtype=np.float64), KELVIN_MIN, KELVIN_MAX)
+        low = temperatures < KELVIN_SPLIT
+        rgb = self._interpolate(temperatures, self._high_knots, self._high_values, self._high_slopes)
+        if np.any(low):
+            rgb[low] = self._interpolate(temperatures[low], self._low_knots, self._low_values, self._low_slopes)
+        split = temperatures == KELVIN_SPLIT
+        if np.any(split):
+            rgb[split] = convert_kelvin_to_rgb(KELVIN_SPLIT)
+
+        return rgb
+
+
+def get_kelvin_table(step=100):
+    """
+    Returns the cached Kelvin to RGB table with the given resolution, building it the first time it is requested
+    :param step: float, distance in kelvin degrees between table knots
+    :return: KelvinTable
+    """
+
+    table = _KELVIN_TABLES.get(step)
+    if table is None:
+        table = _KELVIN_TABLES[step] = KelvinTable(step)
+
+    return table
+
+
+def convert_kelvin_to_rgb_array(color_temperatures, step=None):
+    """
+    Converts many color temperatures from Kelvin to RGB at once
+    :param color_temperatures: list(float) or np.ndarray, color temperatures in kelvin degrees
+    :param step: float or None, if given, colors are interpolated from the cached table with knots every step
+        kelvin degrees (see KelvinTable for the error bound); otherwise formulas are evaluated
+    :return: np.ndarray, (..., 3) SRGB colors in 0-255 float range
+    """
+
+    _check_numpy()
+    if step is not None:
+        return get_kelvin_table(step)(color_temperatures)
+
+    tmp_internal = np.clip(np.asarray(color_temperatures, dtype=np.float64), KELVIN_MIN, KELVIN_MAX) / 100.0
+    high = tmp_internal > 66
+    rgb = np.empty(tmp_internal.shape + (3,), dtype=np.float64)
+    rgb[high] = _kelvin_channels(tmp_internal[high], True)
+    rgb[~high] = _kelvin_channels(tmp_internal[~high], False)
+    # blue formula changes at 6600K itself
+    rgb[tmp_internal == 66, 2] = 255
+
+    return rgb
+
+
 class RGBRotate(object):
     """
     Hue Rotation, using the matrix rotation method.
@@ -448,6 +1209,36 @@ class RGBRotate(object):
         bx = r * self.matrix[2][0] + g * self.matrix[2][1] + b * self.matrix[2][2]
         return mathlib.clamp(rx, 0, 255), mathlib.clamp(gx, 0, 255), mathlib.clamp(bx, 0, 255)
 
+    def apply_array(self, pixels, in_place=False, max_value=255):
+        """
+        Applies the rotation to all given pixels with a single matrix multiplication
+        Alpha channel, if any, is not modified
+        :param pixels: list or np.ndarray, (..., 3) or (..., 4) colors. Integer colors are rounded and keep their type
+        :param in_place: bool, whether to write rotated colors into the given array
+        :param max_value: float, rotated channels are clamped to 0-max_value range
+        :return: np.ndarray, rotated colors
+        """
+
+        _check_numpy()
+        if in_place and not isinstance(pixels, np.ndarray):
+            raise ValueError('In place color rotation needs a NumPy array')
+        colors = np.asarray(pixels)
+        integer = colors.dtype.kind in 'iu'
+        if not integer:
+            colors = _color_array(pixels, in_place)
+        elif not in_place:
+            colors = colors.copy()
+        matrix = np.asarray(self.matrix, dtype=np.float64 if integer else colors.dtype).T
+        for chunk in _color_chunks(colors):
+            rgb = chunk[..., :3]
+            rotated = np.matmul(rgb, matrix)
+            if integer:
+                np.rint(rotated, out=rotated)
+            np.clip(rotated, 0, max_value, out=rotated)
+            rgb[...] = rotated
+
+        return colors
+
 
 def compare_rgb_colors_tolerance(first_rgb_color, second_rgb_color, tolerance):
     """
@@ -8,7 +8,11 @@ https://gist.github.com/econchick/4666413
 
 from __future__ import print_function, division, absolute_import
 
-from collections import defaultdict, deque
+import math
+import heapq
+import weakref
+from array import array
+from collections import defaultdict, deque, OrderedDict
 
 
 class Graph(object):
@@ -21,58 +25,678 @@ class Graph(object):
         self.nodes = set()
         self.edges = defaultdict(list)
         self.distances = {}
+        self._observers = weakref.WeakSet()
+
+    def __getstate__(self):
+        # observers are weak references and cannot be pickled, copies start without observers
+        state = self.__dict__.copy()
+        state.pop('_observers', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._observers = weakref.WeakSet()
 
     def add_node(self, value):
+        is_new = value not in self.nodes
         self.nodes.add(value)
+        if is_new:
+            for observer in list(self._observers):
+                observer.node_added(value)
 
     def add_edge(self, from_node, to_node, distance):
+        old_distance = self.distances.get((from_node, to_node))
         self.edges[from_node].append(to_node)
         self.edges[to_node].append(from_node)
         self.distances[(from_node, to_node)] = distance
+        for observer in list(self._observers):
+            observer.edge_changed(from_node, to_node, old_distance, distance)
+
+    def add_observer(self, observer):
+        """
+        Registers an object that is notified when nodes or edges are added through add_node and add_edge.
+        Observers must implement node_added(node) and edge_changed(from_node, to_node, old_distance, distance).
+        They are weakly referenced
+        :param observer: object
+        """
+
+        self._observers.add(observer)
+
+    def remove_observer(self, observer):
+        self._observers.discard(observer)
+
+    def neighbours(self, node):
+        """
+        Returns the nodes that can be reached from the given node through one edge
+        :param node: graph node
+        :return: list(tuple(node, float)), reachable nodes and distance to them
+        """
+
+        if node not in self.nodes:
+            return []
+
+        distances = self.distances
+        return [(edge, distances[(node, edge)]) for edge in self.edges[node] if (node, edge) in distances]
+
+    def reverse_neighbours(self, node):
+        """
+        Returns the nodes that can reach the given node through one edge
+        :param node: graph node
+        :return: list(tuple(node, float)), nodes and their distance to the given node
+        """
+
+        distances = self.distances
+        return [(edge, distances[(edge, node)]) for edge in self.edges[node] if
+                (edge, node) in distances and edge in self.nodes]
+
+    def to_csr(self):
+        """
+        Returns a compressed sparse row copy of this graph, much faster to search for big graphs
+        :return: CSRGraph
+        """
+
+        return CSRGraph.from_graph(self)
+
+
+class CSRGraph(object):
+    """
+    Graph stored in compressed sparse row format: the outgoing edges of node i are targets[indptr[i]:indptr[i + 1]]
+    with their weights at the same positions. Nodes are referred by their index, nodes list maps them back to the
+    original node values
+    """
+
+    def __init__(self, nodes, indptr, targets, weights):
+        """
+        Constructor
+        :param nodes: list, node values, in index order
+        :param indptr: array, (V + 1, ) offset of the first outgoing edge of each node
+        :param targets: array, (E, ) target node index of each edge
+        :param weights: array, (E, ) weight of each edge
+        """
+
+        self.nodes = nodes
+        self.node_ids = dict((node, i) for i, node in enumerate(nodes))
+        self.indptr = indptr
+        self.targets = targets
+        self.weights = weights
+        self._reversed = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def neighbours(self, node):
+        """
+        Returns the nodes that can be reached from the given node through one edge
+        :param node: int, node index
+        :return: iterable(tuple(int, float)), reachable node indices and distance to them
+        """
+
+        start, end = self.indptr[node], self.indptr[node + 1]
+        return zip(self.targets[start:end], self.weights[start:end])
+
+    def reverse_neighbours(self, node):
+        """
+        Returns the nodes that can reach the given node through one edge
+        :param node: int, node index
+        :return: iterable(tuple(int, float)), node indices and their distance to the given node
+        """
+
+        return self.reversed().neighbours(node)
+
+    def reversed(self):
+        """
+        Returns the graph with all its edges reversed. Built on first use
+        :return: CSRGraph
+        """
+
+        if self._reversed is None:
+            sources = array('l')
+            for node in range(len(self.nodes)):
+                sources.extend(array('l', [node]) * (self.indptr[node + 1] - self.indptr[node]))
+            self._reversed = CSRGraph.from_edges(self.nodes, self.targets, sources, self.weights)
+            self._reversed._reversed = self
+
+        return self._reversed
+
+    @classmethod
+    def from_edges(cls, nodes, sources, targets, weights, directed=True):
+        """
+        Creates a graph from parallel lists of edges
+        :param nodes: int or list, number of nodes (nodes are then 0 to N - 1) or list of node values
+        :param sources: list(int), source node index of each edge
+        :param targets: list(int), target node index of each edge
+        :param weights: list(float), weight of each edge
+        :param directed: bool, Whether edges can only be traversed from source to target or in both directions
+        :return: CSRGraph
+        """
+
+        if not isinstance(nodes, (list, tuple)):
+            nodes = list(range(nodes))
+        if not directed:
+            sources, targets = list(sources) + list(targets), list(targets) + list(sources)
+            weights = list(weights) * 2
+
+        # counting sort of the edges by source node
+        node_count = len(nodes)
+        indptr = array('l', [0]) * (node_count + 1)
+        for source in sources:
+            indptr[source + 1] += 1
+        for i in range(node_count):
+            indptr[i + 1] += indptr[i]
+
+        fill = array('l', indptr[:-1])
+        sorted_targets = array('l', [0]) * len(sources)
+        sorted_weights = array('d', [0.0]) * len(sources)
+        for source, target, weight in zip(sources, targets, weights):
+            position = fill[source]
+            sorted_targets[position] = target
+            sorted_weights[position] = weight
+            fill[source] = position + 1
+
+        return cls(list(nodes), indptr, sorted_targets, sorted_weights)
+
+    @classmethod
+    def from_graph(cls, graph):
+        """
+        Creates a graph from a Graph. Edges keep the direction they have in graph distances
+        :param graph: Graph
+        :return: CSRGraph
+        """
 
+        nodes = list(graph.nodes)
+        node_ids = dict((node, i) for i, node in enumerate(nodes))
+        for from_node, to_node in graph.distances:
+            for node in (from_node, to_node):
+                if node not in node_ids:
+                    node_ids[node] = len(nodes)
+                    nodes.append(node)
+
+        sources = [node_ids[from_node] for from_node, _ in graph.distances]
+        targets = [node_ids[to_node] for _, to_node in graph.distances]
+
+        return cls.from_edges(nodes, sources, targets, list(graph.distances.values()))
+
+    def dijkstra(self, source, destination=None):
+        """
+        Computes shortest distances from a node using a binary heap, O(E log V)
+        :param source: int, index of the source node
+        :param destination: int or None, if given, the search stops as soon as the shortest path to this node is known
+        :return: tuple(array, array), distance (inf if not reached) and predecessor (-1 for none) of each node
+        """
+
+        indptr = self.indptr
+        targets = self.targets
+        weights = self.weights
+        distances = array('d', [float('inf')]) * len(self.nodes)
+        predecessors = array('l', [-1]) * len(self.nodes)
+        settled = bytearray(len(self.nodes))
+
+        distances[source] = 0.0
+        heap = [(0.0, source)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if settled[node]:
+                continue
+            settled[node] = 1
+            if node == destination:
+                break
+            for position in range(indptr[node], indptr[node + 1]):
+                target = targets[position]
+                new_distance = distance + weights[position]
+                if new_distance < distances[target]:
+                    distances[target] = new_distance
+                    predecessors[target] = node
+                    heapq.heappush(heap, (new_distance, target))
+
+        return distances, predecessors
+
+    def multi_source_dijkstra(self, sources, max_distance=None):
+        """
+        Computes, in a single heap pass, the distance to the nearest source of every node, which source it is and
+        the predecessor of the node in the path to it
+        :param sources: list(int), indices of the source nodes
+        :param max_distance: float or None, if given, nodes farther than this from all sources are not expanded
+        :return: tuple(array, array, array), distance (inf if not reached), nearest source (position in sources,
+            -1 if not reached) and predecessor (-1 for none) of each node
+        """
+
+        indptr = self.indptr
+        targets = self.targets
+        weights = self.weights
+        if max_distance is None:
+            max_distance = float('inf')
+        distances = array('d', [float('inf')]) * len(self.nodes)
+        labels = array('l', [-1]) * len(self.nodes)
+        predecessors = array('l', [-1]) * len(self.nodes)
+        settled = bytearray(len(self.nodes))
+
+        heap = list()
+        for label, source in enumerate(sources):
+            if distances[source] > 0.0:
+                distances[source] = 0.0
+                labels[source] = label
+                heap.append((0.0, source))
+        heapq.heapify(heap)
+
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if settled[node]:
+                continue
+            settled[node] = 1
+            label = labels[node]
+            for position in range(indptr[node], indptr[node + 1]):
+                target = targets[position]
+                new_distance = distance + weights[position]
+                if new_distance < distances[target] and new_distance <= max_distance:
+                    distances[target] = new_distance
+                    labels[target] = label
+                    predecessors[target] = node
+                    heapq.heappush(heap, (new_distance, target))
+
+        return distances, labels, predecessors
+
+    def shortest_path(self, origin, destination):
+        """
+        Returns the shortest path between two nodes
+        :param origin: node value of the path start
+        :param destination: node value of the path end
+        :return: tuple(float, list), path distance and node values of the path
+        """
+
+        source = self.node_ids[origin]
+        target = self.node_ids[destination]
+        distances, predecessors = self.dijkstra(source, destination=target)
+        if distances[target] == float('inf'):
+            raise KeyError(destination)
+
+        return distances[target], [self.nodes[node] for node in _build_path(predecessors, source, target, -1)]
+
+
+def _build_path(predecessors, origin, destination, missing=None):
+    """
+    Internal function that walks predecessors back from destination to origin
+    :param predecessors: dict or array, predecessor of each node
+    :param origin: path start
+    :param destination: path end
+    :param missing: value used in predecessors for nodes without predecessor
+    :return: list, path from origin to destination
+    """
+
+    full_path = deque([destination])
+    node = destination
+    while node != origin:
+        node = predecessors[node]
+        if node == missing:
+            raise KeyError(destination)
+        full_path.appendleft(node)
+
+    return list(full_path)
+
+
+def dijkstra(graph, initial, destination=None):
+    """
+    Computes shortest distances from a node using a binary heap, O(E log V)
+    :param graph: Graph
+    :param initial: start node
+    :param destination: node or None, if given, the search stops as soon as the shortest path to this node is known
+    :return: tuple(dict, dict), distance and predecessor of each reached node
+    """
 
-def dijkstra(graph, initial):
     visited = {initial: 0}
     path = {}
 
-    nodes = set(graph.nodes)
-
-    while nodes:
-        min_node = None
-        for node in nodes:
-            if node in visited:
-                if min_node is None:
-                    min_node = node
-                elif visited[node] < visited[min_node]:
-                    min_node = node
-        if min_node is None:
+    settled = set()
+    heap = [(0, 0, initial)]  # counter avoids comparing nodes with equal distances
+    counter = 0
+    while heap:
+        current_weight, _, min_node = heapq.heappop(heap)
+        if min_node in settled or min_node not in graph.nodes:
+            continue
+        settled.add(min_node)
+        if min_node == destination:
             break
 
-        nodes.remove(min_node)
-        current_weight = visited[min_node]
-
         for edge in graph.edges[min_node]:
-            try:
-                weight = current_weight + graph.distances[(min_node, edge)]
-            except Exception:
+            # edges are stored in both directions but can only be traversed as they were added
+            distance = graph.distances.get((min_node, edge))
+            if distance is None:
                 continue
+            weight = current_weight + distance
             if edge not in visited or weight < visited[edge]:
                 visited[edge] = weight
                 path[edge] = min_node
+                counter += 1
+                heapq.heappush(heap, (weight, counter, edge))
 
     return visited, path
 
 
-def shortest_path(graph, origin, destination):
-    visited, paths = dijkstra(graph, origin)
-    full_path = deque()
-    _destination = paths[destination]
+def multi_source_dijkstra(graph, seeds, max_distance=None):
+    """
+    Computes, in a single search, the distance from every node to its nearest seed. Useful to compute falloff
+    weights from several seeds at once instead of running dijkstra once per seed and merging the results
+    :param graph: Graph or CSRGraph
+    :param seeds: list, seed nodes
+    :param max_distance: float or None, if given, the search stops expanding nodes farther than this from all seeds
+    :return: tuple(dict, dict, dict), distance to the nearest seed, nearest seed (position in seeds) and predecessor
+        of each reached node, keyed by node (seeds have no predecessor). Use CSRGraph.multi_source_dijkstra to get
+        dense arrays indexed by node index instead
+    """
+
+    if isinstance(graph, CSRGraph):
+        distances, labels, predecessors = graph.multi_source_dijkstra(
+            [graph.node_ids[seed] for seed in seeds], max_distance=max_distance)
+        nodes = graph.nodes
+        reached = [index for index, label in enumerate(labels) if label >= 0]
+        return (
+            dict((nodes[index], distances[index]) for index in reached),
+            dict((nodes[index], labels[index]) for index in reached),
+            dict((nodes[index], nodes[predecessors[index]]) for index in reached if predecessors[index] >= 0))
+
+    if max_distance is None:
+        max_distance = float('inf')
+    visited = dict()
+    labels = dict()
+    path = dict()
+
+    heap = list()
+    for counter, seed in enumerate(seeds):
+        if seed not in visited:
+            visited[seed] = 0
+            labels[seed] = counter
+            heap.append((0, counter, seed))
+    heapq.heapify(heap)
 
-    while _destination != origin:
-        full_path.appendleft(_destination)
-        _destination = paths[_destination]
+    settled = set()
+    counter = len(heap)
+    while heap:
+        current_weight, _, min_node = heapq.heappop(heap)
+        if min_node in settled:
+            continue
+        settled.add(min_node)
+        for edge, distance in graph.neighbours(min_node):
+            weight = current_weight + distance
+            if (edge not in visited or weight < visited[edge]) and weight <= max_distance:
+                visited[edge] = weight
+                labels[edge] = labels[min_node]
+                path[edge] = min_node
+                counter += 1
+                heapq.heappush(heap, (weight, counter, edge))
+
+    return visited, labels, path
+
+
+def euclidean_heuristic(positions=None):
+    """
+    Returns an A* heuristic that estimates the remaining distance as the straight line distance between nodes.
+    It is admissible (and consistent) as long as edge distances are not shorter than the distance between the
+    positions of their nodes, which is the case for distances measured along lattices or curves
+    :param positions: dict or list, position of each node (indexed by node index for CSRGraph). If not given,
+        nodes themselves are used as positions
+    :return: callable, heuristic(node, destination)
+    """
+
+    def _heuristic(node, destination):
+        if positions is not None:
+            node, destination = positions[node], positions[destination]
+        return math.sqrt(sum((a - b) ** 2 for a, b in zip(node, destination)))
+
+    return _heuristic
+
+
+def _search_nodes(graph, origin, destination):
+    """
+    Internal function that returns the nodes the search functions work with (node indices for CSRGraph)
+    :param graph: Graph or CSRGraph
+    :param origin: path start node
+    :param destination: path end node
+    :return: tuple(object, object)
+    """
+
+    if isinstance(graph, CSRGraph):
+        return graph.node_ids[origin], graph.node_ids[destination]
+
+    return origin, destination
+
+
+def _search_path(graph, path):
+    if isinstance(graph, CSRGraph):
+        return [graph.nodes[node] for node in path]
+
+    return path
+
+
+def astar(graph, origin, destination, heuristic):
+    """
+    Returns the shortest path between two nodes using A* search. Nodes are expanded by their distance from origin
+    plus the heuristic estimate to destination, so the search goes towards destination instead of growing in all
+    directions
+    :param graph: Graph or CSRGraph
+    :param origin: path start node
+    :param destination: path end node
+    :param heuristic: callable, heuristic(node, destination) returning an estimate that never exceeds the real
+        remaining distance (see euclidean_heuristic). For CSRGraph, it receives node indices
+    :return: tuple(float, list), path distance and nodes of the path
+    """
+
+    source, target = _search_nodes(graph, origin, destination)
+    distances = {source: 0}
+    predecessors = {}
+    counter = 0
+    heap = [(heuristic(source, target), counter, 0, source)]
+    while heap:
+        _, _, distance, node = heapq.heappop(heap)
+        if distance > distances[node]:
+            continue
+        if node == target:
+            return distance, _search_path(graph, _build_path(predecessors, source, target))
+        for edge, weight in graph.neighbours(node):
+            new_distance = distance + weight
+            if edge not in distances or new_distance < distances[edge]:
+                distances[edge] = new_distance
+                predecessors[edge] = node
+                counter += 1
+                heapq.heappush(heap, (new_distance + heuristic(edge, target), counter, new_distance, edge))
+
+    raise KeyError(destination)
+
+
+def bidirectional_dijkstra(graph, origin, destination):
+    """
+    Returns the shortest path between two nodes growing two Dijkstra searches at the same time, one from origin
+    and one from destination (over reversed edges), until they meet
+    :param graph: Graph or CSRGraph
+    :param origin: path start node
+    :param destination: path end node
+    :return: tuple(float, list), path distance and nodes of the path
+    """
+
+    source, target = _search_nodes(graph, origin, destination)
+    if source == target:
+        return 0, _search_path(graph, [source])
+
+    expand = (graph.neighbours, graph.reverse_neighbours)
+    distances = ({source: 0}, {target: 0})
+    predecessors = ({}, {})
+    heaps = ([(0, 0, source)], [(0, 0, target)])
+    counter = 0
+    best_distance = float('inf')
+    meeting_node = None
+    while heaps[0] and heaps[1]:
+        # no shorter path can be found once both frontiers together are farther than the best path found
+        if heaps[0][0][0] + heaps[1][0][0] >= best_distance:
+            break
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        other_distances = distances[1 - side]
+        distance, _, node = heapq.heappop(heaps[side])
+        if distance > distances[side][node]:
+            continue
+        for edge, weight in expand[side](node):
+            new_distance = distance + weight
+            if edge not in distances[side] or new_distance < distances[side][edge]:
+                distances[side][edge] = new_distance
+                predecessors[side][edge] = node
+                counter += 1
+                heapq.heappush(heaps[side], (new_distance, counter, edge))
+                if edge in other_distances and new_distance + other_distances[edge] < best_distance:
+                    best_distance = new_distance + other_distances[edge]
+                    meeting_node = edge
+
+    if meeting_node is None:
+        raise KeyError(destination)
 
-    full_path.appendleft(origin)
-    full_path.append(destination)
+    path = _build_path(predecessors[0], source, meeting_node)
+    node = meeting_node
+    while node != target:
+        node = predecessors[1][node]
+        path.append(node)
 
-    return visited[destination], list(full_path)
+    return best_distance, _search_path(graph, path)
+
+
+def shortest_path(graph, origin, destination, heuristic=None, bidirectional=False):
+    """
+    Returns the shortest path between two nodes
+    :param graph: Graph or CSRGraph
+    :param origin: path start node
+    :param destination: path end node
+    :param heuristic: callable or None, if given, A* search is used with this heuristic (see astar)
+    :param bidirectional: bool, Whether to search from both ends at the same time or not (see bidirectional_dijkstra)
+    :return: tuple(float, list), path distance and nodes of the path
+    """
+
+    if heuristic is not None:
+        return astar(graph, origin, destination, heuristic)
+    if bidirectional:
+        return bidirectional_dijkstra(graph, origin, destination)
+    if isinstance(graph, CSRGraph):
+        return graph.shortest_path(origin, destination)
+
+    visited, paths = dijkstra(graph, origin, destination=destination)
+
+    return visited[destination], _build_path(paths, origin, destination)
+
+
+class PathOracle(object):
+    """
+    Answers repeated shortest path queries over a Graph caching the shortest path tree of each origin.
+    Trees are evicted in least recently used order and kept up to date when the graph changes through add_node or
+    add_edge: new or shorter edges are repaired incrementally, longer edges used by a tree invalidate it.
+    Changes made directly to graph dictionaries are not tracked, call invalidate after them
+        Example usage:
+            oracle = PathOracle(graph, max_trees=8)
+            distance, path = oracle.shortest_path(origin, destination)
+    """
+
+    def __init__(self, graph, max_trees=16):
+        """
+        Constructor
+        :param graph: Graph, graph to query
+        :param max_trees: int, maximum number of origins whose shortest path tree is kept in memory
+        """
+
+        self._graph = graph
+        self._max_trees = max(1, int(max_trees))
+        self._trees = OrderedDict()
+        graph.add_observer(self)
+
+    def __len__(self):
+        return len(self._trees)
+
+    @property
+    def graph(self):
+        return self._graph
+
+    def shortest_path_tree(self, origin):
+        """
+        Returns the shortest path tree of the given origin, computing it if it is not cached
+        :param origin: graph node
+        :return: tuple(dict, dict), distance and predecessor of each reached node (same as dijkstra). They are
+            shared with the cache and must not be modified
+        """
+
+        tree = self._trees.pop(origin, None)
+        if tree is None:
+            tree = dijkstra(self._graph, origin)
+            while len(self._trees) >= self._max_trees:
+                self._trees.popitem(last=False)
+        self._trees[origin] = tree
+
+        return tree
+
+    def distance(self, origin, destination):
+        """
+        Returns the shortest distance between two nodes
+        :param origin: path start node
+        :param destination: path end node
+        :return: float
+        """
+
+        return self.shortest_path_tree(origin)[0][destination]
+
+    def shortest_path(self, origin, destination):
+        """
+        Returns the shortest path between two nodes
+        :param origin: path start node
+        :param destination: path end node
+        :return: tuple(float, list), path distance and nodes of the path
+        """
+
+        visited, paths = self.shortest_path_tree(origin)
+
+        return visited[destination], _build_path(paths, origin, destination)
+
+    def invalidate(self, origin=None):
+        """
+        Removes cached trees
+        :param origin: graph node or None, origin whose tree is removed. If None, all trees are removed
+        """
+
+        if origin is None:
+            self._trees.clear()
+        else:
+            self._trees.pop(origin, None)
+
+    def node_added(self, node):
+        # nodes are only expanded once they are graph nodes, so trees already reaching it can change
+        for origin in [origin for origin, (visited, _) in self._trees.items() if node in visited]:
+            del self._trees[origin]
+
+    def edge_changed(self, from_node, to_node, old_distance, distance):
+        for origin in list(self._trees):
+            visited, paths = self._trees[origin]
+            if from_node not in visited or from_node not in self._graph.nodes:
+                continue
+            if old_distance is not None and distance > old_distance:
+                if paths.get(to_node) == from_node:
+                    del self._trees[origin]
+                continue
+            new_distance = visited[from_node] + distance
+            if to_node not in visited or new_distance < visited[to_node]:
+                self._repair(visited, paths, to_node, new_distance, from_node)
+
+    def _repair(self, visited, paths, node, distance, predecessor):
+        """
+        Internal function that propagates a distance decrease through a cached tree
+        :param visited: dict, distances of the tree
+        :param paths: dict, predecessors of the tree
+        :param node: graph node whose distance decreased
+        :param distance: float, new distance of the node
+        :param predecessor: graph node, new predecessor of the node
+        """
+
+        visited[node] = distance
+        paths[node] = predecessor
+        counter = 0
+        heap = [(distance, counter, node)]
+        while heap:
+            current_weight, _, min_node = heapq.heappop(heap)
+            if current_weight > visited[min_node]:
+                continue
+            for edge, edge_distance in self._graph.neighbours(min_node):
+                weight = current_weight + edge_distance
+                if edge not in visited or weight < visited[edge]:
+                    visited[edge] = weight
+                    paths[edge] = min_node
+                    counter += 1
+                    heapq.heappush(heap, (weight, counter, edge))
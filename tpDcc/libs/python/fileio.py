@@ -341,18 +341,14 @@ class FileVersion(object):
         if not pass_files:
             return
 
-        quick_sort = sort.QuickNumbersListSort(list_of_numbers=number_list)
-        quick_sort.set_follower_list(pass_files)
-        pass_files = quick_sort.run()
-
-        pass_dict = dict()
-        for i in range(len(number_list)):
-            pass_dict[pass_files[0][i]] = pass_files[1][i]
+        sorter = sort.MultiKeySort(number_list)
+        sorted_numbers = sorter.take(number_list)
+        pass_dict = dict(zip(sorted_numbers, sorter.apply(pass_files)))
 
         if not return_version_numbers_also:
             return pass_dict
         else:
-            return pass_dict, pass_files[0]
+            return pass_dict, sorted_numbers
 
     def get_version_numbers(self):
         """
@@ -9,6 +9,32 @@ https://github.com/cryptogoth/skc-python/blob/master/skc/kdtree.py
 
 from __future__ import print_function, division, absolute_import
 
+import json
+import time
+import heapq
+import struct
+import logging
+import multiprocessing
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+LOGGER = logging.getLogger('tpDcc-libs-python')
+
+# state of parallel query worker processes (tree and query blocks they are attached to)
+_WORKER_STATE = dict()
+
+
+def _check_numpy():
+    if np is None:
+        raise RuntimeError('NumPy is required to use array based KDTree functionality')
+
 
 def square_distance(point_a, pointB):
     # squared euclidean distance
@@ -19,6 +45,38 @@ def square_distance(point_a, pointB):
     return distance
 
 
+def square_distance_function(query_point):
+    """
+    Returns a function that computes the squared euclidean distance from the given point to other points.
+    2D and 3D points get unrolled versions of square_distance
+    :param query_point: iterable, point distances are measured from
+    :return: callable
+    """
+
+    dimensions = len(query_point)
+    if dimensions == 3:
+        qx, qy, qz = query_point
+
+        def _square_distance_3d(point):
+            dx = point[0] - qx
+            dy = point[1] - qy
+            dz = point[2] - qz
+            return dx * dx + dy * dy + dz * dz
+
+        return _square_distance_3d
+    elif dimensions == 2:
+        qx, qy = query_point
+
+        def _square_distance_2d(point):
+            dx = point[0] - qx
+            dy = point[1] - qy
+            return dx * dx + dy * dy
+
+        return _square_distance_2d
+
+    return lambda point: square_distance(point, query_point)
+
+
 class KDTreeNode(object):
     def __init__(self, point, left, right):
         self.point = point
@@ -32,36 +90,477 @@ class KDTreeNode(object):
 class KDTreeNeighbours(object):
     """
     Internal structure used in nearest-neighbours search.
+    Best neighbours are kept in a bounded max-heap so the farthest one can be checked and replaced in O(log t)
     """
 
     def __init__(self, query_point, t):
         self.query_point = query_point
         self.t = t  # neighbours wanted
-        self.largest_distance = 0  # squared
-        self.current_best = []
+        self.largest_distance = float('inf')  # squared, infinite until t neighbours have been found
+        self.current_best = []  # heap of (-squared distance, -insertion order, point)
+        self._count = 0
+        self._square_distance = square_distance_function(query_point)
 
     def calculate_largest(self):
-        if self.t >= len(self.current_best):
-            self.largest_distance = self.current_best[-1][1]
-        else:
-            self.largest_distance = self.current_best[self.t - 1][1]
+        if len(self.current_best) >= self.t:
+            self.largest_distance = -self.current_best[0][0]
 
     def add(self, point):
-        sd = square_distance(point, self.query_point)
-        # run through current_best, try to find appropriate place
-        for i, e in enumerate(self.current_best):
-            if i == self.t:
-                return  # enough neighbours, this one is farther, let's forget it
-            if e[1] > sd:
-                self.current_best.insert(i, [point, sd])
-                self.calculate_largest()
-                return
-        # append it to the end otherwise
-        self.current_best.append([point, sd])
-        self.calculate_largest()
+        sd = self._square_distance(point)
+        if len(self.current_best) < self.t:
+            self._count += 1
+            heapq.heappush(self.current_best, (-sd, -self._count, point))
+            self.calculate_largest()
+        elif self.current_best and sd < self.largest_distance:
+            # enough neighbours, this one replaces the farthest of them (no neighbours are kept if t is 0)
+            self._count += 1
+            heapq.heapreplace(self.current_best, (-sd, -self._count, point))
+            self.calculate_largest()
 
     def get_best(self):
-        return [element[0] for element in self.current_best[:self.t]]
+        return [element[2] for element in sorted(self.current_best, reverse=True)]
+
+
+class KDTreeArrays(object):
+    """
+    Flat, array based representation of a KDTree used by batched queries.
+    Points are stored reordered so every node owns a contiguous [start, end) range of them. Internal nodes split
+    their range at the median along split_dim: left child holds the points <= split_value and right child the
+    points >= split_value. Nodes with leaf_size points or less are leaves (left and right are -1)
+    """
+
+    def __init__(self, data, indices, node_start, node_end, node_split_dim, node_split_value, node_left, node_right):
+        """
+        Constructor
+        :param data: np.ndarray, (N, D) point coordinates in tree order
+        :param indices: np.ndarray, (N, ) original index of each point in tree order
+        :param node_start: np.ndarray, first point (inclusive) of each node
+        :param node_end: np.ndarray, last point (exclusive) of each node
+        :param node_split_dim: np.ndarray, splitting axis of each node (-1 for leaves)
+        :param node_split_value: np.ndarray, splitting plane position of each node
+        :param node_left: np.ndarray, left child of each node (-1 for leaves)
+        :param node_right: np.ndarray, right child of each node (-1 for leaves)
+        """
+
+        self.data = data
+        self.indices = indices
+        self.node_start = node_start
+        self.node_end = node_end
+        self.node_split_dim = node_split_dim
+        self.node_split_value = node_split_value
+        self.node_left = node_left
+        self.node_right = node_right
+        self._positions = None
+
+    # binary file layout: magic, format version, header size, JSON header and 64 bytes aligned raw arrays
+    FILE_MAGIC = b'TPKDTREE'
+    FILE_VERSION = 1
+    FILE_ALIGNMENT = 64
+    FILE_ARRAYS = (
+        ('data', '<f8'), ('indices', '<i8'), ('node_start', '<i8'), ('node_end', '<i8'),
+        ('node_split_dim', '<i8'), ('node_split_value', '<f8'), ('node_left', '<i8'), ('node_right', '<i8'))
+
+    @property
+    def dimensions(self):
+        return self.data.shape[1]
+
+    @property
+    def size(self):
+        return self.data.shape[0]
+
+    @classmethod
+    def build(cls, data, leaf_size=16):
+        """
+        Builds a new array based tree from the given points
+        :param data: array like of shape (N, D), points to store in the tree
+        :param leaf_size: int, maximum number of points stored in a leaf node
+        :return: KDTreeArrays
+        """
+
+        _check_numpy()
+
+        data = np.asarray(data, dtype=np.float64)
+        if data.ndim == 1:
+            data = data.reshape(-1, 1) if data.size else data.reshape(0, 0)
+        if data.ndim != 2:
+            raise ValueError('KDTree data must be a (N, D) array of points')
+
+        point_count, dimensions = data.shape
+        leaf_size = max(1, int(leaf_size))
+
+        # only the original indices of the points are reordered, node by node, in place. Point rows are gathered
+        # once in tree order when all nodes are split
+        indices = np.arange(point_count, dtype=np.intp)
+
+        # split nodes have children of at least (leaf_size + 1) // 2 points, which bounds the node count
+        max_leaves = point_count // ((leaf_size + 1) // 2 or 1) + 1
+        max_nodes = 2 * max_leaves - 1
+        node_start = np.zeros(max_nodes, dtype=np.intp)
+        node_end = np.zeros(max_nodes, dtype=np.intp)
+        node_split_dim = np.full(max_nodes, -1, dtype=np.intp)
+        node_split_value = np.zeros(max_nodes, dtype=np.float64)
+        node_left = np.full(max_nodes, -1, dtype=np.intp)
+        node_right = np.full(max_nodes, -1, dtype=np.intp)
+        node_end[0] = point_count
+        node_count = 1
+
+        # explicit stack instead of recursion so deep trees do not hit the interpreter recursion limit
+        stack = [(0, 0)]
+        while stack:
+            node, depth = stack.pop()
+            start, end = int(node_start[node]), int(node_end[node])
+            if end - start <= leaf_size:
+                continue
+
+            # linear time median selection (introselect): smaller values end up before the median, greater after
+            axis = depth % dimensions
+            median = (start + end) // 2
+            node_indices = indices[start:end]
+            node_indices[:] = node_indices[np.argpartition(data[node_indices, axis], median - start)]
+
+            left, right = node_count, node_count + 1
+            node_count += 2
+            node_split_dim[node] = axis
+            node_split_value[node] = data[indices[median], axis]
+            node_left[node] = left
+            node_right[node] = right
+            node_start[left], node_end[left] = start, median
+            node_start[right], node_end[right] = median, end
+            stack.append((right, depth + 1))
+            stack.append((left, depth + 1))
+
+        return cls(
+            data=data[indices], indices=indices,
+            node_start=node_start[:node_count].copy(), node_end=node_end[:node_count].copy(),
+            node_split_dim=node_split_dim[:node_count].copy(),
+            node_split_value=node_split_value[:node_count].copy(),
+            node_left=node_left[:node_count].copy(), node_right=node_right[:node_count].copy())
+
+    def _file_layout(self):
+        """
+        Internal function that returns the binary layout used to store the tree arrays
+        :return: tuple(bytes, list(tuple(np.ndarray, int)), int), file prefix (magic, version, header and padding),
+            arrays with their byte offset and total size in bytes
+        """
+
+        header = {'arrays': list()}
+        offset = 0
+        arrays = list()
+        for name, dtype in self.FILE_ARRAYS:
+            array = np.ascontiguousarray(getattr(self, name), dtype=dtype)
+            header['arrays'].append({'name': name, 'dtype': dtype, 'shape': list(array.shape), 'offset': offset})
+            arrays.append((array, offset))
+            offset += -(-array.nbytes // self.FILE_ALIGNMENT) * self.FILE_ALIGNMENT
+
+        header_data = json.dumps(header).encode('utf-8')
+        prefix = self.FILE_MAGIC + struct.pack('<II', self.FILE_VERSION, len(header_data)) + header_data
+        prefix += b'\0' * (-len(prefix) % self.FILE_ALIGNMENT)
+        arrays = [(array, len(prefix) + array_offset) for array, array_offset in arrays]
+
+        return prefix, arrays, len(prefix) + offset
+
+    def byte_size(self):
+        """
+        Returns the size in bytes of the tree once stored with save or write_to_buffer
+        :return: int
+        """
+
+        return self._file_layout()[2]
+
+    def save(self, file_path):
+        """
+        Stores the tree arrays in a compact binary file that can be memory mapped when loaded
+        :param file_path: str, path of the file to write
+        """
+
+        prefix, arrays, total_size = self._file_layout()
+        with open(file_path, 'wb') as fh:
+            fh.write(prefix)
+            for array, array_offset in arrays:
+                fh.write(array.tobytes())
+                fh.write(b'\0' * (-array.nbytes % self.FILE_ALIGNMENT))
+
+    def write_to_buffer(self, buffer):
+        """
+        Stores the tree arrays in the given writable buffer (for example a shared memory block) using the same
+        layout as save
+        :param buffer: writable buffer of at least byte_size() bytes
+        """
+
+        prefix, arrays, total_size = self._file_layout()
+        target = np.frombuffer(buffer, dtype=np.uint8, count=total_size)
+        target[:len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+        for array, array_offset in arrays:
+            target[array_offset:array_offset + array.nbytes] = array.reshape(-1).view(np.uint8)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Creates tree arrays that are views over a buffer written with save or write_to_buffer (no data is copied)
+        :param buffer: np.ndarray, uint8 array with the tree data
+        :return: KDTreeArrays
+        """
+
+        _check_numpy()
+
+        magic_size = len(cls.FILE_MAGIC)
+        if buffer[:magic_size].tobytes() != cls.FILE_MAGIC:
+            raise ValueError('Buffer does not contain KDTree data')
+        version, header_size = struct.unpack('<II', buffer[magic_size:magic_size + 8].tobytes())
+        if version != cls.FILE_VERSION:
+            raise ValueError('KDTree data version {} is not supported'.format(version))
+        header = json.loads(buffer[magic_size + 8:magic_size + 8 + header_size].tobytes().decode('utf-8'))
+
+        prefix_size = magic_size + 8 + header_size
+        data_offset = prefix_size + (-prefix_size % cls.FILE_ALIGNMENT)
+        arrays = dict()
+        for array_info in header['arrays']:
+            dtype = np.dtype(array_info['dtype'])
+            shape = tuple(array_info['shape'])
+            start = data_offset + array_info['offset']
+            count = int(np.prod(shape)) if shape else 1
+            array = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(shape)
+            arrays[array_info['name']] = array
+
+        return cls(**arrays)
+
+    @classmethod
+    def load(cls, file_path, mmap=True):
+        """
+        Loads tree arrays stored with save
+        :param file_path: str, path of the file to load
+        :param mmap: bool, Whether to memory map the arrays (read only, zero copy and shared between processes
+            opening the same file) or to read them into memory
+        :return: KDTreeArrays
+        """
+
+        _check_numpy()
+
+        if mmap:
+            buffer = np.memmap(file_path, dtype=np.uint8, mode='r')
+        else:
+            buffer = np.fromfile(file_path, dtype=np.uint8)
+        try:
+            return cls.from_buffer(buffer)
+        except ValueError as exc:
+            raise ValueError('{}: "{}"'.format(exc, file_path))
+
+    def points(self, indices):
+        """
+        Returns the coordinates of the points with the given original indices
+        :param indices: array like, original indices of the points
+        :return: np.ndarray, (N, D) point coordinates
+        """
+
+        if self._positions is None:
+            self._positions = np.empty(self.size, dtype=np.intp)
+            self._positions[self.indices] = np.arange(self.size, dtype=np.intp)
+
+        return self.data[self._positions[indices]]
+
+    def _range_square_distances(self, query_points, query_ids, node_ids):
+        """
+        Returns the squared distances between each query point and all the points of its paired node
+        :param query_points: np.ndarray, (M, D) query points
+        :param query_ids: np.ndarray, (P, ) query point of each (query, node) pair
+        :param node_ids: np.ndarray, (P, ) node of each (query, node) pair
+        :return: tuple(np.ndarray, np.ndarray), (P, W) squared distances (inf for padding) and tree positions
+        """
+
+        starts = self.node_start[node_ids]
+        counts = self.node_end[node_ids] - starts
+        width = int(counts.max()) if len(counts) else 0
+        columns = np.arange(width, dtype=np.intp)
+        positions = starts[:, None] + columns
+        invalid = columns >= counts[:, None]
+        np.minimum(positions, max(self.size - 1, 0), out=positions)
+
+        # one coordinate at a time, gathering (P, W) planes is much faster than gathering (P, W, D) points
+        pair_points = query_points[query_ids]
+        square_distances = np.zeros(positions.shape)
+        for axis in range(self.dimensions):
+            diff = self.data[:, axis][positions]
+            diff -= pair_points[:, axis, None]
+            diff *= diff
+            square_distances += diff
+        square_distances[invalid] = np.inf
+        positions[invalid] = -1
+
+        return square_distances, positions
+
+    def _initial_bounds(self, query_points, k):
+        """
+        Returns an upper bound of the squared k-th neighbour distance of each query point. Each point descends
+        greedily through the tree while the next node still contains at least k points and the node it stops
+        at is searched brute force
+        :param query_points: np.ndarray, (M, D) query points
+        :param k: int, number of neighbours wanted
+        :return: np.ndarray, (M, ) squared distance bounds (inf if the tree has less than k points)
+        """
+
+        query_count = len(query_points)
+        query_ids = np.arange(query_count, dtype=np.intp)
+        nodes = np.zeros(query_count, dtype=np.intp)
+        active = query_ids[self.node_left[nodes] >= 0]
+        while len(active):
+            current = nodes[active]
+            axis = self.node_split_dim[current]
+            go_left = query_points[active, axis] < self.node_split_value[current]
+            child = np.where(go_left, self.node_left[current], self.node_right[current])
+            descend = (self.node_end[child] - self.node_start[child]) >= k
+            active = active[descend]
+            nodes[active] = child[descend]
+            active = active[self.node_left[nodes[active]] >= 0]
+
+        square_distances, _ = self._range_square_distances(query_points, query_ids, nodes)
+        if square_distances.shape[1] < k:
+            return np.full(query_count, np.inf)
+
+        return np.partition(square_distances, k - 1, axis=1)[:, k - 1]
+
+    def _candidate_leaves(self, query_points, bounds):
+        """
+        Returns all (query, leaf) pairs whose leaf cell may contain points within the bound of the query point.
+        Traverses the tree level by level for all the queries at once, discarding far subtrees with the splitting
+        plane test. The squared distance from the query point to each visited cell is updated incrementally
+        :param query_points: np.ndarray, (M, D) query points
+        :param bounds: np.ndarray, (M, ) squared search radius of each query point
+        :return: tuple(np.ndarray, np.ndarray), query ids and leaf node ids of the candidate pairs
+        """
+
+        query_count, dimensions = query_points.shape
+        query_ids = np.arange(query_count, dtype=np.intp)
+        nodes = np.zeros(query_count, dtype=np.intp)
+        cell_distances = np.zeros(query_count)
+        offsets = np.zeros((query_count, dimensions))
+
+        leaf_queries = list()
+        leaf_nodes = list()
+        while len(nodes):
+            is_leaf = self.node_left[nodes] < 0
+            leaf_queries.append(query_ids[is_leaf])
+            leaf_nodes.append(nodes[is_leaf])
+
+            internal = ~is_leaf
+            query_ids = query_ids[internal]
+            nodes = nodes[internal]
+            cell_distances = cell_distances[internal]
+            offsets = offsets[internal]
+            if not len(nodes):
+                break
+
+            rows = np.arange(len(nodes))
+            axis = self.node_split_dim[nodes]
+            diff = query_points[query_ids, axis] - self.node_split_value[nodes]
+            near = np.where(diff < 0, self.node_left[nodes], self.node_right[nodes])
+            far = np.where(diff < 0, self.node_right[nodes], self.node_left[nodes])
+
+            far_distances = cell_distances - offsets[rows, axis] ** 2 + diff ** 2
+            keep = far_distances <= bounds[query_ids]
+            far_offsets = offsets[keep]
+            far_offsets[np.arange(len(far_offsets)), axis[keep]] = diff[keep]
+
+            query_ids = np.concatenate((query_ids, query_ids[keep]))
+            nodes = np.concatenate((near, far[keep]))
+            cell_distances = np.concatenate((cell_distances, far_distances[keep]))
+            offsets = np.concatenate((offsets, far_offsets))
+
+        return np.concatenate(leaf_queries), np.concatenate(leaf_nodes)
+
+    def knn(self, query_points, k):
+        """
+        Returns the k nearest neighbours of the given query points
+        :param query_points: np.ndarray, (M, D) query points
+        :param k: int, number of neighbours wanted
+        :return: tuple(np.ndarray, np.ndarray), (M, k) original indices and squared distances of the neighbours
+        """
+
+        query_count = len(query_points)
+        bounds = self._initial_bounds(query_points, k)
+        query_ids, node_ids = self._candidate_leaves(query_points, bounds)
+
+        order = np.argsort(query_ids, kind='mergesort')
+        query_ids = query_ids[order]
+        square_distances, positions = self._range_square_distances(query_points, query_ids, node_ids[order])
+
+        # only candidates within the bound can be among the k best (the leaf the bound comes from always is). They
+        # are gathered in their own query row, in query order, so the k best are selected in one pass
+        kept = square_distances <= bounds[query_ids][:, None]
+        kept_queries = np.broadcast_to(query_ids[:, None], kept.shape)[kept]
+        counts = np.bincount(kept_queries, minlength=query_count)
+        ranks = np.arange(len(kept_queries)) - np.repeat(np.cumsum(counts) - counts, counts)
+        max_count = int(counts.max()) if len(counts) else 0
+        candidate_distances = np.full((query_count, max(max_count, k)), np.inf)
+        candidate_positions = np.full(candidate_distances.shape, -1, dtype=np.intp)
+        candidate_distances[kept_queries, ranks] = square_distances[kept]
+        candidate_positions[kept_queries, ranks] = positions[kept]
+
+        if k == 1:
+            best = np.argmin(candidate_distances, axis=1)[:, None]
+        elif candidate_distances.shape[1] > k:
+            best = np.argpartition(candidate_distances, k - 1, axis=1)[:, :k]
+        else:
+            best = np.broadcast_to(np.arange(k), (query_count, k))
+        rows = np.arange(query_count)[:, None]
+        best = best[rows, np.argsort(candidate_distances[rows, best], axis=1, kind='mergesort')]
+
+        best_distances = candidate_distances[rows, best]
+        best_positions = candidate_positions[rows, best]
+        best_indices = np.full(best_positions.shape, -1, dtype=np.intp)
+        found = best_positions >= 0
+        best_indices[found] = self.indices[best_positions[found]]
+
+        return best_indices, best_distances
+
+    def within_radius(self, query_points, radius):
+        """
+        Returns all the points that are within the given radius of the query points
+        :param query_points: np.ndarray, (M, D) query points
+        :param radius: float or np.ndarray, search radius (per query point if an array is given)
+        :return: tuple(np.ndarray, np.ndarray), query ids and original indices of the found points, sorted by
+            query id and point index
+        """
+
+        square_radius = np.broadcast_to(np.asarray(radius, dtype=np.float64) ** 2, (len(query_points), ))
+        query_ids, node_ids = self._candidate_leaves(query_points, square_radius)
+        square_distances, positions = self._range_square_distances(query_points, query_ids, node_ids)
+        found = square_distances <= square_radius[query_ids][:, None]
+        query_ids = np.broadcast_to(query_ids[:, None], found.shape)[found]
+        indices = self.indices[positions[found]]
+        order = np.lexsort((indices, query_ids))
+
+        return query_ids[order], indices[order]
+
+    def within_box(self, box_min, box_max):
+        """
+        Returns all the points inside the given axis aligned box (bounds included)
+        :param box_min: np.ndarray, (D, ) minimum corner of the box
+        :param box_max: np.ndarray, (D, ) maximum corner of the box
+        :return: np.ndarray, sorted original indices of the points inside the box
+        """
+
+        nodes = np.zeros(1, dtype=np.intp)
+        leaves = list()
+        while len(nodes):
+            is_leaf = self.node_left[nodes] < 0
+            leaves.append(nodes[is_leaf])
+            nodes = nodes[~is_leaf]
+            axis = self.node_split_dim[nodes]
+            split_value = self.node_split_value[nodes]
+
+            # same splitting plane test as nearest neighbour search, a side is only visited if the box reaches it
+            nodes = np.concatenate((
+                self.node_left[nodes][box_min[axis] <= split_value],
+                self.node_right[nodes][box_max[axis] >= split_value]))
+
+        leaves = np.concatenate(leaves)
+        starts = self.node_start[leaves]
+        counts = self.node_end[leaves] - starts
+        positions = np.arange(counts.sum(), dtype=np.intp) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        points = self.data[positions]
+        inside = np.all((points >= box_min) & (points <= box_max), axis=1)
+
+        return np.sort(self.indices[positions[inside]])
 
 
 class KDTree(object):
@@ -75,9 +574,23 @@ class KDTree(object):
 
             tree = KDTree.construct_from_data(data)
             nearest = tree.query(point, t=4) # find nearest 4 points
+
+            # batched search, returns (N, 4) index and distance arrays
+            indices, distances = tree.query_many(points, k=4)
     """
 
-    def __init__(self, data):
+    # number of query points processed at once by batched queries (bounds temporary memory)
+    QUERY_CHUNK_SIZE = 4096
+
+    def __init__(self, data, leaf_size=16, array_based=False):
+        """
+        Constructor
+        :param data: iterable of points (which are also iterable, same length)
+        :param leaf_size: int, maximum number of points stored in each leaf of the array based tree
+        :param array_based: bool, Whether to store the tree only as flat arrays (built in linear time per level,
+            without creating a KDTreeNode per point) or not. Requires NumPy
+        """
+
         def build_kdtree(point_list, depth):
             # code based on wikipedia article: http://en.wikipedia.org/wiki/Kd-tree
             if not point_list:
@@ -97,26 +610,192 @@ class KDTree(object):
                               right=build_kdtree(point_list[median + 1:], depth + 1))
             return node
 
-        self.root_node = build_kdtree(data, depth=0)
+        self._leaf_size = max(1, int(leaf_size))
+        self._arrays = None
+        if array_based:
+            self._points = data
+            self._arrays = KDTreeArrays.build(data, leaf_size=self._leaf_size)
+            self.root_node = None
+        else:
+            # the tree is built from a copy, sorting the given list would break the indices returned by queries
+            self._points = list(data)
+            self.root_node = build_kdtree(list(self._points), depth=0)
 
     @staticmethod
     def construct_from_data(data):
         tree = KDTree(data)
         return tree
 
-    def query(self, query_point, t=1):
-        statistics = {'nodes_visited': 0, 'far_search': 0, 'leafs_reached': 0}
+    @staticmethod
+    def construct_from_array(data, leaf_size=16):
+        """
+        Creates a tree stored only as flat index/coordinate arrays. Faster to build and much lighter than the node
+        based tree, specially for big point clouds
+        :param data: array like of shape (N, D), points to store in the tree
+        :param leaf_size: int, maximum number of points stored in each leaf node
+        :return: KDTree
+        """
+
+        tree = KDTree(data, leaf_size=leaf_size, array_based=True)
+        return tree
+
+    @staticmethod
+    def load(file_path, mmap=True):
+        """
+        Loads a tree stored with save. The loaded tree is array based (see construct_from_array)
+        :param file_path: str, path of the tree file
+        :param mmap: bool, Whether to memory map the tree arrays instead of reading them. Mapped trees open almost
+            instantly and their pages are shared by all the processes that load the same file
+        :return: KDTree
+        """
+
+        tree = KDTree([])
+        tree._points = None
+        tree._arrays = KDTreeArrays.load(file_path, mmap=mmap)
+        return tree
+
+    def save(self, file_path):
+        """
+        Stores the array representation of the tree in a compact binary file
+        :param file_path: str, path of the file to write
+        """
+
+        self.get_arrays().save(file_path)
+
+    def get_arrays(self):
+        """
+        Returns the flat array representation of the tree used by batched queries. Built on first use
+        :return: KDTreeArrays
+        """
+
+        if self._arrays is None:
+            self._arrays = KDTreeArrays.build(self._points, leaf_size=self._leaf_size)
+
+        return self._arrays
+
+    def _check_query_points(self, query_points):
+        """
+        Internal function that returns the given points as a (N, D) float array matching tree dimensions
+        :param query_points: array like, single point or list of points
+        :return: np.ndarray
+        """
+
+        arrays = self.get_arrays()
+        query_points = np.asarray(query_points, dtype=np.float64)
+        if query_points.ndim == 1:
+            query_points = query_points.reshape(1, -1)
+        if arrays.size and query_points.shape[1] != arrays.dimensions:
+            raise ValueError('Query points dimensions ({}) do not match tree dimensions ({})'.format(
+                query_points.shape[1], arrays.dimensions))
+
+        return query_points
+
+    def query_many_parallel(self, query_points, k=1, processes=None):
+        """
+        Returns the k nearest neighbours of many points at once, splitting the work across a pool of processes
+        that share the tree through shared memory. Use KDTreeParallelQuery directly to reuse the pool across calls
+        :param query_points: array like of shape (N, D), points we want to find the neighbours of
+        :param k: int, number of neighbours wanted for each point
+        :param processes: int, number of worker processes (by default, the number of CPUs)
+        :return: tuple(np.ndarray, np.ndarray), same as query_many
+        """
+
+        with KDTreeParallelQuery(self, processes=processes) as executor:
+            return executor.query_many(query_points, k=k)
+
+    def query_many(self, query_points, k=1):
+        """
+        Returns the k nearest neighbours of many points at once
+        :param query_points: array like of shape (N, D), points we want to find the neighbours of
+        :param k: int, number of neighbours wanted for each point
+        :return: tuple(np.ndarray, np.ndarray), (N, k) arrays with the neighbour indices (into the data the tree was
+            built from) and euclidean distances, sorted from nearest to farthest. If the tree contains less than k
+            points, missing neighbours have -1 index and inf distance
+        """
+
+        arrays = self.get_arrays()
+        k = int(k)
+        if k < 1:
+            raise ValueError('Number of neighbours must be greater than 0: {}'.format(k))
+
+        query_points = self._check_query_points(query_points)
+        indices = np.full((len(query_points), k), -1, dtype=np.intp)
+        distances = np.full((len(query_points), k), np.inf)
+        for chunk_start in range(0, len(query_points), self.QUERY_CHUNK_SIZE):
+            chunk = slice(chunk_start, chunk_start + self.QUERY_CHUNK_SIZE)
+            indices[chunk], distances[chunk] = arrays.knn(query_points[chunk], k)
+
+        return indices, np.sqrt(distances)
+
+    def query_radius(self, query_point, radius):
+        """
+        Returns all the points within the given distance of a point
+        :param query_point: iterable, point we want to find the neighbours of
+        :param radius: float, search radius
+        :return: np.ndarray, sorted indices (into the data the tree was built from) of the found points
+        """
+
+        return self.query_radius_many([query_point], radius)[0]
+
+    def query_radius_many(self, query_points, radius):
+        """
+        Returns all the points within the given distance of each one of the given points
+        :param query_points: array like of shape (N, D), points we want to find the neighbours of
+        :param radius: float or array like of shape (N, ), search radius (one per query point if an array is given)
+        :return: list(np.ndarray), sorted indices (into the data the tree was built from) of the points found for
+            each query point
+        """
+
+        arrays = self.get_arrays()
+        query_points = self._check_query_points(query_points)
+        radius = np.broadcast_to(np.asarray(radius, dtype=np.float64), (len(query_points), ))
+
+        result = list()
+        for chunk_start in range(0, len(query_points), self.QUERY_CHUNK_SIZE):
+            chunk = slice(chunk_start, chunk_start + self.QUERY_CHUNK_SIZE)
+            chunk_points = query_points[chunk]
+            query_ids, indices = arrays.within_radius(chunk_points, radius[chunk])
+            splits = np.searchsorted(query_ids, np.arange(1, len(chunk_points)))
+            result.extend(np.split(indices, splits))
+
+        return result
+
+    def query_box(self, box_min, box_max):
+        """
+        Returns all the points inside an axis aligned bounding box
+        :param box_min: iterable, minimum corner of the box
+        :param box_max: iterable, maximum corner of the box
+        :return: np.ndarray, sorted indices (into the data the tree was built from) of the points inside the box
+        """
+
+        arrays = self.get_arrays()
+        box_min = self._check_query_points(box_min)[0]
+        box_max = self._check_query_points(box_max)[0]
+
+        return arrays.within_box(box_min, box_max)
+
+    def query(self, query_point, t=1, statistics=False):
+        """
+        Returns the nearest t points to the given point
+        :param query_point: iterable, point we want to find the neighbours of
+        :param t: int, number of neighbours wanted
+        :param statistics: bool, Whether to also return the search counters (nodes_visited, far_search and
+            leafs_reached) of the node based search, useful to profile pruning efficiency
+        :return: list or tuple(list, dict), nearest points sorted from nearest to farthest
+        """
+
+        search_statistics = {'nodes_visited': 0, 'far_search': 0, 'leafs_reached': 0}
 
         def nn_search(node, query_point, t, depth, best_neighbours):
             if node is None:
                 return
 
-            # statistics['nodes_visited'] += 1
+            search_statistics['nodes_visited'] += 1
 
             # if we have reached a leaf, let's add to current best neighbours,
             # (if it's better than the worst one or if there is not enough neighbours)
             if node.is_leaf():
-                # statistics['leafs_reached'] += 1
+                search_statistics['leafs_reached'] += 1
                 best_neighbours.add(node.point)
                 return
 
@@ -149,7 +828,7 @@ class KDTree(object):
             # check whether there could be any points on the other side of the
             # splitting plane that are closer to the query point than the current best
             if (node.point[axis] - query_point[axis]) ** 2 < best_neighbours.largest_distance:
-                # statistics['far_search'] += 1
+                search_statistics['far_search'] += 1
                 nn_search(far_subtree, query_point, t, depth + 1, best_neighbours)
 
             return
@@ -159,8 +838,217 @@ class KDTree(object):
             neighbours = KDTreeNeighbours(query_point, t)
             nn_search(self.root_node, query_point, t, depth=0, best_neighbours=neighbours)
             result = neighbours.get_best()
+        elif self._arrays is not None and self._arrays.size:
+            indices, _ = self.query_many(query_point, k=t)
+            indices = indices[0][indices[0] >= 0]
+            if self._points is not None:
+                result = [self._points[index] for index in indices]
+            else:
+                result = [tuple(point) for point in self._arrays.points(indices).tolist()]
         else:
             result = []
 
-        # print statistics
+        if statistics:
+            return result, search_statistics
+
         return result
+
+
+def _attach_shared_memory(name):
+    """
+    Internal function that attaches to an existing shared memory block. Only the process that created the block is
+    responsible of releasing it (workers share the resource tracker of the parent process)
+    :param name: str, name of the shared memory block
+    :return: shared_memory.SharedMemory
+    """
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def _query_block_views(buffer, query_count, dimensions, k):
+    """
+    Internal function that returns the query points, result indices and result distances arrays stored in a
+    parallel query shared memory block
+    :param buffer: buffer of the shared memory block
+    :param query_count: int, number of query points
+    :param dimensions: int, dimensions of the query points
+    :param k: int, number of neighbours wanted per point
+    :return: tuple(np.ndarray, np.ndarray, np.ndarray)
+    """
+
+    query_points = np.ndarray((query_count, dimensions), dtype=np.float64, buffer=buffer)
+    offset = query_points.nbytes
+    indices = np.ndarray((query_count, k), dtype=np.int64, buffer=buffer, offset=offset)
+    offset += indices.nbytes
+    distances = np.ndarray((query_count, k), dtype=np.float64, buffer=buffer, offset=offset)
+
+    return query_points, indices, distances
+
+
+def _parallel_query_init(tree_block_name, chunk_size):
+    tree_block = _attach_shared_memory(tree_block_name)
+    tree = KDTree([])
+    tree._points = None
+    tree._arrays = KDTreeArrays.from_buffer(np.frombuffer(tree_block.buf, dtype=np.uint8))
+    tree.QUERY_CHUNK_SIZE = chunk_size
+    _WORKER_STATE.clear()
+    _WORKER_STATE.update(tree_block=tree_block, tree=tree, query_block=None)
+
+
+def _parallel_query_task(task):
+    block_name, query_count, dimensions, k, start, end = task
+    query_block = _WORKER_STATE['query_block']
+    if query_block is None or query_block.name != block_name:
+        _WORKER_STATE['query_block'] = query_block = _attach_shared_memory(block_name)
+
+    query_points, indices, distances = _query_block_views(query_block.buf, query_count, dimensions, k)
+    indices[start:end], distances[start:end] = _WORKER_STATE['tree'].query_many(query_points[start:end], k=k)
+
+    return end - start
+
+
+class KDTreeParallelQuery(object):
+    """
+    Batch nearest neighbours executor that splits query points across a pool of processes.
+    The tree arrays, the query points and the results live in shared memory blocks, so neither the tree nor the
+    results are pickled: workers attach to the tree once and write their results in place, in input order.
+        Example usage:
+            with KDTreeParallelQuery(tree, processes=8) as executor:
+                indices, distances = executor.query_many(points, k=4)
+    """
+
+    def __init__(self, tree, processes=None, chunk_size=None):
+        """
+        Constructor
+        :param tree: KDTree, tree to query
+        :param processes: int, number of worker processes (by default, the number of CPUs)
+        :param chunk_size: int, number of query points sent to a worker at once. By default, batches are split so
+            each worker receives several chunks
+        """
+
+        self._pool = None
+        self._tree_block = None
+        self._tree = tree
+        self._processes = processes or multiprocessing.cpu_count()
+        self._chunk_size = chunk_size
+
+        _check_numpy()
+
+        if self._processes > 1 and shared_memory is None:
+            LOGGER.warning('Shared memory is not available in this Python version. KDTree queries will run serially')
+            self._processes = 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+    @property
+    def processes(self):
+        return self._processes
+
+    def _start(self):
+        """
+        Internal function that copies the tree into shared memory and starts worker processes
+        """
+
+        if self._pool is not None:
+            return
+
+        arrays = self._tree.get_arrays()
+        self._tree_block = shared_memory.SharedMemory(create=True, size=max(1, arrays.byte_size()))
+        arrays.write_to_buffer(self._tree_block.buf)
+        self._pool = multiprocessing.Pool(
+            self._processes, initializer=_parallel_query_init,
+            initargs=(self._tree_block.name, KDTree.QUERY_CHUNK_SIZE))
+
+    def close(self):
+        """
+        Stops worker processes and releases shared memory
+        """
+
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        if self._tree_block is not None:
+            self._tree_block.close()
+            self._tree_block.unlink()
+            self._tree_block = None
+
+    def query_many(self, query_points, k=1):
+        """
+        Returns the k nearest neighbours of many points at once, splitting the work across worker processes
+        :param query_points: array like of shape (N, D), points we want to find the neighbours of
+        :param k: int, number of neighbours wanted for each point
+        :return: tuple(np.ndarray, np.ndarray), same as KDTree.query_many
+        """
+
+        k = int(k)
+        query_points = self._tree._check_query_points(query_points)
+        query_count, dimensions = query_points.shape
+        if self._processes <= 1 or not query_count:
+            return self._tree.query_many(query_points, k=k)
+        if k < 1:
+            raise ValueError('Number of neighbours must be greater than 0: {}'.format(k))
+
+        self._start()
+        chunk_size = self._chunk_size or max(1024, -(-query_count // (self._processes * 4)))
+        block_size = query_count * dimensions * 8 + query_count * k * 16
+        query_block = shared_memory.SharedMemory(create=True, size=block_size)
+        try:
+            shared_points, shared_indices, shared_distances = _query_block_views(
+                query_block.buf, query_count, dimensions, k)
+            shared_points[:] = query_points
+            tasks = [(query_block.name, query_count, dimensions, k, start, min(start + chunk_size, query_count))
+                     for start in range(0, query_count, chunk_size)]
+            for _ in self._pool.imap_unordered(_parallel_query_task, tasks):
+                pass
+            indices = shared_indices.astype(np.intp)
+            distances = shared_distances.copy()
+            del shared_points, shared_indices, shared_distances
+        finally:
+            query_block.close()
+            query_block.unlink()
+
+        return indices, distances
+
+
+def benchmark_parallel_query(point_count=1000000, query_count=1000000, k=1, max_processes=None):
+    """
+    Measures KDTreeParallelQuery scaling with random points, from 1 process up to max_processes
+    :param point_count: int, number of points stored in the tree
+    :param query_count: int, number of query points
+    :param k: int, number of neighbours wanted per query point
+    :param max_processes: int, maximum number of processes to test (by default, the number of CPUs)
+    :return: list(tuple(int, float, float)), number of processes, seconds and speed up over 1 process
+    """
+
+    _check_numpy()
+
+    max_processes = max_processes or multiprocessing.cpu_count()
+    random_state = np.random.RandomState(0)
+    tree = KDTree.construct_from_array(random_state.random_sample((point_count, 3)))
+    query_points = random_state.random_sample((query_count, 3))
+
+    results = list()
+    for processes in range(1, max_processes + 1):
+        with KDTreeParallelQuery(tree, processes=processes) as executor:
+            if processes > 1:
+                executor.query_many(query_points[:processes], k=k)  # start workers outside of the measure
+            start_time = time.time()
+            executor.query_many(query_points, k=k)
+            elapsed = time.time() - start_time
+        speed_up = results[0][1] / elapsed if results else 1.0
+        results.append((processes, elapsed, speed_up))
+        LOGGER.info('KDTree parallel query: {} processes, {:.3f} seconds ({:.2f}x)'.format(
+            processes, elapsed, speed_up))
+
+    return results
@@ -7,36 +7,286 @@ Implementation of an octree data structure
 
 from __future__ import print_function, division, absolute_import
 
+import heapq
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 from tpDcc.libs.python import mathlib
 
+# Morton keys interleave 21 bits per axis, so a key with its depth sentinel bit fits in 64 bits
+MORTON_MAX_DEPTH = 21
+
+
+def _square_distance_to_box(point, bbox_min, bbox_max):
+    """
+    Returns the squared distance between a point and an axis aligned box (0 if the point is inside the box)
+    :param point: tuple(X, Y, Z), tuple containing (X,Y,Z) positions of a point
+    :param bbox_min: tuple, contains the minimum X,Y,Z values of the box
+    :param bbox_max: tuple, contains the maximum X,Y,Z values of the box
+    :return: float
+    """
+
+    distance = 0.0
+    for value, min_value, max_value in zip(point, bbox_min, bbox_max):
+        if value < min_value:
+            distance += (min_value - value) ** 2
+        elif value > max_value:
+            distance += (value - max_value) ** 2
+
+    return distance
+
+
+def _square_distance(point_a, point_b):
+    return (point_a[0] - point_b[0]) ** 2 + (point_a[1] - point_b[1]) ** 2 + (point_a[2] - point_b[2]) ** 2
+
 
 class Octree(object):
     """
     An octree data structure partitions 3D space into octants
+        Example usage:
+            tree = Octree((0, 0, 0), (10, 10, 10), capacity=8, max_depth=12)
+            for i, point in enumerate(points):
+                tree.insert(point, payload=i)
+
+            in_box = tree.query_aabb((1, 1, 1), (2, 2, 2))      # list of (point, payload)
+            in_sphere = tree.query_sphere((5, 5, 5), 0.5)
+            nearest = tree.nearest((5, 5, 5), k=3)
     """
 
-    def __init__(self, bbox_min, bbox_max):
+    def __init__(self, bbox_min, bbox_max, capacity=8, max_depth=16):
         """
         Constructor
         :param bbox_min: tuple, contains the minimum X,Y,Z values of the mesh bounding box
         :param bbox_max: tuple, contains the maximum X,Y,Z values of the mesh bounding box
+        :param capacity: int, number of points a leaf octant can store before being subdivided
+        :param max_depth: int, maximum number of subdivisions. Leaves at this depth store any number of points
         """
 
         self._bbox_min = bbox_min
         self._bbox_max = bbox_max
+        self._capacity = max(1, int(capacity))
+        self._max_depth = max(0, int(max_depth))
+        self._count = 0
         self._root = OctreeNode(self._bbox_min, self._bbox_max, divisions=0, parent=self)
 
+    def __len__(self):
+        return self._count
+
     @property
     def root(self):
         return self._root
 
+    @classmethod
+    def build_from_points(cls, points, payloads=None, bbox_min=None, bbox_max=None, capacity=8, max_depth=16):
+        """
+        Builds an octree from a whole point cloud at once. Points are partitioned level by level, classifying the
+        points of all the octants of a level with a single array operation instead of inserting them one by one.
+        The result is the same tree insert builds
+        :param points: array like of shape (N, 3), points to store
+        :param payloads: list or None, data associated with each point. By default, the index of each point
+        :param bbox_min: tuple, minimum X,Y,Z values of the octree (by default the points bounding box)
+        :param bbox_max: tuple, maximum X,Y,Z values of the octree (by default the points bounding box)
+        :param capacity: int, number of points a leaf octant can store before being subdivided
+        :param max_depth: int, maximum number of subdivisions
+        :return: Octree
+        """
+
+        _check_numpy()
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if bbox_min is None:
+            bbox_min = points.min(axis=0) if len(points) else (0.0, 0.0, 0.0)
+        if bbox_max is None:
+            bbox_max = points.max(axis=0) if len(points) else (0.0, 0.0, 0.0)
+        bbox_min = tuple(float(value) for value in bbox_min)
+        bbox_max = tuple(float(value) for value in bbox_max)
+        if len(points) and (np.any(points < bbox_min) or np.any(points > bbox_max)):
+            raise ValueError('Points are outside Octree bounds: {} - {}'.format(bbox_min, bbox_max))
+
+        tree = cls(bbox_min, bbox_max, capacity=capacity, max_depth=max_depth)
+        tree._count = len(points)
+        if not len(points):
+            return tree
+
+        tree._store_points(points, payloads)
+
+        return tree
+
+    def _store_points(self, points, payloads=None):
+        """
+        Internal function that distributes a point cloud between the octants of an empty tree
+        :param points: np.ndarray, (N, 3) points to store
+        :param payloads: list or None, data associated with each point. By default, the index of each point
+        """
+
+        # whole levels are classified at once, comparing each point with the half values of its octant exactly as
+        # insert does. Points are then sorted by leaf, so every leaf stores a contiguous slice of them
+        octant_axes = (np.arange(8)[:, None] >> np.arange(3)) & 1 == 1
+        leaves = list()
+        point_leaves = np.empty(len(points), dtype=np.intp)
+        point_ids = np.arange(len(points))
+        point_nodes = np.zeros(len(points), dtype=np.intp)
+        level_nodes = [self._root]
+        node_mins = np.array([self._bbox_min], dtype=np.float64)
+        node_maxs = np.array([self._bbox_max], dtype=np.float64)
+        divisions = 0
+        while True:
+            counts = np.bincount(point_nodes, minlength=len(level_nodes))
+            split = counts > self._capacity if divisions < self._max_depth else np.zeros(len(level_nodes), bool)
+            leaf_ids = np.flatnonzero(~split)
+            node_leaves = np.full(len(level_nodes), -1, dtype=np.intp)
+            node_leaves[leaf_ids] = np.arange(len(leaves), len(leaves) + len(leaf_ids))
+            leaves.extend([level_nodes[index] for index in leaf_ids.tolist()])
+            in_leaf = ~split[point_nodes]
+            point_leaves[point_ids[in_leaf]] = node_leaves[point_nodes[in_leaf]]
+            point_ids, point_nodes = point_ids[~in_leaf], point_nodes[~in_leaf]
+
+            split_ids = np.flatnonzero(split)
+            if not len(split_ids):
+                break
+            split_positions = np.full(len(level_nodes), -1, dtype=np.intp)
+            split_positions[split_ids] = np.arange(len(split_ids))
+            parent_mins, parent_maxs = node_mins[split_ids][:, None, :], node_maxs[split_ids][:, None, :]
+            halves = (node_mins[split_ids] + node_maxs[split_ids]) * 0.5
+            point_nodes = split_positions[point_nodes]
+            point_nodes = point_nodes * 8 + OctreeNode.classify_octants(points[point_ids], halves[point_nodes])
+
+            divisions += 1
+            node_mins = np.where(octant_axes, halves[:, None, :], parent_mins).reshape(-1, 3)
+            node_maxs = np.where(octant_axes, parent_maxs, halves[:, None, :]).reshape(-1, 3)
+            level_nodes = OctreeNode.create_children(
+                [level_nodes[index] for index in split_ids.tolist()], node_mins, node_maxs, divisions)
+
+        order = np.argsort(point_leaves, kind='stable')
+        ends = np.cumsum(np.bincount(point_leaves, minlength=len(leaves))).tolist()
+        node_payloads = order.tolist()
+        if payloads is not None:
+            node_payloads = [payloads[i] for i in node_payloads]
+        stored_points = list(zip(map(tuple, points[order].tolist()), node_payloads))
+        start = 0
+        for leaf, end in zip(leaves, ends):
+            if end > start:
+                leaf._points = stored_points[start:end]
+                start = end
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def max_depth(self):
+        return self._max_depth
+
+    def insert(self, point, payload=None):
+        """
+        Stores a point (and optional payload data) in the octree, subdividing octants that exceed capacity
+        :param point: tuple(X, Y, Z), tuple containing (X,Y,Z) positions of a point
+        :param payload: object, data associated with the point (for example its vertex index)
+        :return: OctreeNode, leaf node where the point was stored
+        """
+
+        for value, min_value, max_value in zip(point, self._bbox_min, self._bbox_max):
+            if not min_value <= value <= max_value:
+                raise ValueError('Point {} is outside Octree bounds: {} - {}'.format(
+                    point, self._bbox_min, self._bbox_max))
+
+        self._count += 1
+
+        return self._root.insert(point, payload, capacity=self._capacity, max_depth=self._max_depth)
+
+    def query_aabb(self, bbox_min, bbox_max):
+        """
+        Returns all stored points inside the given axis aligned bounding box (bounds included)
+        :param bbox_min: tuple, contains the minimum X,Y,Z values of the box
+        :param bbox_max: tuple, contains the maximum X,Y,Z values of the box
+        :return: list(tuple(tuple, object)), list of (point, payload)
+        """
+
+        found = list()
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            if not node.overlaps(bbox_min, bbox_max):
+                continue
+            if node.children:
+                nodes.extend(node.children)
+                continue
+            for point, payload in node.points:
+                if all(min_value <= value <= max_value for value, min_value, max_value in zip(
+                        point, bbox_min, bbox_max)):
+                    found.append((point, payload))
+
+        return found
+
+    def query_sphere(self, center, radius):
+        """
+        Returns all stored points within the given distance of a center point
+        :param center: tuple(X, Y, Z), center of the sphere
+        :param radius: float, radius of the sphere
+        :return: list(tuple(tuple, object)), list of (point, payload)
+        """
+
+        square_radius = radius * radius
+        found = list()
+        nodes = [self._root]
+        while nodes:
+            node = nodes.pop()
+            if _square_distance_to_box(center, node.bbox_min, node.bbox_max) > square_radius:
+                continue
+            if node.children:
+                nodes.extend(node.children)
+                continue
+            for point, payload in node.points:
+                if _square_distance(point, center) <= square_radius:
+                    found.append((point, payload))
+
+        return found
+
+    def nearest(self, point, k=1):
+        """
+        Returns the k stored points nearest to the given point. Octants are visited from nearest to farthest and
+        the search stops as soon as no remaining octant can contain a closer point
+        :param point: tuple(X, Y, Z), tuple containing (X,Y,Z) positions of a point
+        :param k: int, number of points wanted
+        :return: list(tuple(tuple, object)), list of (point, payload) sorted from nearest to farthest
+        """
+
+        k = int(k)
+        if k < 1:
+            raise ValueError('Number of neighbours must be greater than 0: {}'.format(k))
+
+        best = list()  # max-heap of (-squared distance, order, point, payload)
+        order = 0
+        nodes = [(0.0, 0, self._root)]
+        while nodes:
+            node_distance, _, node = heapq.heappop(nodes)
+            if len(best) == k and node_distance >= -best[0][0]:
+                break
+            for child in node.children:
+                order += 1
+                heapq.heappush(
+                    nodes, (_square_distance_to_box(point, child.bbox_min, child.bbox_max), order, child))
+            for stored_point, payload in node.points:
+                distance = _square_distance(point, stored_point)
+                order += 1
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, -order, stored_point, payload))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, -order, stored_point, payload))
+
+        return [(item[2], item[3]) for item in sorted(best, key=lambda item: (-item[0], -item[1]))]
+
 
 class OctreeNode(object):
     """
     Octant representation
     """
 
+    __slots__ = ('_bbox_min', '_bbox_max', '_parent', '_divisions', '_children', '_points', '_half_values')
+
     def __init__(self, bbox_min, bbox_max, divisions=0, parent=None):
         """
         Constructor
@@ -52,6 +302,7 @@ class OctreeNode(object):
         self._parent = parent
         self._divisions = divisions
         self._children = list()
+        self._points = list()
         self._half_values = mathlib.bounding_box_half_values(bbox_min=bbox_min, bbox_max=bbox_max)
 
     def get_divisions(self):
@@ -63,9 +314,94 @@ class OctreeNode(object):
     def get_half_values(self):
         return self._half_values
 
+    def get_points(self):
+        return self._points
+
+    def get_bbox_min(self):
+        return self._bbox_min
+
+    def get_bbox_max(self):
+        return self._bbox_max
+
     divisions = property(get_divisions)
     children = property(get_children)
     half_values = property(get_half_values)
+    points = property(get_points)
+    bbox_min = property(get_bbox_min)
+    bbox_max = property(get_bbox_max)
+
+    def insert(self, point, payload=None, capacity=8, max_depth=16):
+        """
+        Stores a point in the leaf node containing it. Leaf nodes storing more than capacity points are subdivided
+        (unless they are at max_depth) and their points distributed between the new octants
+        :param point: tuple(X, Y, Z), tuple containing (X,Y,Z) positions of a point
+        :param payload: object, data associated with the point
+        :param capacity: int, number of points a leaf node can store before being subdivided
+        :param max_depth: int, maximum number of subdivisions
+        :return: OctreeNode, leaf node where the point was stored
+        """
+
+        node = self
+        while node._children:
+            node = node.child_containing(point)
+
+        node._points.append((point, payload))
+        if len(node._points) <= capacity or node._divisions >= max_depth:
+            return node
+
+        # the new point is the last one stored, so its leaf is the one returned by the last insertion
+        stored_points = node._points
+        node._points = list()
+        node.subdivide()
+        leaf = node
+        for stored_point, stored_payload in stored_points:
+            leaf = node.child_containing(stored_point).insert(
+                stored_point, stored_payload, capacity=capacity, max_depth=max_depth)
+
+        return leaf
+
+    @classmethod
+    def create_children(cls, parents, bbox_mins, bbox_maxs, divisions):
+        """
+        Subdivides many nodes at once from precomputed octant bounds (same octants created by subdivide)
+        :param parents: list(OctreeNode), nodes to subdivide
+        :param bbox_mins: np.ndarray, (8 * P, 3) minimum corners of the octants, 8 consecutive rows per parent
+        :param bbox_maxs: np.ndarray, (8 * P, 3) maximum corners of the octants, 8 consecutive rows per parent
+        :param divisions: int, division level of the new octants
+        :return: list(OctreeNode), new octants in the order of their bounds
+        """
+
+        nodes = list()
+        octants = zip(map(tuple, bbox_mins.tolist()), map(tuple, bbox_maxs.tolist()),
+                      map(tuple, ((bbox_mins + bbox_maxs) * 0.5).tolist()))
+        for bbox_min, bbox_max, half in octants:
+            # constructor is skipped, half values were already computed for all octants at once
+            node = cls.__new__(cls)
+            node._bbox_min = bbox_min
+            node._bbox_max = bbox_max
+            node._divisions = divisions
+            node._children = list()
+            node._points = list()
+            node._half_values = half
+            nodes.append(node)
+        for index, parent in enumerate(parents):
+            children = nodes[index * 8:index * 8 + 8]
+            for child in children:
+                child._parent = parent
+            parent._children = children
+
+        return nodes
+
+    def overlaps(self, bbox_min, bbox_max):
+        """
+        Returns True if this OctreeNode overlaps with the given axis aligned box, False otherwise
+        :param bbox_min: tuple, contains the minimum X,Y,Z values of the box
+        :param bbox_max: tuple, contains the maximum X,Y,Z values of the box
+        :return: bool
+        """
+
+        return all(
+            bbox_min[i] <= self._bbox_max[i] and bbox_max[i] >= self._bbox_min[i] for i in range(3))
 
     def child_containing(self, point):
         """
@@ -85,6 +421,31 @@ class OctreeNode(object):
         child_index = 4 * greater_half_z + 2 * greater_half_y + greater_half_x
         return self._children[child_index]
 
+    def classify(self, points):
+        """
+        Returns the index of the child node containing each one of the given points, in a single array operation
+        :param points: array like of shape (N, 3), (X,Y,Z) positions of the points
+        :return: np.ndarray(np.intp), child index (same as child_containing) of each point
+        """
+
+        return self.classify_octants(points, self._half_values)
+
+    @staticmethod
+    def classify_octants(points, half_values):
+        """
+        Returns the index of the child octant containing each one of the given points, in a single array operation
+        :param points: array like of shape (N, 3), (X,Y,Z) positions of the points
+        :param half_values: array like of shape (3, ) or (N, 3), half values of the octant of all or each point
+        :return: np.ndarray(np.intp), child index (same as child_containing) of each point
+        """
+
+        _check_numpy()
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        greater_half = points >= np.asarray(half_values, dtype=np.float64)
+
+        return greater_half.astype(np.intp).dot(np.array([1, 2, 4], dtype=np.intp))
+
     def is_inside(self, point):
         """
         Returns True if the given points lies inside this OctreeNode, False otherwise
@@ -98,7 +459,7 @@ class OctreeNode(object):
         in_y = self._bbox_min[1] <= y < self._bbox_max[1]
         in_z = self._bbox_min[2] <= z < self._bbox_max[2]
 
-        return all(in_x, in_y, in_z)
+        return all((in_x, in_y, in_z))
 
     def subdivide(self):
         """
@@ -146,3 +507,373 @@ class OctreeNode(object):
 
         # Remove the original node and add the octants
         self._children = octant_list
+
+
+def _check_numpy():
+    if np is None:
+        raise RuntimeError('NumPy is required to use array based octree functionality')
+
+
+def morton_split_bits(values):
+    """
+    Spreads the lower 21 bits of the given integers so there are two zero bits between each one of them
+    :param values: np.ndarray, integer values
+    :return: np.ndarray(np.uint64)
+    """
+
+    values = np.asarray(values).astype(np.uint64) & np.uint64(0x1fffff)
+    values = (values | values << np.uint64(32)) & np.uint64(0x1f00000000ffff)
+    values = (values | values << np.uint64(16)) & np.uint64(0x1f0000ff0000ff)
+    values = (values | values << np.uint64(8)) & np.uint64(0x100f00f00f00f00f)
+    values = (values | values << np.uint64(4)) & np.uint64(0x10c30c30c30c30c3)
+    values = (values | values << np.uint64(2)) & np.uint64(0x1249249249249249)
+
+    return values
+
+
+def morton_compact_bits(values):
+    """
+    Inverse of morton_split_bits, gathers every third bit of the given integers
+    :param values: np.ndarray(np.uint64), spread values
+    :return: np.ndarray(np.uint64)
+    """
+
+    values = np.asarray(values, dtype=np.uint64) & np.uint64(0x1249249249249249)
+    values = (values ^ (values >> np.uint64(2))) & np.uint64(0x10c30c30c30c30c3)
+    values = (values ^ (values >> np.uint64(4))) & np.uint64(0x100f00f00f00f00f)
+    values = (values ^ (values >> np.uint64(8))) & np.uint64(0x1f0000ff0000ff)
+    values = (values ^ (values >> np.uint64(16))) & np.uint64(0x1f00000000ffff)
+    values = (values ^ (values >> np.uint64(32))) & np.uint64(0x1fffff)
+
+    return values
+
+
+def morton_encode(x, y, z):
+    """
+    Interleaves integer grid coordinates into Morton codes. Each group of 3 bits is an octant index with the same
+    layout used by OctreeNode children (4 * z + 2 * y + x)
+    :param x: np.ndarray, integer X grid coordinates
+    :param y: np.ndarray, integer Y grid coordinates
+    :param z: np.ndarray, integer Z grid coordinates
+    :return: np.ndarray(np.uint64)
+    """
+
+    return morton_split_bits(x) | (morton_split_bits(y) << np.uint64(1)) | (morton_split_bits(z) << np.uint64(2))
+
+
+def morton_decode(codes):
+    """
+    Returns the integer grid coordinates of the given Morton codes
+    :param codes: np.ndarray(np.uint64), Morton codes
+    :return: tuple(np.ndarray, np.ndarray, np.ndarray), X, Y and Z grid coordinates
+    """
+
+    codes = np.asarray(codes, dtype=np.uint64)
+
+    return (
+        morton_compact_bits(codes), morton_compact_bits(codes >> np.uint64(1)),
+        morton_compact_bits(codes >> np.uint64(2)))
+
+
+class LinearOctree(object):
+    """
+    Pointerless octree stored as sorted NumPy arrays.
+    Every cell is identified by a 64 bits locational key: a sentinel bit followed by the Morton code of the cell at
+    its depth (3 bits per level), so parent, children and neighbour keys are obtained with bit operations. Only leaf
+    cells containing points are stored, in Morton order, using 25 bytes per cell (key, first point and depth and a
+    lazily built code lookup array)
+        Example usage:
+            tree = LinearOctree.from_points(points, capacity=16)
+            cells = tree.leaf_index(query_points)
+            indices = tree.cell_points(cells[0])
+    """
+
+    def __init__(self, bbox_min, bbox_max, max_depth=MORTON_MAX_DEPTH):
+        """
+        Constructor
+        :param bbox_min: tuple, contains the minimum X,Y,Z values of the octree bounding box
+        :param bbox_max: tuple, contains the maximum X,Y,Z values of the octree bounding box
+        :param max_depth: int, maximum number of subdivisions (21 at most)
+        """
+
+        _check_numpy()
+
+        if not 0 <= max_depth <= MORTON_MAX_DEPTH:
+            raise ValueError('LinearOctree max depth must be between 0 and {}: {}'.format(
+                MORTON_MAX_DEPTH, max_depth))
+
+        self._bbox_min = np.asarray(bbox_min, dtype=np.float64)
+        self._bbox_max = np.asarray(bbox_max, dtype=np.float64)
+        self._max_depth = int(max_depth)
+        self._keys = np.zeros(0, dtype=np.uint64)
+        self._depths = np.zeros(0, dtype=np.uint8)
+        self._starts = np.zeros(1, dtype=np.int64)
+        self._point_order = np.zeros(0, dtype=np.int64)
+        self._code_starts = None
+
+    def __len__(self):
+        return len(self._keys)
+
+    @property
+    def keys(self):
+        return self._keys
+
+    @property
+    def depths(self):
+        return self._depths
+
+    @property
+    def max_depth(self):
+        return self._max_depth
+
+    @property
+    def nbytes(self):
+        """
+        Returns the memory used by the cells arrays (point order array not included)
+        :return: int
+        """
+
+        code_starts = self._code_starts.nbytes if self._code_starts is not None else 0
+        return self._keys.nbytes + self._depths.nbytes + self._starts.nbytes + code_starts
+
+    @classmethod
+    def from_points(cls, points, bbox_min=None, bbox_max=None, capacity=None, max_depth=MORTON_MAX_DEPTH):
+        """
+        Builds a linear octree from a point cloud with a single vectorized Morton encode and sort pass
+        :param points: array like of shape (N, 3), points to store
+        :param bbox_min: tuple, minimum X,Y,Z values of the octree (by default the points bounding box)
+        :param bbox_max: tuple, maximum X,Y,Z values of the octree (by default the points bounding box)
+        :param capacity: int or None, if given, cells are only subdivided while they contain more than capacity
+            points. Otherwise all cells are at max_depth
+        :param max_depth: int, maximum number of subdivisions (21 at most)
+        :return: LinearOctree
+        """
+
+        _check_numpy()
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        if bbox_min is None:
+            bbox_min = points.min(axis=0) if len(points) else np.zeros(3)
+        if bbox_max is None:
+            bbox_max = points.max(axis=0) if len(points) else np.ones(3)
+        tree = cls(bbox_min, bbox_max, max_depth=max_depth)
+
+        codes = tree.encode(points)
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+        tree._point_order = order.astype(np.int64)
+
+        if capacity is None:
+            first = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.zeros(0, np.int64)
+            tree._set_cells(codes[first], np.full(len(first), tree._max_depth, dtype=np.uint8), first, len(codes))
+            return tree
+
+        # top-down split of cells holding more than capacity points. Points are already in Morton order, so the
+        # points of every cell are contiguous and child cells are found as runs of equal code prefixes
+        cell_codes, cell_depths, cell_starts = list(), list(), list()
+        starts = np.zeros(1 if len(codes) else 0, dtype=np.int64)
+        ends = np.full(len(starts), len(codes), dtype=np.int64)
+        for depth in range(tree._max_depth + 1):
+            final = ((ends - starts) <= capacity) | (depth == tree._max_depth)
+            shift = np.uint64(3 * (tree._max_depth - depth))
+            cell_codes.append(codes[starts[final]] >> shift)
+            cell_depths.append(np.full(final.sum(), depth, dtype=np.uint8))
+            cell_starts.append(starts[final])
+
+            starts, ends = starts[~final], ends[~final]
+            if not len(starts):
+                break
+            counts = ends - starts
+            positions = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            positions += np.arange(counts.sum(), dtype=np.int64)
+            prefixes = codes[positions] >> np.uint64(3 * (tree._max_depth - depth - 1))
+            run_start = np.r_[True, (prefixes[1:] != prefixes[:-1]) | (positions[1:] != positions[:-1] + 1)]
+            run_end = np.r_[run_start[1:], True]
+            starts, ends = positions[run_start], positions[run_end] + 1
+
+        cell_starts = np.concatenate(cell_starts)
+        order = np.argsort(cell_starts, kind='stable')
+        tree._set_cells(
+            np.concatenate(cell_codes)[order], np.concatenate(cell_depths)[order], cell_starts[order], len(codes))
+
+        return tree
+
+    def _set_cells(self, codes, depths, starts, point_count):
+        """
+        Internal function that stores leaf cells given their Morton codes at their own depth
+        :param codes: np.ndarray(np.uint64), Morton code of each cell at its depth
+        :param depths: np.ndarray(np.uint8), depth of each cell
+        :param starts: np.ndarray, first point of each cell in Morton order
+        :param point_count: int, total number of points
+        """
+
+        self._keys = (np.uint64(1) << (np.uint64(3) * depths.astype(np.uint64))) | codes
+        self._depths = depths
+        self._starts = np.append(starts, point_count).astype(np.int64)
+        self._code_starts = None
+
+    def encode(self, points):
+        """
+        Returns the Morton codes of the given points at max depth
+        :param points: array like of shape (N, 3), points to encode
+        :return: np.ndarray(np.uint64)
+        """
+
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        resolution = 1 << self._max_depth
+        size = np.where(self._bbox_max > self._bbox_min, self._bbox_max - self._bbox_min, 1.0)
+        grid = np.floor((points - self._bbox_min) / size * resolution)
+        grid = np.clip(grid, 0, resolution - 1).astype(np.uint64)
+
+        return morton_encode(grid[:, 0], grid[:, 1], grid[:, 2])
+
+    @staticmethod
+    def key_depth(keys):
+        """
+        Returns the depth of the given keys (position of their sentinel bit divided by 3)
+        :param keys: np.ndarray(np.uint64), cell keys
+        :return: np.ndarray(np.uint8)
+        """
+
+        keys = np.asarray(keys, dtype=np.uint64)
+        depths = np.zeros(keys.shape, dtype=np.uint8)
+        for depth in range(1, MORTON_MAX_DEPTH + 1):
+            depths += keys >= np.uint64(1 << (3 * depth))
+
+        return depths
+
+    @staticmethod
+    def parent_keys(keys):
+        """
+        Returns the parent key of the given keys (the root key is its own parent)
+        :param keys: np.ndarray(np.uint64), cell keys
+        :return: np.ndarray(np.uint64)
+        """
+
+        keys = np.asarray(keys, dtype=np.uint64)
+        return np.where(keys > 1, keys >> np.uint64(3), keys)
+
+    @staticmethod
+    def child_keys(keys):
+        """
+        Returns the 8 children keys of the given keys, ordered as OctreeNode children
+        :param keys: np.ndarray(np.uint64), cell keys
+        :return: np.ndarray(np.uint64), (N, 8) children keys
+        """
+
+        keys = np.asarray(keys, dtype=np.uint64)
+        return (keys[..., None] << np.uint64(3)) | np.arange(8, dtype=np.uint64)
+
+    @classmethod
+    def neighbour_keys(cls, keys, offset):
+        """
+        Returns the keys of the cells at the same depth displaced by the given grid offset
+        :param keys: np.ndarray(np.uint64), cell keys
+        :param offset: tuple(int, int, int), offset in cells along X, Y and Z (for example (1, 0, 0))
+        :return: np.ndarray(np.uint64), neighbour keys (0 where the neighbour is outside the octree)
+        """
+
+        keys = np.asarray(keys, dtype=np.uint64)
+        depths = cls.key_depth(keys).astype(np.uint64)
+        sentinel = np.uint64(1) << (np.uint64(3) * depths)
+        coordinates = morton_decode(keys ^ sentinel)
+        resolution = (np.uint64(1) << depths).astype(np.int64)
+
+        inside = np.ones(keys.shape, dtype=bool)
+        moved = list()
+        for coordinate, delta in zip(coordinates, offset):
+            coordinate = coordinate.astype(np.int64) + int(delta)
+            inside &= (coordinate >= 0) & (coordinate < resolution)
+            moved.append(np.clip(coordinate, 0, None))
+
+        return np.where(inside, sentinel | morton_encode(*moved), np.uint64(0))
+
+    def cell_bounds(self, keys):
+        """
+        Returns the bounding boxes of the given cells
+        :param keys: np.ndarray(np.uint64), cell keys
+        :return: tuple(np.ndarray, np.ndarray), (N, 3) minimum and maximum corners
+        """
+
+        keys = np.asarray(keys, dtype=np.uint64)
+        depths = self.key_depth(keys).astype(np.uint64)
+        coordinates = np.stack(morton_decode(keys ^ (np.uint64(1) << (np.uint64(3) * depths))), axis=-1)
+        cell_size = (self._bbox_max - self._bbox_min) / (np.uint64(1) << depths).astype(np.float64)[..., None]
+        bbox_min = self._bbox_min + coordinates.astype(np.float64) * cell_size
+
+        return bbox_min, bbox_min + cell_size
+
+    def _get_code_starts(self):
+        """
+        Internal function that returns the first max depth Morton code covered by each stored cell
+        :return: np.ndarray(np.uint64)
+        """
+
+        if self._code_starts is None:
+            depths = self._depths.astype(np.uint64)
+            codes = self._keys ^ (np.uint64(1) << (np.uint64(3) * depths))
+            self._code_starts = codes << (np.uint64(3) * (np.uint64(self._max_depth) - depths))
+
+        return self._code_starts
+
+    def find_cells(self, keys):
+        """
+        Returns the stored cells that contain the regions of the given keys (same cell or a coarser one)
+        :param keys: np.ndarray(np.uint64), cell keys
+        :return: np.ndarray(np.int64), cell indices, -1 where the region is empty or split into finer cells
+        """
+
+        keys = np.asarray(keys, dtype=np.uint64)
+        depths = self.key_depth(keys).astype(np.uint64)
+        codes = (keys ^ (np.uint64(1) << (np.uint64(3) * depths))) << (
+            np.uint64(3) * (np.uint64(self._max_depth) - depths))
+
+        return self._locate(codes, depths)
+
+    def leaf_index(self, points):
+        """
+        Returns the stored cell containing each one of the given points
+        :param points: array like of shape (N, 3), points to locate
+        :return: np.ndarray(np.int64), cell indices, -1 for points in empty regions
+        """
+
+        codes = self.encode(points)
+        return self._locate(codes, np.full(codes.shape, self._max_depth, dtype=np.uint64))
+
+    def _locate(self, codes, depths):
+        """
+        Internal function that returns the stored cells containing the given max depth Morton codes
+        :param codes: np.ndarray(np.uint64), max depth Morton codes
+        :param depths: np.ndarray(np.uint64), cells can only be returned if they are at this depth or coarser
+        :return: np.ndarray(np.int64)
+        """
+
+        code_starts = self._get_code_starts()
+        cells = np.searchsorted(code_starts, codes, side='right').astype(np.int64) - 1
+        valid = cells >= 0
+        safe_cells = np.where(valid, cells, 0)
+        if len(self._keys):
+            cell_depths = self._depths[safe_cells].astype(np.uint64)
+            span = np.uint64(1) << (np.uint64(3) * (np.uint64(self._max_depth) - cell_depths))
+            valid &= (codes - code_starts[safe_cells] < span) & (cell_depths <= depths)
+        else:
+            valid[:] = False
+
+        return np.where(valid, cells, -1)
+
+    def cell_points(self, cell_index):
+        """
+        Returns the indices of the points stored in the given cell
+        :param cell_index: int, index of the cell
+        :return: np.ndarray(np.int64), indices into the point array the octree was built from
+        """
+
+        return self._point_order[self._starts[cell_index]:self._starts[cell_index + 1]]
+
+    def cell_point_counts(self):
+        """
+        Returns the number of points stored in each cell
+        :return: np.ndarray(np.int64)
+        """
+
+        return np.diff(self._starts)
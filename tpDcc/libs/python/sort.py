@@ -8,6 +8,149 @@ Utility methods related to sort algorithms
 
 from __future__ import print_function, division, absolute_import
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _check_numpy():
+    if np is None:
+        raise RuntimeError('NumPy is required to use NumPy sort backend')
+
+
+def argsort(*keys, **kwargs):
+    """
+    Returns the permutation that sorts the given key sequences. First key has the highest priority and the following
+    ones break ties. Sort is stable and iterative, so it is linear for already sorted input and never recurses
+    :param keys: list(list), sequences of the same length to sort by
+    :param reverse: bool or list(bool), whether to sort in descending order (ties keep their original order). A list
+        gives the order of each key, so ascending and descending keys can be mixed
+    :param use_numpy: bool or None, whether to use NumPy backend. If None, it is used when all keys are NumPy arrays
+    :return: list(int) or np.ndarray
+    """
+
+    reverse = kwargs.get('reverse', False)
+    use_numpy = kwargs.get('use_numpy', None)
+    if not keys:
+        return list()
+    count = len(keys[0])
+    if any(len(key) != count for key in keys):
+        raise ValueError('All sort keys must have the same length')
+    if isinstance(reverse, (list, tuple)):
+        if len(reverse) != len(keys):
+            raise ValueError('Number of reverse flags ({}) does not match number of sort keys ({})'.format(
+                len(reverse), len(keys)))
+        reverse = [bool(flag) for flag in reverse]
+    else:
+        reverse = [bool(reverse)] * len(keys)
+
+    if use_numpy is None:
+        use_numpy = np is not None and all(isinstance(key, np.ndarray) for key in keys)
+    if use_numpy:
+        _check_numpy()
+        arrays = [np.asarray(key) for key in keys]
+        if all(reverse):
+            # stable descending order: sort reversed keys ascending and map positions back
+            order = np.lexsort([array[::-1] for array in reversed(arrays)])[::-1]
+            return count - 1 - order
+        # descending keys of a mixed sort are replaced by their negated ranks, valid for any sortable type
+        arrays = [-np.unique(array, return_inverse=True)[1].reshape(-1) if flag else array
+                  for array, flag in zip(arrays, reverse)]
+        return np.lexsort(arrays[::-1])
+
+    # least significant key first, Python sort stability keeps the order of the previous passes
+    order = list(range(count))
+    for key, flag in zip(reversed(keys), reversed(reverse)):
+        order.sort(key=key.__getitem__, reverse=flag)
+
+    return order
+
+
+class PermutedSequence(object):
+    """
+    Read only view of a sequence reordered by a permutation. Items are not copied
+    """
+
+    __slots__ = ('_sequence', '_permutation')
+
+    def __init__(self, sequence, permutation):
+        self._sequence = sequence
+        self._permutation = permutation
+
+    def __len__(self):
+        return len(self._permutation)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._sequence[i] for i in self._permutation[index]]
+        return self._sequence[self._permutation[index]]
+
+    def __iter__(self):
+        sequence = self._sequence
+        for i in self._permutation:
+            yield sequence[i]
+
+    def __repr__(self):
+        return '{}({})'.format(self.__class__.__name__, list(self))
+
+
+class MultiKeySort(object):
+    """
+    Sorts by one or more keys computing a single permutation that can be applied to any number of follower sequences
+        Example usage:
+            sorter = MultiKeySort(version_numbers)
+            sorted_numbers = sorter.take(version_numbers)
+            sorted_files = sorter.take(file_names)
+    """
+
+    def __init__(self, *keys, **kwargs):
+        """
+        Constructor
+        :param keys: list(list), sequences of the same length to sort by, by priority
+        :param reverse: bool or list(bool), whether to sort in descending order (one flag per key if a list)
+        :param use_numpy: bool or None, whether to use NumPy backend. If None, it is used when keys are NumPy arrays
+        """
+
+        self._use_numpy = kwargs.get('use_numpy', None)
+        self._permutation = argsort(*keys, reverse=kwargs.get('reverse', False), use_numpy=self._use_numpy)
+
+    def __len__(self):
+        return len(self._permutation)
+
+    @property
+    def permutation(self):
+        return self._permutation
+
+    def _check_length(self, sequence):
+        if len(sequence) != len(self._permutation):
+            raise ValueError('Sequence length {} does not match sort length {}'.format(
+                len(sequence), len(self._permutation)))
+
+    def apply(self, sequence):
+        """
+        Returns a view of the given sequence in sorted order without copying it
+        :param sequence: list, sequence with the same length as the sort keys
+        :return: PermutedSequence
+        """
+
+        self._check_length(sequence)
+
+        return PermutedSequence(sequence, self._permutation)
+
+    def take(self, sequence):
+        """
+        Returns a sorted copy of the given sequence
+        :param sequence: list or np.ndarray, sequence with the same length as the sort keys
+        :return: list or np.ndarray
+        """
+
+        self._check_length(sequence)
+        if np is not None and isinstance(sequence, np.ndarray):
+            return sequence[np.asarray(self._permutation, dtype=np.intp)]
+
+        return [sequence[i] for i in self._permutation]
+
 
 class QuickNumbersListSort(object):
     """
@@ -18,51 +161,6 @@ class QuickNumbersListSort(object):
         self.list_of_numbers = list_of_numbers
         self.follower_list = list()
 
-    def _sort(self, list_of_numbers, follower_list=[]):
-        less = list()
-        equal = list()
-        greater = list()
-
-        if follower_list:
-            less_follow = list()
-            equal_follow = list()
-            greater_follow = list()
-
-        count = len(list_of_numbers)
-        if count > 1:
-            pivot = list_of_numbers[0]
-            for i in range(count):
-                value = list_of_numbers[i]
-                if follower_list:
-                    follower_value = follower_list[i]
-                if value < pivot:
-                    less.append(value)
-                    if follower_list:
-                        less_follow.append(follower_value)
-                if value == pivot:
-                    equal.append(value)
-                    if follower_list:
-                        equal_follow.append(follower_value)
-                if value > pivot:
-                    greater.append(value)
-                    if follower_list:
-                        greater_follow.append(follower_value)
-
-            if not self.follower_list:
-                return self._sort(less) + equal + self._sort(greater)
-            else:
-                less_list_of_numbers, less_follower_list = self._sort(less, less_follow)
-                greater_list_of_numbers, greater_follower_list = self._sort(greater, greater_follow)
-                list_of_numbers = less_list_of_numbers + equal + greater_list_of_numbers
-                follower_list = less_follower_list + equal_follow + greater_follower_list
-
-                return list_of_numbers, follower_list
-        else:
-            if not self.follower_list:
-                return list_of_numbers
-            else:
-                return list_of_numbers, follower_list
-
     def set_follower_list(self, list_of_anything):
         """
         This list must match the length of the list given when the class was initialized
@@ -82,4 +180,8 @@ class QuickNumbersListSort(object):
         if self.follower_list and len(self.follower_list) != len(self.list_of_numbers):
             return
 
-        return self._sort(self.list_of_numbers, self.follower_list)
+        sorter = MultiKeySort(self.list_of_numbers, use_numpy=False)
+        if not self.follower_list:
+            return sorter.take(self.list_of_numbers)
+
+        return sorter.take(self.list_of_numbers), sorter.take(self.follower_list)
@@ -290,16 +290,12 @@ class VersionFile(object):
             LOGGER.warning('No valid version files found in folder: {}'.format(version_folder))
             return
 
-        quick_sort = sort.QuickNumbersListSort(number_list)
-        quick_sort.set_follower_list(pass_files)
-        pass_files = quick_sort.run()
-
-        pass_dict = dict()
-        for i in range(len(number_list)):
-            pass_dict[pass_files[0][i]] = pass_files[1][i]
+        sorter = sort.MultiKeySort(number_list)
+        sorted_numbers = sorter.take(number_list)
+        pass_dict = dict(zip(sorted_numbers, sorter.apply(pass_files)))
 
         if return_version_numbers:
-            return pass_dict, pass_files[0]
+            return pass_dict, sorted_numbers
         else:
             return pass_dict
 